@@ -3,20 +3,56 @@ Module containing the AI logic for the Ayo game.
 """
 
 import random
-from game_logic import AyoGame
+from game_logic import AyoGame, apply_move
+from opening_book import BOOK_FILE, OpeningBook
+from parallel_search import ParallelSearch
+from search import AlphaBetaSearch
+from tablebase import TABLEBASE_FILE, Tablebase
+
+# Thinking time per move, in seconds, for the difficulties that search ahead.
+SEARCH_TIME_LIMITS = {'expert': 0.5, 'master': 2.0, 'mcts': 1.0}
+# Longest the AI will ponder on the opponent's time, in seconds.
+PONDER_TIME_LIMIT = 20.0
 
 class AyoAI:
-    def __init__(self, difficulty='easy'):
+    def __init__(self, difficulty='easy', workers=1, time_limit=None):
         """
         Initialize the AI with a given difficulty.
-        Available difficulties: 'easy' or 'hard'.
+        Available difficulties: 'easy', 'hard', 'expert', 'master' or 'mcts'
+        (Monte Carlo tree search, which needs NumPy).
+        With more than one worker, the searching difficulties split each
+        search across that many processes (call `close` when done), and
+        `time_limit` overrides their thinking time per move, in seconds.
+        Expert and master also use the opening book and endgame tablebase,
+        if they have been generated.
         """
         self.difficulty = difficulty
+        self.time_limit = time_limit or SEARCH_TIME_LIMITS.get(difficulty)
+        # The search (and its transposition table) is kept from move to move.
+        self.search = None
+        self.book = None
+        self.tablebase = None
+        if difficulty == 'mcts':
+            # Imported here, so only this difficulty needs NumPy.
+            from mcts import MCTSSearch
+            self.search = MCTSSearch()
+        elif difficulty in SEARCH_TIME_LIMITS:
+            self.book = OpeningBook.open_if_exists(BOOK_FILE)
+            self.tablebase = Tablebase.open_if_exists(TABLEBASE_FILE)
+            if workers > 1:
+                self.search = ParallelSearch(workers, TABLEBASE_FILE if self.tablebase else None)
+            else:
+                self.search = AlphaBetaSearch(tablebase=self.tablebase)
+        # The SearchResult (or MCTSResult) of the last searched move, if any.
+        self.last_search = None
+        # Where the last move was looked up instead ('opening book' or 'endgame tablebase'), if it was.
+        self.last_lookup = None
 
-    def choose_move(self, game: AyoGame):
+    def choose_move(self, game: AyoGame, stop=None):
         """
         Choose a move for the AI based on the current game state.
         Returns a valid pit index.
+        A search can be cut short by setting `stop` (a threading.Event).
         """
         valid_moves = [i for i in range(12) if game.is_valid_move(i)]
         if not valid_moves:
@@ -37,23 +73,45 @@ class AyoAI:
             if best_move is None:
                 best_move = random.choice(valid_moves)
             return best_move
+        elif self.search is not None:
+            # Expert, master and MCTS. In the opening, or with few enough seeds
+            # left, the best move can be looked up.
+            for lookup, table in (('opening book', self.book), ('endgame tablebase', self.tablebase)):
+                move = table.best_move(game.state) if table is not None else None
+                if move is not None:
+                    self.last_search, self.last_lookup = None, lookup
+                    return move
+            self.last_lookup = None
+            # Otherwise, search for as long as the difficulty allows.
+            self.last_search = self.search.search(game.state, self.time_limit, stop=stop)
+            return self.last_search.move
         else:
             # Default to random if the difficulty is unrecognized.
             return random.choice(valid_moves)
 
+    def close(self):
+        """Shut down the search's worker processes, if it has any, and close the book and tablebase."""
+        if isinstance(self.search, ParallelSearch):
+            self.search.close()
+        for table in (self.book, self.tablebase):
+            if table is not None:
+                table.close()
+
+    def ponder(self, game: AyoGame, stop, time_limit=PONDER_TIME_LIMIT):
+        """
+        Searches the position while the opponent is thinking, until `stop` is
+        set. Nothing is played; the point is to fill the transposition table, so
+        the search after the opponent's move finds most positions already done.
+        """
+        if self.search is not None and not game.game_over:
+            self.search.search(game.state, time_limit, stop=stop)
+
     def simulate_move_capture(self, game: AyoGame, pit_index):
         """
         Simulate a move and return the number of seeds that would be captured.
         This is a simple heuristic used for the 'hard' difficulty.
         """
-        # Create a copy of the game state.
-        sim_game = AyoGame()
-        sim_game.board = game.board.copy()
-        sim_game.player_scores = game.player_scores.copy()
-        sim_game.current_player = game.current_player
-        sim_game.game_over = game.game_over
-        
-        before_score = sim_game.player_scores[sim_game.current_player]
-        sim_game.make_move(pit_index)
-        capture = sim_game.player_scores[sim_game.current_player] - before_score
-        return capture
+        # Moves make a new state, so the game itself is left untouched.
+        state = game.state
+        player = state.player - 1
+        return apply_move(state, pit_index).scores[player] - state.scores[player]
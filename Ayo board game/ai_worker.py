@@ -0,0 +1,99 @@
+"""
+Module that runs the AI on a background thread for the GUI.
+"""
+
+import queue
+import threading
+
+from game_logic import AyoGame
+
+# How often the Tk loop checks for a finished AI move, in milliseconds.
+POLL_INTERVAL_MS = 50
+
+
+class AIWorker:
+    """
+    Runs `AyoAI.choose_move` (and optional pondering) on a worker thread, so
+    the window keeps responding while the AI thinks.
+
+    Tkinter may only be used from the thread running the main loop, so the
+    worker never touches widgets: it puts its result on a queue, which the Tk
+    loop drains with `root.after`, and the callback runs there. Only one job
+    runs at a time; starting a new one or calling `cancel` stops the current
+    job and discards its result.
+    """
+    def __init__(self, root):
+        self.root = root
+        self._results = queue.Queue()
+        self._thread = None
+        self._stop = None
+        # Bumped for every job, so results from a cancelled job can be recognized.
+        self._job = 0
+        # True while a move is being chosen (as opposed to pondering or idle).
+        self._thinking = False
+        # True while a `_poll` is scheduled with `root.after`.
+        self._polling = False
+
+    @property
+    def thinking(self) -> bool:
+        """True while a move is being chosen (not while pondering)."""
+        return self._thinking
+
+    def request_move(self, ai, state, on_move):
+        """
+        Chooses a move for `state` in the background, then calls
+        `on_move(state, move, search_result)` on the Tk thread.
+        """
+        self._start(self._choose_move, ai, state, on_move)
+        self._thinking = True
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def ponder(self, ai, state):
+        """Lets `ai` search `state` in the background until the next job or `cancel`."""
+        self._start(self._ponder, ai, state)
+        self._thinking = False
+
+    def cancel(self):
+        """Stops the current job, if any; its result is never delivered."""
+        self._job += 1
+        self._thinking = False
+        if self._stop is not None:
+            self._stop.set()
+        if self._thread is not None:
+            # The searches check their stop flag every thousand or so positions
+            # (MCTS between the moves of its playouts), so this is quick; waiting
+            # makes sure two jobs never share an AI's search.
+            self._thread.join()
+            self._thread = None
+
+    def _start(self, target, *args):
+        self.cancel()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=target, args=(self._job, self._stop) + args, daemon=True)
+        self._thread.start()
+
+    def _choose_move(self, job, stop, ai, state, on_move):
+        # The AI gets its own AyoGame around the (immutable) state, so nothing
+        # is shared with the GUI's game.
+        move = ai.choose_move(AyoGame(state), stop=stop)
+        self._results.put((job, on_move, state, move, ai.last_search))
+
+    def _ponder(self, job, stop, ai, state):
+        ai.ponder(AyoGame(state), stop)
+
+    def _poll(self):
+        """Delivers finished results on the Tk thread, checking again until the job is done."""
+        self._polling = False
+        try:
+            while True:
+                job, on_move, state, move, result = self._results.get_nowait()
+                if job == self._job:
+                    self._thinking = False
+                    on_move(state, move, result)
+        except queue.Empty:
+            pass
+        if self._thinking:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
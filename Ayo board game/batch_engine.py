@@ -0,0 +1,129 @@
+"""
+Module containing a vectorized version of the rules, which plays a move in
+thousands of positions at once with NumPy, for batch evaluation and random
+playouts. It gives exactly the same results as `apply_move` in game_logic.py.
+
+A batch is three arrays: `boards` (n x 12 seed counts), `scores` (n x 2
+captured seeds) and `players` (n players to move, 1 or 2). Nothing else in
+the game needs NumPy; only this module (and what uses it) does.
+"""
+
+import time
+
+import numpy as np
+
+from game_logic import PITS, AyoState
+
+# Each pit's distance counterclockwise from every other pit: _OFFSETS[start, pit].
+_OFFSETS = (np.arange(PITS)[None, :] - np.arange(PITS)[:, None]) % PITS
+# Captures never go further back than the 6 pits of the opponent's side.
+_SIDE = PITS // 2
+
+
+def from_states(states) -> tuple:
+    """Packs AyoStates into a batch: (boards, scores, players)."""
+    boards = np.array([state.board for state in states], dtype=np.int16).reshape(-1, PITS)
+    scores = np.array([state.scores for state in states], dtype=np.int16).reshape(-1, 2)
+    players = np.array([state.player for state in states], dtype=np.int8)
+    return boards, scores, players
+
+
+def to_states(boards, scores, players) -> list:
+    """Unpacks a batch into AyoStates."""
+    return [AyoState(board, score, player)
+            for board, score, player in zip(boards.tolist(), scores.tolist(), players.tolist())]
+
+
+def game_over(boards) -> np.ndarray:
+    """Which positions are finished (their boards are empty)."""
+    return ~boards.any(axis=1)
+
+
+def legal_moves(boards, players) -> np.ndarray:
+    """An n x 12 mask of the pits each player to move can sow from."""
+    own_side = np.where((players == 1)[:, None], np.arange(PITS) < _SIDE, np.arange(PITS) >= _SIDE)
+    return own_side & (boards > 0)
+
+
+def apply_moves(boards, scores, players, pits) -> tuple:
+    """
+    Returns the batch after each player to move sows from the pit in `pits`
+    (which must be a valid move); the arrays given are not changed. See
+    `apply_move` for the rules.
+    """
+    rows = np.arange(len(boards))
+    boards = boards.copy()
+    scores = scores.copy()
+    seeds = boards[rows, pits]
+    boards[rows, pits] = 0
+
+    # Whole laps add the same number of seeds to every pit (the starting pit
+    # too); the rest go one each to the pits following the starting pit.
+    laps, rest = np.divmod(seeds, PITS)
+    offsets = _OFFSETS[pits]
+    boards += laps[:, None] + ((offsets >= 1) & (offsets <= rest[:, None]))
+    last = (pits + seeds) % PITS
+
+    # Capture backwards from the last pit, while the pits are the opponent's
+    # and hold 2 or 3 seeds. Every position takes the same steps, and stops
+    # capturing at its own first pit that doesn't qualify.
+    player_1 = players == 1
+    capturing = np.ones(len(boards), dtype=bool)
+    captured = np.zeros(len(boards), dtype=np.int16)
+    for step in range(_SIDE):
+        index = (last - step) % PITS
+        seeds_there = boards[rows, index]
+        capturing &= ((index >= _SIDE) == player_1) & (seeds_there >= 2) & (seeds_there <= 3)
+        if not capturing.any():
+            break
+        captured += np.where(capturing, seeds_there, 0).astype(np.int16)
+        boards[rows[capturing], index[capturing]] = 0
+    scores[:, 0] += np.where(player_1, captured, 0).astype(np.int16)
+    scores[:, 1] += np.where(player_1, 0, captured).astype(np.int16)
+
+    # A side that is empty ends the game: each player takes the seeds left on
+    # their own side. Otherwise the turn passes.
+    p1_seeds = boards[:, :_SIDE].sum(axis=1, dtype=np.int16)
+    p2_seeds = boards[:, _SIDE:].sum(axis=1, dtype=np.int16)
+    ended = (p1_seeds == 0) | (p2_seeds == 0)
+    scores[:, 0] += np.where(ended, p1_seeds, 0).astype(np.int16)
+    scores[:, 1] += np.where(ended, p2_seeds, 0).astype(np.int16)
+    boards[ended] = 0
+    players = np.where(ended, players, 3 - players).astype(np.int8)
+    return boards, scores, players
+
+
+def random_moves(boards, players, rng) -> np.ndarray:
+    """Picks one legal move at random for each position (pit 0 for a finished one, which changes nothing)."""
+    weights = rng.random((len(boards), PITS)) * legal_moves(boards, players)
+    return weights.argmax(axis=1)
+
+
+def random_playouts(boards, scores, players, rng, max_plies: int = 400, deadline: float = None,
+                    stop=None) -> np.ndarray:
+    """
+    Plays every position in the batch to the end with random moves, at once,
+    and returns the final scores (n x 2). Games still going after `max_plies`
+    moves are stopped where they are.
+
+    If `time.perf_counter()` passes `deadline`, or `stop` (a threading.Event)
+    is set, it gives up between moves and returns None.
+    """
+    final_scores = scores.copy()
+    # Rows of the batch still being played, and where they came from. Sowing
+    # from an empty board changes nothing, so finished games can stay in the
+    # batch; it is only cut down to the unfinished ones when half are done.
+    rows = np.flatnonzero(~game_over(boards))
+    boards, scores, players = boards[rows], scores[rows], players[rows]
+    for _ in range(max_plies):
+        if not len(rows):
+            break
+        if (deadline is not None and time.perf_counter() > deadline) or (stop is not None and stop.is_set()):
+            return None
+        boards, scores, players = apply_moves(boards, scores, players, random_moves(boards, players, rng))
+        playing = boards.any(axis=1)
+        if 2 * playing.sum() <= len(rows):
+            final_scores[rows] = scores
+            rows, boards, scores, players = rows[playing], boards[playing], scores[playing], players[playing]
+    final_scores[rows] = scores
+    return final_scores
@@ -0,0 +1,322 @@
+"""
+Benchmarks for the Ayo game engine and AI.
+
+Run from this directory, for example:
+
+    python benchmarks.py moves --positions 100000
+    python benchmarks.py search --time 2
+    python benchmarks.py tablebase --seeds 10
+    python benchmarks.py book --plies 3
+    python benchmarks.py batch --batch 4096
+    python benchmarks.py mcts --time 1
+
+The batch and mcts benchmarks need NumPy.
+
+None of these need a display.
+"""
+import argparse
+import os
+import random
+import time
+
+from game_logic import AyoState, apply_move
+from opening_book import BOOK_FILE, OpeningBook, book_positions, build
+from parallel_search import ParallelSearch
+from search import WIN_SCORE, AlphaBetaSearch
+from tablebase import TABLEBASE_FILE, Tablebase, generate, solved_seeds
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def sample_positions(count: int, seed: int = 0) -> list:
+    """Returns `count` (state, legal move) pairs taken from random games."""
+    rng = random.Random(seed)
+    samples = []
+    state = AyoState()
+    while len(samples) < count:
+        if state.game_over:
+            state = AyoState()
+        move = rng.choice(state.legal_moves())
+        samples.append((state, move))
+        state = apply_move(state, move)
+    return samples
+
+
+def _copy_and_sow(board: list, scores: dict, player: int, pit_index: int):
+    """The previous way of trying a move: copy the board and scores, then sow one seed at a time."""
+    board = board.copy()
+    scores = scores.copy()
+    seeds = board[pit_index]
+    board[pit_index] = 0
+    index = pit_index
+    while seeds > 0:
+        index = (index + 1) % 12
+        board[index] += 1
+        seeds -= 1
+    opponent_range = range(6, 12) if player == 1 else range(0, 6)
+    while index in opponent_range and board[index] in [2, 3]:
+        scores[player] += board[index]
+        board[index] = 0
+        index = (index - 1) % 12
+    p1_empty = all(seeds == 0 for seeds in board[0:6])
+    p2_empty = all(seeds == 0 for seeds in board[6:12])
+    if p1_empty:
+        scores[2] += sum(board[6:12])
+        board[6:12] = [0] * 6
+    if p2_empty:
+        scores[1] += sum(board[0:6])
+        board[0:6] = [0] * 6
+    return board, scores
+
+
+def bench_moves(positions: int):
+    """Moves/sec for copying and mutating the board versus the immutable `apply_move`."""
+    samples = sample_positions(positions)
+    legacy = [(list(state.board), {1: state.scores[0], 2: state.scores[1]}, state.player, move)
+              for state, move in samples]
+
+    _, copy_time = _timed(lambda: [_copy_and_sow(*sample) for sample in legacy])
+    _, apply_time = _timed(lambda: [apply_move(state, move) for state, move in samples])
+    _, hash_time = _timed(lambda: {state for state, _ in samples})
+
+    print(f"Move generation benchmark ({positions} positions from random games)")
+    print(f"  copy and sow seed by seed: {positions / copy_time:,.0f} moves/sec")
+    print(f"  apply_move (new AyoState): {positions / apply_time:,.0f} moves/sec")
+    print(f"  hashing states:            {positions / hash_time:,.0f} states/sec")
+
+
+def benchmark_positions(count: int = 8, seed: int = 1) -> list:
+    """A fixed set of unfinished positions, spread over the opening and middle game."""
+    positions = []
+    for index in range(count):
+        rng = random.Random(seed + index)
+        state = AyoState()
+        for _ in range(index * 6):
+            next_state = apply_move(state, rng.choice(state.legal_moves()))
+            if next_state.game_over:
+                break
+            state = next_state
+        positions.append(state)
+    return positions
+
+
+def bench_batch(positions: int, batch_size: int, playouts: int):
+    """
+    Moves/sec for `apply_move` one position at a time versus the NumPy batch
+    engine in batches of `batch_size`, and random playouts/sec both ways.
+    """
+    # Imported here, so the other benchmarks don't need NumPy.
+    import numpy as np
+    from batch_engine import apply_moves, from_states, random_playouts
+
+    samples = sample_positions(positions)
+    states = [state for state, _ in samples]
+    pits = np.array([move for _, move in samples])
+    batches = [(from_states(states[start:start + batch_size]), pits[start:start + batch_size])
+               for start in range(0, positions, batch_size)]
+
+    _, apply_time = _timed(lambda: [apply_move(state, move) for state, move in samples])
+    _, batch_time = _timed(lambda: [apply_moves(*batch, batch_pits) for batch, batch_pits in batches])
+    print(f"Batch move benchmark ({positions} positions, batches of {batch_size})")
+    print(f"  apply_move:         {positions / apply_time:,.0f} moves/sec")
+    print(f"  apply_moves (NumPy): {positions / batch_time:,.0f} moves/sec, {apply_time / batch_time:.1f}x")
+
+    rng = random.Random(0)
+
+    def playout(state):
+        while not state.game_over:
+            state = apply_move(state, rng.choice(state.legal_moves()))
+        return state.scores
+
+    starts = states[:playouts]
+    _, single_time = _timed(lambda: [playout(state) for state in starts])
+    _, batch_playout_time = _timed(random_playouts, *from_states(starts), np.random.default_rng(0))
+    print(f"  random playouts one at a time: {playouts / single_time:,.0f} playouts/sec")
+    print(f"  random playouts in one batch:  {playouts / batch_playout_time:,.0f} playouts/sec, "
+          f"{single_time / batch_playout_time:.1f}x")
+
+
+def bench_search(positions: int, time_limit: float, depth: int):
+    """
+    Depth reached and nodes/sec for the alpha-beta search on the benchmark
+    positions, either with a time limit per position or to a fixed depth.
+    """
+    total_nodes = total_time = 0
+    mode = f"depth {depth}" if depth else f"{time_limit} s per position"
+    print(f"Alpha-beta search benchmark ({positions} positions, {mode})")
+    for index, state in enumerate(benchmark_positions(positions)):
+        search = AlphaBetaSearch()
+        if depth:
+            result = search.search(state, time_limit=float("inf"), max_depth=depth)
+        else:
+            result = search.search(state, time_limit=time_limit)
+        total_nodes += result.nodes
+        total_time += result.seconds
+        print(f"  position {index}: move {result.move}, value {result.value}, depth {result.depth}, "
+              f"{result.nodes} nodes in {result.seconds:.2f} s ({result.nodes / result.seconds:,.0f} nodes/sec)")
+    print(f"  total: {total_nodes} nodes in {total_time:.2f} s ({total_nodes / total_time:,.0f} nodes/sec)")
+
+
+def bench_mcts(positions: int, time_limit: float, batch_sizes: list):
+    """
+    Iterations, random playouts/sec and tree size for the MCTS search on the
+    benchmark positions, for each number of leaves per batch.
+    """
+    from mcts import MCTSSearch
+
+    states = benchmark_positions(positions)
+    print(f"MCTS benchmark ({positions} positions, {time_limit} s per position)")
+    for batch_leaves in batch_sizes:
+        results = [MCTSSearch(batch_leaves=batch_leaves, seed=0).search(state, time_limit) for state in states]
+        seconds = sum(result.seconds for result in results)
+        print(f"  {batch_leaves:4} leaves per batch: {sum(result.iterations for result in results) / positions:.0f} "
+              f"iterations, {sum(result.nodes for result in results) / positions:,.0f} tree nodes and depth "
+              f"{max(result.depth for result in results)} per position, "
+              f"{sum(result.simulations for result in results) / seconds:,.0f} simulations/sec")
+
+
+def bench_parallel(positions: int, depth: int, worker_counts: list):
+    """
+    Time to search the benchmark positions to a fixed depth with one process
+    (AlphaBetaSearch) and with the root split across each number of worker
+    processes (ParallelSearch), and the speedup over one process.
+    """
+    states = benchmark_positions(positions)
+    print(f"Parallel search benchmark ({positions} positions, depth {depth}, {os.cpu_count()} CPUs)")
+    _, serial_time = _timed(lambda: [AlphaBetaSearch().search(state, float("inf"), depth) for state in states])
+    print(f"  1 process:   {serial_time:.2f} s")
+    for workers in worker_counts:
+        search = ParallelSearch(workers)
+        # Start the worker processes before timing.
+        search.search(states[0], float("inf"), 1)
+        results, elapsed = _timed(lambda: [search.search(state, float("inf"), depth) for state in states])
+        search.close()
+        nodes = sum(result.nodes for result in results)
+        print(f"  {workers} workers:   {elapsed:.2f} s, {serial_time / elapsed:.2f}x speedup, "
+              f"{nodes / elapsed:,.0f} nodes/sec")
+
+
+def endgame_positions(count: int, max_seeds: int, seed: int = 2) -> list:
+    """Returns `count` unfinished positions with at most `max_seeds` seeds on the board, from random games."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = AyoState()
+        while not state.game_over and sum(state.board) > max_seeds:
+            state = apply_move(state, rng.choice(state.legal_moves()))
+        if not state.game_over:
+            positions.append(state)
+    return positions
+
+
+def bench_tablebase(path: str, seeds: int, positions: int, depth: int):
+    """
+    Generates the tablebase up to `seeds` seeds if needed (timing it), then
+    measures probes/sec, and the alpha-beta search to a fixed depth with and
+    without the tablebase on positions with a few more seeds than it covers.
+    """
+    if solved_seeds(path) < seeds:
+        print(f"Generating {path} up to {seeds} seeds")
+        _, generate_time = _timed(generate, path, seeds)
+        print(f"  generated in {generate_time:.1f} s")
+    tablebase = Tablebase(path)
+    covered = endgame_positions(positions * 100, tablebase.max_seeds)
+    _, probe_time = _timed(lambda: [tablebase.probe(state) for state in covered])
+    print(f"Tablebase benchmark ({path}, up to {tablebase.max_seeds} seeds, "
+          f"{os.path.getsize(path):,} bytes)")
+    print(f"  probes: {len(covered) / probe_time:,.0f} positions/sec")
+
+    states = endgame_positions(positions, tablebase.max_seeds + 6)
+    for name, search_tablebase in (("without tablebase", None), ("with tablebase", tablebase)):
+        results, elapsed = _timed(lambda: [AlphaBetaSearch(tablebase=search_tablebase).search(state, float("inf"), depth)
+                                           for state in states])
+        proven = sum(abs(result.value) >= WIN_SCORE for result in results)
+        print(f"  search to depth {depth} {name}: {sum(result.nodes for result in results)} nodes in "
+              f"{elapsed:.2f} s, {proven} of {positions} results proven")
+    tablebase.close()
+
+
+def bench_book(path: str, plies: int, depth: int, time_limit: float):
+    """
+    Builds the opening book if there isn't one (timing it), then compares
+    looking up the book's positions with searching them for `time_limit` seconds.
+    """
+    if not os.path.exists(path):
+        print(f"Building {path} ({plies} plies, depth {depth})")
+        build(path, plies, depth)
+    book = OpeningBook(path)
+    positions = book_positions(book.plies)
+    moves, probe_time = _timed(lambda: [book.best_move(state) for state in positions])
+    print(f"Opening book benchmark ({path}, {len(positions)} positions, {book.plies} plies searched to depth {book.depth})")
+    print(f"  book lookup: {probe_time / len(positions) * 1e6:.1f} us/move ({len(positions) / probe_time:,.0f} probes/sec)")
+    sample = positions[:8]
+    results, search_time = _timed(lambda: [AlphaBetaSearch().search(state, time_limit) for state in sample])
+    agree = sum(result.move == move for result, move in zip(results, moves))
+    print(f"  search for {time_limit} s: {search_time / len(sample) * 1000:.0f} ms/move, depth "
+          f"{min(result.depth for result in results)}-{max(result.depth for result in results)}, "
+          f"same move as the book in {agree} of {len(sample)} positions")
+    book.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ayo engine and AI benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    moves_parser = subparsers.add_parser("moves", help="Moves/sec: copying the board vs apply_move.")
+    moves_parser.add_argument("--positions", type=int, default=200000, help="Number of moves to apply.")
+
+    search_parser = subparsers.add_parser("search", help="Alpha-beta depth reached and nodes/sec.")
+    search_parser.add_argument("--positions", type=int, default=8, help="Number of benchmark positions.")
+    search_parser.add_argument("--time", type=float, default=2.0, help="Seconds to search each position.")
+    search_parser.add_argument("--depth", type=int, default=0, help="Search to this depth instead of for a fixed time.")
+
+    mcts_parser = subparsers.add_parser("mcts", help="MCTS iterations and simulations/sec versus batch size.")
+    mcts_parser.add_argument("--positions", type=int, default=8, help="Number of benchmark positions.")
+    mcts_parser.add_argument("--time", type=float, default=1.0, help="Seconds to search each position.")
+    mcts_parser.add_argument("--batch-leaves", type=int, nargs="+", default=[16, 64, 256], help="Leaves per batch to try.")
+
+    parallel_parser = subparsers.add_parser("parallel", help="Speedup of the process-pool search versus worker count.")
+    parallel_parser.add_argument("--positions", type=int, default=8, help="Number of benchmark positions.")
+    parallel_parser.add_argument("--depth", type=int, default=10, help="Depth to search each position to.")
+    parallel_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 6], help="Worker counts to try.")
+
+    tablebase_parser = subparsers.add_parser("tablebase", help="Endgame tablebase probes/sec and its effect on the search.")
+    tablebase_parser.add_argument("--seeds", type=int, default=10, help="Generate the tablebase up to this many seeds first, if needed.")
+    tablebase_parser.add_argument("--file", default=TABLEBASE_FILE, help="Tablebase file to use (or generate).")
+    tablebase_parser.add_argument("--positions", type=int, default=20, help="Number of endgame positions to search.")
+    tablebase_parser.add_argument("--depth", type=int, default=10, help="Depth to search each position to.")
+
+    book_parser = subparsers.add_parser("book", help="Opening book lookups versus searching the same positions.")
+    book_parser.add_argument("--file", default=BOOK_FILE, help="Book file to use (or build).")
+    book_parser.add_argument("--plies", type=int, default=3, help="Plies to cover if the book has to be built.")
+    book_parser.add_argument("--depth", type=int, default=10, help="Search depth if the book has to be built.")
+    book_parser.add_argument("--time", type=float, default=0.5, help="Seconds to search each position for comparison.")
+
+    batch_parser = subparsers.add_parser("batch", help="Moves/sec and playouts/sec for the NumPy batch engine.")
+    batch_parser.add_argument("--positions", type=int, default=200000, help="Number of moves to apply.")
+    batch_parser.add_argument("--batch", type=int, default=4096, help="Positions per batch.")
+    batch_parser.add_argument("--playouts", type=int, default=4096, help="Number of random playouts.")
+
+    args = parser.parse_args()
+    if args.benchmark == "moves":
+        bench_moves(args.positions)
+    elif args.benchmark == "batch":
+        bench_batch(args.positions, args.batch, args.playouts)
+    elif args.benchmark == "search":
+        bench_search(args.positions, args.time, args.depth)
+    elif args.benchmark == "mcts":
+        bench_mcts(args.positions, args.time, args.batch_leaves)
+    elif args.benchmark == "parallel":
+        bench_parallel(args.positions, args.depth, args.workers)
+    elif args.benchmark == "tablebase":
+        bench_tablebase(args.file, args.seeds, args.positions, args.depth)
+    elif args.benchmark == "book":
+        bench_book(args.file, args.plies, args.depth, args.time)
+
+
+if __name__ == "__main__":
+    main()
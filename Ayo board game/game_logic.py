@@ -2,123 +2,237 @@
 Module containing the game logic for the Ayo game.
 """
 
+# The board is represented by 12 pits.
+# Indices 0-5 belong to Player 1; indices 6-11 belong to Player 2.
+PITS = 12
+PLAYER_PITS = {1: range(0, 6), 2: range(6, 12)}
+INITIAL_SEEDS = 4
+
+
+class AyoState:
+    """
+    An immutable snapshot of an Ayo game: the 12 pits, both players' captured
+    seeds and whose turn it is. States are hashable and compare by value, so
+    they can be used as dictionary keys (e.g. by the AI's search), and they are
+    cheap to create, so a move makes a new state instead of changing this one
+    (see `apply_move`).
+    """
+    __slots__ = ("board", "scores", "player")
+
+    def __init__(self, board=(INITIAL_SEEDS,) * PITS, scores=(0, 0), player=1):
+        # A tuple of 12 seed counts.
+        self.board = tuple(board)
+        # Captured seeds for (Player 1, Player 2).
+        self.scores = tuple(scores)
+        # The player to move (or the player who made the last move, once the game is over).
+        self.player = player
+
+    def __eq__(self, other):
+        if not isinstance(other, AyoState):
+            return NotImplemented
+        return self.board == other.board and self.scores == other.scores and self.player == other.player
+
+    def __hash__(self):
+        return hash((self.board, self.scores, self.player))
+
+    def __repr__(self):
+        return f"AyoState(board={self.board}, scores={self.scores}, player={self.player})"
+
+    def to_bytes(self) -> bytes:
+        """Packs the state into 15 bytes: 12 pits, 2 scores and the player (48 seeds fit in a byte)."""
+        return bytes(self.board + self.scores + (self.player,))
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        return cls(data[:PITS], data[PITS:PITS + 2], data[PITS + 2])
+
+    @property
+    def game_over(self) -> bool:
+        # When a side empties, the seeds left on the other side are collected,
+        # so a finished game always has an empty board (and vice versa).
+        return not any(self.board)
+
+    def legal_moves(self) -> list:
+        """Returns the pits the player to move can sow from."""
+        board = self.board
+        return [pit for pit in PLAYER_PITS[self.player] if board[pit]]
+
+    def winner(self):
+        """Returns 1 or 2 (or 0 for a tie) once the game is over, otherwise None."""
+        if not self.game_over:
+            return None
+        if self.scores[0] > self.scores[1]:
+            return 1
+        elif self.scores[1] > self.scores[0]:
+            return 2
+        return 0
+
+
+def is_valid_move(state: AyoState, pit_index: int) -> bool:
+    """
+    Check if the selected pit is a valid move.
+    A move is valid if:
+      - The pit is on the current player's side.
+      - The pit contains at least one seed.
+    """
+    return pit_index in PLAYER_PITS[state.player] and state.board[pit_index] > 0
+
+
+def apply_move(state: AyoState, pit_index: int) -> AyoState:
+    """
+    Returns the state after the player to move sows from `pit_index`
+    (which must be a valid move); `state` itself is unchanged.
+    - Picks up all seeds from the pit.
+    - Sows them counterclockwise one by one (passing over the emptied pit too).
+    - Captures from the opponent: starting from the pit where the last seed
+      landed and moving backwards, every opponent pit with 2 or 3 seeds.
+    - Ends the game if either side is empty, giving the seeds left on the
+      other side to that side's owner; otherwise the turn passes.
+    """
+    board = list(state.board)
+    seeds = board[pit_index]
+    board[pit_index] = 0
+
+    # Whole laps add the same number of seeds to every pit; the rest go one
+    # each to the pits following the starting pit.
+    laps, rest = divmod(seeds, PITS)
+    if laps:
+        board = [count + laps for count in board]
+    for offset in range(1, rest + 1):
+        board[(pit_index + offset) % PITS] += 1
+    last_index = (pit_index + seeds) % PITS
+
+    # Handle capturing seeds from the opponent's pits.
+    player = state.player
+    p1_score, p2_score = state.scores
+    opponent_range = PLAYER_PITS[2] if player == 1 else PLAYER_PITS[1]
+    index = last_index
+    captured = 0
+    while index in opponent_range and 2 <= board[index] <= 3:
+        captured += board[index]
+        board[index] = 0
+        index = (index - 1) % PITS
+    if player == 1:
+        p1_score += captured
+    else:
+        p2_score += captured
+
+    # Check if the game has ended: one player's side is completely empty.
+    p1_empty = not any(board[0:6])
+    p2_empty = not any(board[6:12])
+    if p1_empty or p2_empty:
+        # Collect remaining seeds to the opponent's score.
+        if p1_empty:
+            p2_score += sum(board[6:12])
+            board[6:12] = [0] * 6
+        if p2_empty:
+            p1_score += sum(board[0:6])
+            board[0:6] = [0] * 6
+    else:
+        # Switch the turn to the other player.
+        player = 2 if player == 1 else 1
+    return AyoState(board, (p1_score, p2_score), player)
+
+
 class AyoGame:
-    def __init__(self):
-        """Initialize the game board and state."""
-        # The board is represented by 12 pits.
-        # Indices 0-5 belong to Player 1; indices 6-11 belong to Player 2.
-        # Each pit starts with 4 seeds.
-        self.board = [4] * 12
-        # Store captured seeds for each player.
-        self.player_scores = {1: 0, 2: 0}
-        # Player 1 starts the game.
-        self.current_player = 1
-        self.game_over = False
+    """
+    A game in progress, for the GUI: the current `AyoState` plus the methods
+    to play it. The board, scores and turn are read from the state.
+    The game keeps its moves, so they can be undone and redone (and saved,
+    see game_record.py).
+    """
+    def __init__(self, state: AyoState = None):
+        """Initialize the game board and state (Player 1 starts, each pit has 4 seeds)."""
+        self.state = state or AyoState()
+        # The position the game started from and the moves played since.
+        self.start = self.state
+        self.moves = []
+        # The state before each move in `moves`, for undo, and moves undone, latest last, for redo.
+        self._previous_states = []
+        self._undone = []
+
+    @property
+    def board(self) -> tuple:
+        return self.state.board
+
+    @property
+    def player_scores(self) -> dict:
+        """Captured seeds for each player."""
+        return {1: self.state.scores[0], 2: self.state.scores[1]}
+
+    @property
+    def current_player(self) -> int:
+        return self.state.player
+
+    @property
+    def game_over(self) -> bool:
+        return self.state.game_over
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.moves)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._undone)
 
     def is_valid_move(self, pit_index):
-        """
-        Check if the selected pit is a valid move.
-        A move is valid if:
-          - The pit is on the current player's side.
-          - The pit contains at least one seed.
-        """
-        if self.game_over:
-            return False
-        if self.current_player == 1 and 0 <= pit_index <= 5 and self.board[pit_index] > 0:
-            return True
-        elif self.current_player == 2 and 6 <= pit_index <= 11 and self.board[pit_index] > 0:
-            return True
-        return False
+        """Check if the selected pit is a valid move (see `is_valid_move`)."""
+        return not self.game_over and is_valid_move(self.state, pit_index)
 
     def make_move(self, pit_index):
         """
-        Perform a move from the selected pit.
-        - Picks up all seeds from the pit.
-        - Sows them counterclockwise one by one.
-        - Handles capturing rules after sowing.
-        Returns True if the move was successful.
+        Perform a move from the selected pit (see `apply_move`).
+        Returns True if the move was successful. Any undone moves are forgotten.
         """
         if not self.is_valid_move(pit_index):
             return False
-        
-        seeds = self.board[pit_index]
-        self.board[pit_index] = 0
-        current_index = pit_index
-
-        # Distribute the seeds in a counterclockwise fashion.
-        while seeds > 0:
-            current_index = (current_index + 1) % 12
-            self.board[current_index] += 1
-            seeds -= 1
-
-        # Handle capturing seeds from the opponent's pits.
-        self.handle_captures(current_index)
-        
-        # Check if the game has ended.
-        self.check_end_game()
-        
-        # Switch the turn to the other player if the game is not over.
-        if not self.game_over:
-            self.switch_player()
+        self._play(pit_index)
+        self._undone.clear()
         return True
 
-    def handle_captures(self, last_index):
+    def undo(self):
+        """Take back the last move. Returns True if there was one."""
+        if not self.moves:
+            return False
+        self.state = self._previous_states.pop()
+        self._undone.append(self.moves.pop())
+        return True
+
+    def redo(self):
         """
-        Capture seeds based on where the last seed was sown.
-        Starting from the last pit and moving backwards, if a pit (on the opponent's side)
-        has 2 or 3 seeds, capture them.
+        Play the last undone move again. Returns True if there was one.
+        Raises ValueError if it isn't a valid move (only possible for a loaded game).
         """
-        captured = 0
-        # Define the opponent's pit range.
-        if self.current_player == 1:
-            opponent_range = range(6, 12)
-        else:
-            opponent_range = range(0, 6)
-        
-        index = last_index
-        while index in opponent_range and self.board[index] in [2, 3]:
-            captured += self.board[index]
-            self.board[index] = 0
-            index = (index - 1) % 12
-        self.player_scores[self.current_player] += captured
-
-    def switch_player(self):
-        """Switch the turn to the other player."""
-        self.current_player = 2 if self.current_player == 1 else 1
-
-    def check_end_game(self):
+        if not self._undone:
+            return False
+        if not self.is_valid_move(self._undone[-1]):
+            raise ValueError(f"Move {self._undone[-1]} is not valid after {len(self.moves)} moves.")
+        self._play(self._undone.pop())
+        return True
+
+    def load(self, start: AyoState, moves):
         """
-        Check if the game is over.
-        The game ends when one player's side is completely empty.
+        Set up a recorded game: the game is at `start`, with `moves` ready to
+        be played one at a time by `redo` (they are checked as they are played).
         """
-        p1_empty = all(seeds == 0 for seeds in self.board[0:6])
-        p2_empty = all(seeds == 0 for seeds in self.board[6:12])
-        if p1_empty or p2_empty:
-            self.game_over = True
-            # Collect remaining seeds to the opponent's score.
-            if p1_empty:
-                for i in range(6, 12):
-                    self.player_scores[2] += self.board[i]
-                    self.board[i] = 0
-            if p2_empty:
-                for i in range(0, 6):
-                    self.player_scores[1] += self.board[i]
-                    self.board[i] = 0
+        self.state = self.start = start
+        self.moves = []
+        self._previous_states = []
+        self._undone = list(reversed(moves))
+
+    def _play(self, pit_index):
+        self._previous_states.append(self.state)
+        self.moves.append(pit_index)
+        self.state = apply_move(self.state, pit_index)
 
     def get_winner(self):
         """Determine the winner of the game. Returns 1 or 2 (or 0 for a tie)."""
-        if not self.game_over:
-            return None
-        if self.player_scores[1] > self.player_scores[2]:
-            return 1
-        elif self.player_scores[2] > self.player_scores[1]:
-            return 2
-        else:
-            return 0  # Tie
+        return self.state.winner()
 
     def reset_game(self):
         """Reset the game to its initial state."""
-        self.board = [4] * 12
-        self.player_scores = {1: 0, 2: 0}
-        self.current_player = 1
-        self.game_over = False
+        self.state = self.start = AyoState()
+        self.moves = []
+        self._previous_states = []
+        self._undone = []
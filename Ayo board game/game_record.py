@@ -0,0 +1,122 @@
+"""
+Module containing the game record format: games saved from the GUI, or logged
+by tournament.py, and replayed from file.
+
+Replay (and check) every game in a log from this directory, for example:
+
+    python game_record.py games.ayo
+"""
+
+import argparse
+import os
+import struct
+import time
+from collections import namedtuple
+
+from game_logic import AyoState, apply_move, is_valid_move
+
+# --- File Format ---
+# MAGIC, then any number of games one after the other. A game is its start
+# position (15 bytes, see `AyoState.to_bytes`), its number of moves (2 bytes)
+# and the moves, two to a byte (the pit, 0-11, in each half; an odd number of
+# moves leaves PADDING in the last half). A typical game takes about 40 bytes,
+# and games can be read one at a time, so logs of any length can be replayed.
+MAGIC = b"AYOREC1\n"
+GAME_HEADER = struct.Struct(">15sH")
+PADDING = 0xF
+
+# A recorded game: where it started, and the pits played from there.
+GameRecord = namedtuple("GameRecord", "start moves")
+
+
+def encode_game(start: AyoState, moves) -> bytes:
+    """Packs one game into its bytes in the file."""
+    moves = list(moves)
+    padded = moves + [PADDING] * (len(moves) % 2)
+    return GAME_HEADER.pack(start.to_bytes(), len(moves)) + bytes(
+        first << 4 | second for first, second in zip(padded[::2], padded[1::2]))
+
+
+def append_game(path: str, start: AyoState, moves):
+    """Adds a game to the end of the file at `path` (starting the file if needed)."""
+    with open(path, "ab") as f:
+        if f.tell() == 0:
+            f.write(MAGIC)
+        f.write(encode_game(start, moves))
+
+
+def save_game(path: str, start: AyoState, moves):
+    """Writes a file holding just this game."""
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(encode_game(start, moves))
+
+
+def read_games(path: str):
+    """Yields the GameRecords in the file at `path`, reading one game at a time."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an Ayo game record.")
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < GAME_HEADER.size:
+                raise ValueError(f"{path} ends in the middle of a game.")
+            start, count = GAME_HEADER.unpack(header)
+            packed = f.read((count + 1) // 2)
+            if len(packed) < (count + 1) // 2:
+                raise ValueError(f"{path} ends in the middle of a game.")
+            moves = []
+            for byte in packed:
+                moves.append(byte >> 4)
+                moves.append(byte & 0xF)
+            yield GameRecord(AyoState.from_bytes(start), moves[:count])
+
+
+def load_game(path: str) -> GameRecord:
+    """Returns the first game in the file at `path`."""
+    for record in read_games(path):
+        return record
+    raise ValueError(f"{path} has no games in it.")
+
+
+def replay(record: GameRecord):
+    """Yields every state of a recorded game, from the start; raises ValueError on an invalid move."""
+    state = record.start
+    yield state
+    for number, move in enumerate(record.moves, start=1):
+        if state.game_over or not is_valid_move(state, move):
+            raise ValueError(f"Move {number} (pit {move}) is not valid.")
+        state = apply_move(state, move)
+        yield state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay and check the games in an Ayo game record.")
+    parser.add_argument("path", help="Game record file (saved from the game, or logged by tournament.py).")
+    parser.add_argument("--list", action="store_true", help="Print each game's result.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    games = moves = finished = 0
+    wins = {0: 0, 1: 0, 2: 0}
+    for record in read_games(args.path):
+        for state in replay(record):
+            pass
+        games += 1
+        moves += len(record.moves)
+        if state.game_over:
+            finished += 1
+            wins[state.winner()] += 1
+        if args.list:
+            result = f"Player {state.winner()} wins" if state.winner() else "tie" if state.game_over else "unfinished"
+            print(f"game {games}: {len(record.moves)} moves, {state.scores[0]}-{state.scores[1]}, {result}")
+    elapsed = time.perf_counter() - start
+    print(f"{args.path}: {games} games ({os.path.getsize(args.path):,} bytes), {moves} moves, "
+          f"replayed in {elapsed:.2f} s ({moves / max(elapsed, 1e-9):,.0f} moves/sec)")
+    print(f"  Player 1 won {wins[1]}, Player 2 won {wins[2]}, {wins[0]} ties, {games - finished} unfinished")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,14 @@ Module containing the GUI logic for the Ayo game using tkinter.
 """
 
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 from game_logic import AyoGame
 from ai import AyoAI
+from ai_worker import AIWorker
+from game_record import load_game, save_game
+
+# Time between moves when replaying a game, in milliseconds.
+REPLAY_INTERVAL_MS = 400
 
 class AyoGUI:
     def __init__(self, root):
@@ -21,6 +26,16 @@ class AyoGUI:
         # Default AI difficulty is 'easy'.
         self.ai_difficulty = tk.StringVar(value="easy")
         self.ai_player = AyoAI(difficulty=self.ai_difficulty.get())
+        # The AI thinks on a background thread so the window stays responsive.
+        self.ai_worker = AIWorker(self.root)
+        # Whether the AI keeps searching while the human player is thinking.
+        self.ponder = tk.BooleanVar(value=False)
+        # The pending `after` call that starts the AI's move, if any.
+        self.ai_move_after_id = None
+        # The pending `after` call that plays the next move of a replay, if any.
+        self.replay_after_id = None
+        # The seed counts on the pit buttons, so only changed pits are redrawn.
+        self.shown_board = None
         # Create the GUI components.
         self.create_widgets()
         self.update_board()
@@ -40,6 +55,10 @@ class AyoGUI:
         tk.Label(difficulty_frame, text="AI Difficulty:").pack(side=tk.LEFT)
         tk.Radiobutton(difficulty_frame, text="Easy", variable=self.ai_difficulty, value="easy", command=self.on_difficulty_change).pack(side=tk.LEFT)
         tk.Radiobutton(difficulty_frame, text="Hard", variable=self.ai_difficulty, value="hard", command=self.on_difficulty_change).pack(side=tk.LEFT)
+        tk.Radiobutton(difficulty_frame, text="Expert", variable=self.ai_difficulty, value="expert", command=self.on_difficulty_change).pack(side=tk.LEFT)
+        tk.Radiobutton(difficulty_frame, text="Master", variable=self.ai_difficulty, value="master", command=self.on_difficulty_change).pack(side=tk.LEFT)
+        tk.Radiobutton(difficulty_frame, text="MCTS", variable=self.ai_difficulty, value="mcts", command=self.on_difficulty_change).pack(side=tk.LEFT)
+        tk.Checkbutton(difficulty_frame, text="Think on my time", variable=self.ponder, command=self.on_ponder_change).pack(side=tk.LEFT, padx=10)
         
         # Board frame for displaying pits.
         self.board_frame = tk.Frame(self.root)
@@ -66,6 +85,9 @@ class AyoGUI:
         # Label to display game info.
         self.info_label = tk.Label(self.root, text="Player 1's turn")
         self.info_label.pack(pady=10)
+        # Label to display how deep the AI searched its last move.
+        self.ai_stats_label = tk.Label(self.root, text="", fg="gray")
+        self.ai_stats_label.pack()
         
         # Button frame for extra controls.
         control_frame = tk.Frame(self.root)
@@ -77,15 +99,58 @@ class AyoGUI:
         tutorial_btn = tk.Button(control_frame, text="Tutorial", command=self.show_tutorial)
         tutorial_btn.pack(side=tk.LEFT, padx=5)
 
+        # Move history and game record controls.
+        history_frame = tk.Frame(self.root)
+        history_frame.pack(pady=(0, 10))
+        self.undo_btn = tk.Button(history_frame, text="Undo", command=self.on_undo)
+        self.undo_btn.pack(side=tk.LEFT, padx=5)
+        self.redo_btn = tk.Button(history_frame, text="Redo", command=self.on_redo)
+        self.redo_btn.pack(side=tk.LEFT, padx=5)
+        self.replay_btn = tk.Button(history_frame, text="Replay", command=self.on_replay)
+        self.replay_btn.pack(side=tk.LEFT, padx=5)
+        tk.Button(history_frame, text="Save Game", command=self.on_save).pack(side=tk.LEFT, padx=5)
+        tk.Button(history_frame, text="Load Game", command=self.on_load).pack(side=tk.LEFT, padx=5)
+
     def on_mode_change(self):
         """Handle changes in game mode (PvP vs PvAI)."""
+        self.stop_ai()
         self.update_board()
+        self.show_turn()
         self.check_ai_turn()
+        self.start_pondering()
 
     def on_difficulty_change(self):
         """Handle changes in AI difficulty."""
+        # Stop the old AI first; if it was thinking, the new one takes over the move.
+        self.stop_ai()
+        self.ai_player.close()
         self.ai_player = AyoAI(difficulty=self.ai_difficulty.get())
+        self.ai_stats_label.config(text="")
         self.update_board()
+        self.show_turn()
+        self.check_ai_turn()
+        self.start_pondering()
+
+    def on_ponder_change(self):
+        """Start or stop the AI thinking on the human player's time."""
+        if self.ponder.get():
+            self.start_pondering()
+        elif not self.ai_worker.thinking:
+            self.ai_worker.cancel()
+
+    def stop_ai(self):
+        """Cancel any AI move that is scheduled, in progress or being pondered (and any replay)."""
+        self.stop_replay()
+        if self.ai_move_after_id is not None:
+            self.root.after_cancel(self.ai_move_after_id)
+            self.ai_move_after_id = None
+        self.ai_worker.cancel()
+
+    def start_pondering(self):
+        """If enabled, let the AI search the position while the human player thinks."""
+        if (self.ponder.get() and self.mode.get() == "PvAI" and self.game.current_player == 1
+                and not self.game.game_over):
+            self.ai_worker.ponder(self.ai_player, self.game.state)
 
     def on_pit_click(self, pit_index):
         """
@@ -101,7 +166,10 @@ class AyoGUI:
             messagebox.showinfo("Wait", "It's the AI's turn!")
             return
 
-        if self.game.make_move(pit_index):
+        if self.game.is_valid_move(pit_index):
+            # Stop pondering; the AI's own search picks up what it found.
+            self.ai_worker.cancel()
+            self.game.make_move(pit_index)
             self.update_board()
             self.check_game_over()
             # In PvAI mode, if it becomes the AI's turn, trigger the AI move.
@@ -112,12 +180,26 @@ class AyoGUI:
     def check_ai_turn(self):
         """If it is the AI's turn in PvAI mode, trigger the AI move."""
         if self.mode.get() == "PvAI" and self.game.current_player == 2 and not self.game.game_over:
+            self.info_label.config(text="AI is thinking...")
             # Delay AI move slightly for a natural feel.
-            self.root.after(500, self.make_ai_move)
+            self.ai_move_after_id = self.root.after(500, self.make_ai_move)
 
     def make_ai_move(self):
-        """Perform the AI move."""
-        move = self.ai_player.choose_move(self.game)
+        """Start the AI choosing its move in the background; `on_ai_move` plays it."""
+        self.ai_move_after_id = None
+        self.ai_worker.request_move(self.ai_player, self.game.state, self.on_ai_move)
+
+    def on_ai_move(self, state, move, result):
+        """Perform the AI move, once the worker has chosen it (called on the Tk thread)."""
+        if state != self.game.state:
+            # The game changed while the AI was thinking; the move no longer applies.
+            return
+        if result is not None and hasattr(result, "simulations"):
+            self.ai_stats_label.config(text=f"AI played {result.simulations:,} random games ({result.simulations / max(result.seconds, 1e-9):,.0f} games/sec)")
+        elif result is not None:
+            self.ai_stats_label.config(text=f"AI searched {result.depth} moves ahead ({result.nodes / max(result.seconds, 1e-9):,.0f} positions/sec)")
+        elif self.ai_player.last_lookup is not None:
+            self.ai_stats_label.config(text=f"AI played from its {self.ai_player.last_lookup}")
         if move is not None:
             self.game.make_move(move)
             self.update_board()
@@ -126,6 +208,7 @@ class AyoGUI:
             messagebox.showinfo("No Moves", "AI has no valid moves!")
         # Check again if it is still AI’s turn (e.g., if the move grants an extra turn).
         self.check_ai_turn()
+        self.start_pondering()
 
     def check_game_over(self):
         """Check if the game is over and display the result."""
@@ -142,24 +225,119 @@ class AyoGUI:
             self.info_label.config(text=f"Game Over! {result}")
             messagebox.showinfo("Game Over", result)
         else:
+            self.show_turn()
+
+    def show_turn(self):
+        """Display whose turn it is (unless the game is over)."""
+        if not self.game.game_over:
             self.info_label.config(text=f"Player {self.game.current_player}'s turn")
 
     def update_board(self):
         """Update the display of the board to reflect the current game state."""
+        board = self.game.board
         for i in range(12):
+            # Only pits whose seed count changed are redrawn.
+            if self.shown_board is not None and self.shown_board[i] == board[i]:
+                continue
             # Map the board index to the correct pit button.
             if i >= 6:
                 # For Player 2, the top row order is reversed.
                 btn_index = 11 - i
             else:
                 btn_index = 6 + i
-            self.pit_buttons[btn_index].config(text=str(self.game.board[i]))
+            self.pit_buttons[btn_index].config(text=str(board[i]))
+        self.shown_board = board
+        self.undo_btn.config(state=tk.NORMAL if self.game.can_undo else tk.DISABLED)
+        self.redo_btn.config(state=tk.NORMAL if self.game.can_redo else tk.DISABLED)
+        self.replay_btn.config(state=tk.NORMAL if self.game.can_redo or self.replay_after_id else tk.DISABLED)
+
+    def on_undo(self):
+        """Take back the last move (in PvAI mode, back to the human player's turn)."""
+        self.stop_ai()
+        self.game.undo()
+        while self.mode.get() == "PvAI" and self.game.current_player == 2 and self.game.undo():
+            pass
+        self.after_history_change()
+
+    def on_redo(self):
+        """Play the last undone (or next loaded) move again."""
+        self.stop_ai()
+        self.redo_move()
+        self.after_history_change()
+
+    def redo_move(self):
+        """Redo one move, reporting a loaded game's invalid move. Returns True if a move was played."""
+        try:
+            return self.game.redo()
+        except ValueError as e:
+            messagebox.showerror("Invalid Game Record", str(e))
+            return False
+
+    def after_history_change(self):
+        """Show the position reached by undo, redo or replay; the AI only plays on once nothing is left to redo."""
+        self.update_board()
+        if self.game.game_over:
+            self.check_game_over()
+        else:
+            self.show_turn()
+        if not self.game.can_redo and self.replay_after_id is None:
+            self.check_ai_turn()
+            self.start_pondering()
+
+    def on_replay(self):
+        """Play the remaining moves of a loaded (or undone) game one after another, or pause the replay."""
+        if self.replay_after_id is not None:
+            self.stop_replay()
+            self.update_board()
+            return
+        self.stop_ai()
+        self.replay_after_id = self.root.after(REPLAY_INTERVAL_MS, self.replay_step)
+        self.replay_btn.config(text="Pause")
+
+    def replay_step(self):
+        """Play the next move of the replay, and schedule the one after it until none are left."""
+        if self.redo_move() and self.game.can_redo:
+            self.replay_after_id = self.root.after(REPLAY_INTERVAL_MS, self.replay_step)
+        else:
+            self.replay_after_id = None
+            self.replay_btn.config(text="Replay")
+        self.after_history_change()
+
+    def stop_replay(self):
+        """Cancel a running replay, leaving the board where it got to."""
+        if self.replay_after_id is not None:
+            self.root.after_cancel(self.replay_after_id)
+            self.replay_after_id = None
+            self.replay_btn.config(text="Replay")
+
+    def on_save(self):
+        """Save the game so far (without any undone moves) to a game record file."""
+        path = filedialog.asksaveasfilename(defaultextension=".ayo", filetypes=[("Ayo games", "*.ayo")])
+        if path:
+            save_game(path, self.game.start, self.game.moves)
+
+    def on_load(self):
+        """Load a game record file; its moves are then played with Redo or Replay."""
+        path = filedialog.askopenfilename(filetypes=[("Ayo games", "*.ayo"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            record = load_game(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Load Game", f"Could not load the game: {e}")
+            return
+        self.stop_ai()
+        self.game.load(record.start, record.moves)
+        self.ai_stats_label.config(text=f"Loaded a game of {len(record.moves)} moves")
+        self.after_history_change()
 
     def on_restart(self):
         """Restart the game and update the GUI."""
+        self.stop_ai()
         self.game.reset_game()
         self.info_label.config(text="Player 1's turn")
         self.update_board()
+        self.start_pondering()
 
     def show_tutorial(self):
         """
@@ -176,7 +354,8 @@ class AyoGUI:
             "Controls:\n"
             "- Use the mode selection buttons to switch between Player vs Player and Player vs AI.\n"
             "- Adjust the AI difficulty as needed.\n"
-            "- Click 'Restart Game' to start a new match.\n\n"
+            "- Click 'Restart Game' to start a new match.\n"
+            "- Use 'Undo' and 'Redo' to take back moves, and 'Save Game', 'Load Game' and 'Replay' to keep and watch games.\n\n"
             "Enjoy the game and reminisce about the childhood fun of playing Ayo!"
         )
         messagebox.showinfo("Tutorial", tutorial_text)
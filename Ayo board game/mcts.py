@@ -0,0 +1,226 @@
+"""
+Module containing a Monte Carlo tree search (UCT) for the MCTS AI difficulty.
+Its random playouts run in batches on the NumPy engine in batch_engine.py.
+"""
+
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from batch_engine import from_states, random_playouts
+from game_logic import AyoState, apply_move
+from search import SearchResult
+
+# How far UCT explores less-visited moves rather than the best so far
+# (for results between 0 and 1; sqrt(2) in the original analysis).
+EXPLORATION = 1.4
+
+# Leaves chosen per round, and random playouts from each; one round's
+# playouts run together as one batch.
+BATCH_LEAVES = 64
+PLAYOUTS_PER_LEAF = 8
+# Rounds shrink to fit the time left (see `MCTSSearch._round_size`); the
+# first one, before there is a speed to go by, is this many leaves.
+FIRST_ROUND_LEAVES = 8
+
+# Result of an MCTS search: as for SearchResult (the move, its winning
+# chance for the player to move, the deepest line in the tree, nodes in the
+# tree, time taken and the most visited line), plus the number of rounds of
+# leaves searched and the random playouts run.
+MCTSResult = namedtuple("MCTSResult", SearchResult._fields + ("iterations", "simulations"))
+
+
+class Node:
+    """A position in the search tree, with the results of the playouts through it."""
+    __slots__ = ("state", "move", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, state: AyoState, move: int = None, parent=None):
+        self.state = state
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = [] if state.game_over else state.legal_moves()
+        self.visits = 0
+        # Games won (a draw counts a half) by the player who moved into this position.
+        self.wins = 0.0
+
+
+class MCTSSearch:
+    """
+    An anytime Monte Carlo tree search with UCT: it keeps playing random games
+    from the most promising positions in its tree until its time runs out,
+    then plays the move it tried most.
+
+    Each round picks BATCH_LEAVES leaves one after the other, counting the
+    playouts still to come as lost ("virtual loss") so that the same leaf
+    isn't picked every time, then plays PLAYOUTS_PER_LEAF random games from
+    each, all in one NumPy batch. The tree is kept between moves: the next
+    search starts from the part of it below the position reached.
+
+    Takes the same arguments as `AlphaBetaSearch.search` (with `max_depth`
+    ignored) and returns an MCTSResult.
+    """
+    def __init__(self, exploration: float = EXPLORATION, batch_leaves: int = BATCH_LEAVES,
+                 playouts_per_leaf: int = PLAYOUTS_PER_LEAF, seed: int = None):
+        self.exploration = exploration
+        self.batch_leaves = batch_leaves
+        self.playouts_per_leaf = playouts_per_leaf
+        self.rng = np.random.default_rng(seed)
+        self.root = None
+        self._max_depth = 0
+        # Seconds per leaf of the rounds so far, to size rounds to the time left
+        self._leaf_time = None
+
+    def search(self, state: AyoState, time_limit: float = 1.0, max_depth: int = None, stop=None) -> MCTSResult:
+        """
+        Searches `state` for up to `time_limit` seconds and returns an
+        MCTSResult. The game must not be over. If `stop` (a threading.Event)
+        is set from another thread, the search ends early as if its time had
+        run out.
+        """
+        start = time.perf_counter()
+        deadline = start + time_limit
+        self.root = self._reuse(state) or Node(state)
+        self._max_depth = 0
+        iterations = simulations = 0
+        if len(state.legal_moves()) > 1:
+            while time.perf_counter() < deadline and not (stop is not None and stop.is_set()):
+                played = self._round(self._round_size(deadline), deadline, stop)
+                if played is None:
+                    break
+                simulations += played
+                iterations += 1
+
+        root = self.root
+        if root.children:
+            best = max(root.children, key=lambda child: child.visits)
+            move, value = best.move, best.wins / best.visits
+        else:
+            move, value = state.legal_moves()[0], 0.5
+        return MCTSResult(move, round(value, 3), self._max_depth, self._count_nodes(),
+                          time.perf_counter() - start, self._best_line(), iterations, simulations)
+
+    def _reuse(self, state: AyoState):
+        """
+        Returns the node for `state` if it is in the tree within two moves of
+        the last root (the AI's move and the reply), which becomes the root.
+        """
+        frontier = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in frontier:
+                if node.state == state:
+                    node.parent, node.move = None, None
+                    return node
+            frontier = [child for node in frontier for child in node.children]
+        return None
+
+    def _round_size(self, deadline: float) -> int:
+        """
+        Leaves for the next round: up to `batch_leaves`, but no more than
+        should fit in the time left at the speed of the rounds so far (and a
+        few to measure that speed on the first round).
+        """
+        if self._leaf_time is None:
+            return min(self.batch_leaves, FIRST_ROUND_LEAVES)
+        time_left = deadline - time.perf_counter()
+        return max(1, min(self.batch_leaves, int(time_left / self._leaf_time)))
+
+    def _round(self, leaf_count: int = None, deadline: float = None, stop=None) -> int:
+        """
+        Chooses a batch of leaves, plays out random games from them and backs
+        up the results. Returns the number of playouts, or None if the time
+        ran out (or `stop` was set) first, in which case the round is undone.
+        """
+        start = time.perf_counter()
+        playouts = self.playouts_per_leaf
+        leaf_count = leaf_count or self.batch_leaves
+        leaves = [self._select() for _ in range(leaf_count)]
+        unfinished = [leaf for leaf in leaves if not leaf.state.game_over]
+
+        # Player 1's points (win 1, draw 1/2) from each leaf's playouts.
+        points = {}
+        for leaf in leaves:
+            if leaf.state.game_over:
+                points[id(leaf)] = playouts * _player_1_points(*leaf.state.scores)
+        if unfinished:
+            boards, scores, players = (np.repeat(array, playouts, axis=0) for array in from_states(
+                [leaf.state for leaf in unfinished]))
+            final = random_playouts(boards, scores, players, self.rng, deadline=deadline, stop=stop)
+            if final is None:
+                self._undo(leaves)
+                return None
+            results = (np.sign(final[:, 0] - final[:, 1]) + 1) / 2
+            for leaf, leaf_points in zip(unfinished, results.reshape(-1, playouts).sum(axis=1).tolist()):
+                points[id(leaf)] = leaf_points
+
+        for leaf in leaves:
+            node, player_1_points = leaf, points[id(leaf)]
+            while node.parent is not None:
+                node.wins += player_1_points if node.parent.state.player == 1 else playouts - player_1_points
+                node = node.parent
+        leaf_time = (time.perf_counter() - start) / leaf_count
+        self._leaf_time = leaf_time if self._leaf_time is None else (self._leaf_time + leaf_time) / 2
+        return playouts * len(unfinished)
+
+    def _undo(self, leaves):
+        """Takes back the visits counted for a round that was given up, and the leaves it added."""
+        playouts = self.playouts_per_leaf
+        for leaf in leaves:
+            node = leaf
+            while node is not None:
+                node.visits -= playouts
+                node = node.parent
+        for leaf in leaves:
+            if leaf.visits == 0 and leaf.parent is not None and leaf in leaf.parent.children:
+                leaf.parent.children.remove(leaf)
+                leaf.parent.untried.append(leaf.move)
+
+    def _select(self) -> Node:
+        """
+        Walks down the tree by UCT to a position not fully expanded yet, and
+        adds one of its moves as a new leaf (or stops at a finished game).
+        The playouts to come are counted as visits on the way.
+        """
+        playouts = self.playouts_per_leaf
+        node = self.root
+        node.visits += playouts
+        depth = 0
+        while True:
+            if node.untried:
+                move = node.untried.pop()
+                child = Node(apply_move(node.state, move), move, node)
+                node.children.append(child)
+                child.visits += playouts
+                node, depth = child, depth + 1
+                break
+            if not node.children:
+                break
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits
+                       + self.exploration * math.sqrt(log_visits / child.visits))
+            node.visits += playouts
+            depth += 1
+        self._max_depth = max(self._max_depth, depth)
+        return node
+
+    def _count_nodes(self) -> int:
+        count, stack = 0, [self.root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+        return count
+
+    def _best_line(self, length: int = 8) -> tuple:
+        """The most visited line of play from the root."""
+        line, node = [], self.root
+        while node.children and len(line) < length:
+            node = max(node.children, key=lambda child: child.visits)
+            line.append(node.move)
+        return tuple(line)
+
+
+def _player_1_points(p1_score: int, p2_score: int) -> float:
+    return 1.0 if p1_score > p2_score else 0.0 if p1_score < p2_score else 0.5
@@ -0,0 +1,143 @@
+"""
+Module containing the opening book: the best move for every position in the
+first few moves of the game, searched deeply in advance.
+
+Build it from this directory, for example:
+
+    python opening_book.py --plies 4 --depth 12 --workers 4
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import AyoState, apply_move
+from search import AlphaBetaSearch, zobrist_hash
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ayo_opening.book")
+
+# --- File Format ---
+# A header (MAGIC, the plies and search depth the book was built with, and
+# the number of slots) followed by a hash table of fixed-size slots: each
+# position's Zobrist hash, its best move and that move's value. A position
+# goes in the slot its hash picks, or the next free one after it (the table
+# is kept at most half full, so a probe reads one or two slots).
+MAGIC = b"AYOBK1"
+HEADER = struct.Struct(">6sBBI")
+SLOT = struct.Struct(">QBh")
+# The move byte of a free slot.
+EMPTY = 0xFF
+
+
+def book_positions(plies: int) -> list:
+    """Every unfinished position reachable from the start in at most `plies` moves."""
+    positions = [AyoState()]
+    frontier = positions
+    seen = set(positions)
+    for _ in range(plies):
+        following = []
+        for state in frontier:
+            for move in state.legal_moves():
+                child = apply_move(state, move)
+                if not child.game_over and child not in seen:
+                    seen.add(child)
+                    following.append(child)
+        positions.extend(following)
+        frontier = following
+    return positions
+
+
+def _search_position(state: AyoState, depth: int):
+    """Runs in a worker: the best move for `state` and its value, searched `depth` plies deep."""
+    result = AlphaBetaSearch().search(state, float("inf"), depth)
+    return result.move, result.value
+
+
+def build(path: str = BOOK_FILE, plies: int = 4, depth: int = 12, workers: int = None, progress=print):
+    """Searches every position in the first `plies` moves to `depth` plies and writes the book to `path`."""
+    start = time.perf_counter()
+    positions = book_positions(plies)
+    if progress:
+        progress(f"Searching {len(positions)} positions to depth {depth}")
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(_search_position, positions, [depth] * len(positions), chunksize=8))
+
+    slots = 1
+    while slots < 2 * len(positions):
+        slots *= 2
+    table = bytearray(SLOT.pack(0, EMPTY, 0) * slots)
+    for state, (move, value) in zip(positions, results):
+        key = zobrist_hash(state)
+        slot = key & (slots - 1)
+        while table[slot * SLOT.size + 8] != EMPTY:
+            slot = (slot + 1) & (slots - 1)
+        SLOT.pack_into(table, slot * SLOT.size, key, move, value)
+    # Written to a temporary file first, so a probing AI never sees half a book.
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, plies, depth, slots))
+        f.write(table)
+    os.replace(path + ".tmp", path)
+    if progress:
+        progress(f"{path}: {len(positions)} positions, {HEADER.size + len(table)} bytes, "
+                 f"built in {time.perf_counter() - start:.1f} s")
+
+
+class OpeningBook:
+    """Read-only access to a built opening book, through a memory map."""
+    def __init__(self, path: str = BOOK_FILE):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.plies, self.depth, self._slots = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an Ayo opening book.")
+
+    @classmethod
+    def open_if_exists(cls, path: str = BOOK_FILE):
+        """Returns the book at `path`, or None if there isn't one."""
+        return cls(path) if os.path.exists(path) else None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def probe(self, state: AyoState):
+        """Returns (best move, value) for `state`, or None if it isn't in the book."""
+        key = zobrist_hash(state)
+        slot = key & (self._slots - 1)
+        while True:
+            slot_key, move, value = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+            if move == EMPTY:
+                return None
+            if slot_key == key:
+                return move, value
+            slot = (slot + 1) & (self._slots - 1)
+
+    def best_move(self, state: AyoState):
+        """Returns the book move for `state`, or None if it isn't in the book."""
+        entry = self.probe(state)
+        # A legal move is a cheap check against a (very unlikely) hash collision.
+        if entry is None or entry[0] not in state.legal_moves():
+            return None
+        return entry[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Ayo opening book.")
+    parser.add_argument("--plies", type=int, default=4, help="Cover every position in this many opening moves.")
+    parser.add_argument("--depth", type=int, default=12, help="Search each position this many plies deep.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: one per CPU).")
+    parser.add_argument("--output", default=BOOK_FILE, help="Book file to write.")
+    args = parser.parse_args()
+    if not 0 <= args.plies <= 8:
+        parser.error("--plies must be between 0 and 8.")
+    if not 1 <= args.depth <= 64:
+        parser.error("--depth must be between 1 and 64.")
+    build(args.output, args.plies, args.depth, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Module containing a multi-process version of the alpha-beta search.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from game_logic import AyoState, apply_move
+from search import INFINITY, WIN_SCORE, AlphaBetaSearch, SearchResult, SearchTimeout, ordered_moves
+from tablebase import Tablebase
+
+# How often the search checks its stop flag while waiting for workers, in seconds.
+STOP_POLL_SECONDS = 0.05
+
+# Each worker process keeps one search (and its transposition table) for its lifetime.
+_worker_search = None
+_worker_stop = None
+
+
+def _init_worker(stop_event, tablebase_path):
+    global _worker_search, _worker_stop
+    _worker_search = AlphaBetaSearch(tablebase=Tablebase(tablebase_path) if tablebase_path else None)
+    _worker_stop = stop_event
+
+
+def _search_move(state: AyoState, move: int, depth: int, alpha: int, time_limit: float):
+    """
+    Runs in a worker: the value of `move` in `state` (or None if the search
+    was stopped), the number of positions searched and the expected line.
+    """
+    try:
+        value = _worker_search.move_value(state, move, depth, alpha, INFINITY, time_limit, _worker_stop)
+    except SearchTimeout:
+        return None, _worker_search.nodes, ()
+    line = (move,) + _worker_search.principal_variation(apply_move(state, move), depth - 1)
+    return value, _worker_search.nodes, line
+
+
+class ParallelSearch:
+    """
+    An iterative-deepening alpha-beta search that splits the root position
+    across a pool of processes (so it isn't limited to one core by the GIL).
+
+    Ayo has at most six moves per turn, each searched by one worker. At each
+    depth the move that was best at the previous depth is searched first, on
+    its own, and its value is then the lower bound ("alpha") for the others,
+    which are searched in parallel: they only have to show they are worse,
+    which is much cheaper than finding out by how much. Each worker keeps its
+    own transposition table between searches.
+
+    Takes the same arguments as `AlphaBetaSearch.search` and returns the same
+    SearchResult, so the AI can use either. Call `close` when done with it.
+    Each worker opens the endgame tablebase at `tablebase_path`, if given.
+    """
+    def __init__(self, workers: int = None, tablebase_path: str = None):
+        self.workers = workers or os.cpu_count() or 1
+        # Workers are started fresh rather than forked, since the GUI process has threads running.
+        context = multiprocessing.get_context("spawn")
+        # Set to abandon the searches running in the workers.
+        self._abort = context.Event()
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                         initargs=(self._abort, tablebase_path))
+
+    def close(self):
+        self._abort.set()
+        self._pool.shutdown(cancel_futures=True)
+
+    def search(self, state: AyoState, time_limit: float = 1.0, max_depth: int = 64, stop=None) -> SearchResult:
+        start = time.perf_counter()
+        deadline = start + time_limit
+        self._abort.clear()
+        nodes = 0
+
+        moves = [move for _, move, _ in ordered_moves(state)]
+        best_move, best_value, depth_reached, line = moves[0], 0, 0, (moves[0],)
+        if len(moves) > 1:
+            for depth in range(1, max_depth + 1):
+                results = self._search_depth(state, depth, [best_move] + [m for m in moves if m != best_move],
+                                             deadline, stop)
+                nodes += sum(result[2] for result in results)
+                if any(result[1] is None for result in results):
+                    break
+                value, best_move, line = max(((value, move, line) for move, value, _, line in results),
+                                             key=lambda result: result[0])
+                best_value, depth_reached = value, depth
+                # A proven result won't change with depth, and the next
+                # iteration would very likely not finish in the time left.
+                if abs(value) >= WIN_SCORE or time.perf_counter() - start > time_limit / 2:
+                    break
+        return SearchResult(best_move, best_value, depth_reached, nodes, time.perf_counter() - start, line)
+
+    def _search_depth(self, state: AyoState, depth: int, moves: list, deadline: float, stop) -> list:
+        """
+        Searches every root move to `depth`, the first one before the rest.
+        Returns (move, value, nodes, line) for each; a value of None means the
+        time ran out or `stop` was set first. A move whose value is not above
+        the first move's is only known to be no better, and keeps the first
+        move's value, so it is never preferred over it.
+        """
+        first = self._run(state, [moves[0]], depth, -INFINITY, deadline, stop)
+        first_value = first[0][1]
+        if first_value is None:
+            return first
+        rest = self._run(state, moves[1:], depth, first_value, deadline, stop)
+        return first + [(move, value if value is None or value > first_value else first_value, nodes, line)
+                        for move, value, nodes, line in rest]
+
+    def _run(self, state: AyoState, moves: list, depth: int, alpha: int, deadline: float, stop) -> list:
+        futures = {self._pool.submit(_search_move, state, move, depth, alpha, deadline - time.perf_counter()): move
+                   for move in moves}
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=STOP_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            if pending and stop is not None and stop.is_set():
+                # Make the workers give up, then let them finish (which is quick).
+                for future in pending:
+                    future.cancel()
+                self._abort.set()
+                wait(pending)
+                break
+        results = []
+        for future, move in futures.items():
+            value, nodes, line = (None, 0, ()) if future.cancelled() else future.result()
+            results.append((move, value, nodes, line))
+        return results
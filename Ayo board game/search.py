@@ -0,0 +1,230 @@
+"""
+Module containing the game-tree search used by the stronger AI difficulties.
+"""
+
+import random
+import time
+from collections import namedtuple
+
+from game_logic import PITS, AyoState, apply_move
+
+# There are 48 seeds in a game, so no pit or score can hold more.
+MAX_SEEDS = 48
+
+# Added to the final score difference of a finished game, so that a won game
+# always beats an unfinished one that is merely ahead.
+WIN_SCORE = 1000
+INFINITY = 1 << 30
+
+# Zobrist keys: one random 64-bit number per (pit, seed count), per (player,
+# score) and for Player 2 to move. A position's hash is the XOR of its keys.
+# The generator is seeded so hashes are the same in every run and process.
+_rng = random.Random(0xA70)
+ZOBRIST_PITS = [[_rng.getrandbits(64) for _ in range(MAX_SEEDS + 1)] for _ in range(PITS)]
+ZOBRIST_SCORES = [[_rng.getrandbits(64) for _ in range(MAX_SEEDS + 1)] for _ in range(2)]
+ZOBRIST_PLAYER_2 = _rng.getrandbits(64)
+
+# Transposition table bound types.
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Default number of positions kept in the transposition table between searches.
+# Entries are (depth, value, bound, best move, captured seeds).
+DEFAULT_TABLE_SIZE = 1 << 20
+
+# Result of a search: the move chosen, its value for the player to move, the
+# deepest fully searched depth, how many positions were visited in how long,
+# and the expected line of play starting with the move.
+SearchResult = namedtuple("SearchResult", "move value depth nodes seconds line", defaults=((),))
+
+
+def zobrist_hash(state: AyoState) -> int:
+    h = ZOBRIST_PLAYER_2 if state.player == 2 else 0
+    for keys, seeds in zip(ZOBRIST_PITS, state.board):
+        h ^= keys[seeds]
+    return h ^ ZOBRIST_SCORES[0][state.scores[0]] ^ ZOBRIST_SCORES[1][state.scores[1]]
+
+
+def evaluate(state: AyoState, player: int) -> int:
+    """
+    Scores a position for `player`: the difference in captured seeds, plus
+    WIN_SCORE (either way) once the game is over.
+    """
+    difference = state.scores[player - 1] - state.scores[2 - player]
+    if state.game_over and difference:
+        return difference + (WIN_SCORE if difference > 0 else -WIN_SCORE)
+    return difference
+
+
+def ordered_moves(state: AyoState, first_move=None) -> list:
+    """
+    Returns (captured seeds, move, resulting state) for every legal move, best
+    captures first (with `first_move`, if given, ahead of everything else).
+    """
+    mover = state.player - 1
+    before = state.scores[mover]
+    children = []
+    for move in state.legal_moves():
+        child = apply_move(state, move)
+        children.append((child.scores[mover] - before, move, child))
+    children.sort(key=lambda child: child[0], reverse=True)
+    if first_move is not None:
+        children.sort(key=lambda child: child[1] != first_move)
+    return children
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time runs out (or it is cancelled)."""
+
+
+class AlphaBetaSearch:
+    """
+    An iterative-deepening negamax search with alpha-beta pruning.
+
+    Each iteration searches one ply deeper than the last, until the time
+    budget runs out; the move from the deepest finished iteration is played.
+    Positions already searched are remembered in a transposition table keyed
+    by Zobrist hash, which is kept between moves, and the best move found
+    for a position is tried first the next time it is searched. Other moves
+    are ordered by how many seeds they capture. Given an endgame `tablebase`
+    (see tablebase.py), positions it covers are looked up instead of searched.
+    """
+    def __init__(self, table_size: int = DEFAULT_TABLE_SIZE, tablebase=None):
+        self.table = {}
+        self.table_size = table_size
+        self.tablebase = tablebase
+        self.nodes = 0
+        self._deadline = None
+        self._stop = None
+
+    def search(self, state: AyoState, time_limit: float = 1.0, max_depth: int = 64, stop=None) -> SearchResult:
+        """
+        Searches `state` for up to `time_limit` seconds (and at most `max_depth`
+        plies) and returns a SearchResult. The game must not be over.
+        If `stop` (a threading.Event) is set from another thread, the search
+        ends early as if its time had run out.
+        """
+        start = time.perf_counter()
+        self._deadline = start + time_limit
+        self._stop = stop
+        self.nodes = 0
+        if len(self.table) > self.table_size:
+            self._prune_table(sum(state.scores))
+
+        moves = ordered_moves(state)
+        best_move, best_value, depth_reached = moves[0][1], 0, 0
+        if len(moves) > 1:
+            for depth in range(1, max_depth + 1):
+                try:
+                    value, move = self._search_root(state, depth, best_move)
+                except SearchTimeout:
+                    break
+                best_move, best_value, depth_reached = move, value, depth
+                elapsed = time.perf_counter() - start
+                # A proven result won't change with depth, and the next
+                # iteration would very likely not finish in the time left.
+                if abs(value) >= WIN_SCORE or elapsed > time_limit / 2:
+                    break
+        return SearchResult(best_move, best_value, depth_reached, self.nodes, time.perf_counter() - start,
+                            (best_move,) + self.principal_variation(apply_move(state, best_move), depth_reached - 1))
+
+    def move_value(self, state: AyoState, move: int, depth: int, alpha: int = -INFINITY, beta: int = INFINITY,
+                   time_limit: float = float("inf"), stop=None) -> int:
+        """
+        Returns the value of playing `move` in `state` for the player making it,
+        searched `depth` plies deep (counting the move itself), within the
+        window (alpha, beta): a value outside it is only a bound. Raises
+        SearchTimeout if `time_limit` passes or `stop` is set first. This is
+        one root move of a search, for splitting the root across processes.
+        """
+        self._deadline = time.perf_counter() + time_limit
+        self._stop = stop
+        self.nodes = 0
+        return self._child_value(state.player, apply_move(state, move), depth - 1, alpha, beta)
+
+    def principal_variation(self, state: AyoState, length: int) -> tuple:
+        """Returns up to `length` moves of the expected line of play from `state`, as stored in the table."""
+        line = []
+        while len(line) < length and not state.game_over:
+            entry = self.table.get(zobrist_hash(state))
+            if entry is None or entry[3] is None:
+                break
+            line.append(entry[3])
+            state = apply_move(state, entry[3])
+        return tuple(line)
+
+    def _prune_table(self, captured: int):
+        """
+        Makes room in the transposition table. Captured seeds never go back on
+        the board, so positions with fewer captured seeds than the game now has
+        can't come up again; if dropping those isn't enough, the table is cleared.
+        """
+        self.table = {key: entry for key, entry in self.table.items() if entry[4] >= captured}
+        if len(self.table) > self.table_size // 2:
+            self.table.clear()
+
+    def _search_root(self, state: AyoState, depth: int, first_move):
+        alpha, best_move = -INFINITY, first_move
+        for _, move, child in ordered_moves(state, first_move):
+            value = self._child_value(state.player, child, depth - 1, alpha, INFINITY)
+            if value > alpha:
+                alpha, best_move = value, move
+        self.table[zobrist_hash(state)] = (depth, alpha, EXACT, best_move, sum(state.scores))
+        return alpha, best_move
+
+    def _child_value(self, mover: int, child: AyoState, depth: int, alpha: int, beta: int) -> int:
+        """The value of `child` for `mover`, who has just moved into it."""
+        if child.game_over:
+            # The player doesn't change when the game ends, so it is scored here.
+            self.nodes += 1
+            return evaluate(child, mover)
+        return -self._negamax(child, depth, -beta, -alpha)
+
+    def _negamax(self, state: AyoState, depth: int, alpha: int, beta: int) -> int:
+        """Returns the value of `state` for the player to move, searched `depth` plies deep."""
+        self.nodes += 1
+        if not self.nodes & 1023 and (time.perf_counter() > self._deadline
+                                      or (self._stop is not None and self._stop.is_set())):
+            raise SearchTimeout
+        if self.tablebase is not None:
+            future = self.tablebase.probe(state)
+            if future is not None:
+                # Scored like a finished game, with the seeds still to be captured.
+                difference = state.scores[state.player - 1] - state.scores[2 - state.player] + future
+                return difference + (WIN_SCORE if difference > 0 else -WIN_SCORE if difference < 0 else 0)
+        if depth == 0:
+            return evaluate(state, state.player)
+
+        key = zobrist_hash(state)
+        entry = self.table.get(key)
+        first_move = None
+        if entry is not None:
+            entry_depth, value, bound, first_move, _ = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return value
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        original_alpha = alpha
+        best_value, best_move = -INFINITY, None
+        for _, move, child in ordered_moves(state, first_move):
+            value = self._child_value(state.player, child, depth - 1, alpha, beta)
+            if value > best_value:
+                best_value, best_move = value, move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table[key] = (depth, best_value, bound, best_move, sum(state.scores))
+        return best_value
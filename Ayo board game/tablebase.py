@@ -0,0 +1,331 @@
+"""
+Module containing the endgame tablebase: exact values for every position with
+few seeds left on the board, solved in advance by retrograde analysis.
+
+Generate (or extend) the tablebase from this directory, for example:
+
+    python tablebase.py --seeds 10 --workers 4
+
+Generation is resumable: run the same command again to continue after an
+interruption, or with a larger --seeds to add the next slices.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import PITS, AyoState, apply_move
+
+TABLEBASE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ayo_endgame.tb")
+
+# --- File Format ---
+# A header (MAGIC and the number of seeds solved up to) followed by one slice
+# per number of seeds on the board, 1 seed first. A slice has one signed byte
+# per (board, player to move): the number of seeds the player to move will
+# capture, minus the number the opponent will, from here to the end of the
+# game with perfect play by both (seeds already captured don't matter). A
+# game that goes round in circles forever captures nothing more.
+# Boards are numbered by the combinatorial number system, so a position's
+# byte is found with arithmetic alone (see `board_rank`).
+MAGIC = b"AYOTB1"
+HEADER = struct.Struct(">6sB")
+
+# Boards per job when a slice is split across processes.
+CHUNK_BOARDS = 20000
+
+# The 12 pit counts are encoded as 11 "bars" among seeds + 11 slots.
+_BARS = PITS - 1
+_BINOMIAL = [[0] * (_BARS + 2) for _ in range(48 + _BARS + 2)]
+for _n in range(len(_BINOMIAL)):
+    _BINOMIAL[_n][0] = 1
+    for _k in range(1, min(_n, _BARS + 1) + 1):
+        _BINOMIAL[_n][_k] = _BINOMIAL[_n - 1][_k - 1] + (_BINOMIAL[_n - 1][_k] if _k < _n else 0)
+
+
+def slice_boards(seeds: int) -> int:
+    """Number of ways to lay out `seeds` seeds in the 12 pits."""
+    return _BINOMIAL[seeds + _BARS][_BARS]
+
+
+def slice_offset(seeds: int) -> int:
+    """Where the slice for `seeds` seeds on the board starts in the file."""
+    return HEADER.size + sum(2 * slice_boards(k) for k in range(1, seeds))
+
+
+def board_rank(board) -> int:
+    """
+    Numbers the boards with the same total from 0 up, with no gaps: the pit
+    counts become the positions of 11 bars among the seeds, and a set of
+    positions has a unique rank in the combinatorial number system.
+    """
+    rank = 0
+    position = -1
+    for i in range(_BARS):
+        position += board[i] + 1
+        rank += _BINOMIAL[position][i + 1]
+    return rank
+
+
+def _boards(seeds: int, first: int, stop: int):
+    """Yields the boards with `seeds` seeds ranked first..stop-1, in rank order."""
+    # Unrank the first board into its bar positions (greedily, highest bar first).
+    bars = [0] * _BARS
+    rank, position = first, seeds + _BARS
+    for i in range(_BARS, 0, -1):
+        position -= 1
+        while _BINOMIAL[position][i] > rank:
+            position -= 1
+        bars[i - 1] = position
+        rank -= _BINOMIAL[position][i]
+    limit = seeds + _BARS
+    for _ in range(first, stop):
+        previous = -1
+        board = []
+        for bar in bars:
+            board.append(bar - previous - 1)
+            previous = bar
+        board.append(limit - previous - 1)
+        yield board
+        # The next set of bar positions in rank (colex) order.
+        for i in range(_BARS):
+            following = bars[i + 1] if i + 1 < _BARS else limit
+            if bars[i] + 1 < following:
+                bars[i] += 1
+                bars[:i] = range(i)
+                break
+
+
+def _signed(byte: int) -> int:
+    return byte - 256 if byte > 127 else byte
+
+
+def _expand_chunk(path: str, seeds: int, first: int, stop: int):
+    """
+    Runs in a worker: every move from the positions on boards ranked
+    first..stop-1. Moves that keep all the seeds on the board stay in this
+    slice and are returned as the index of the position they lead to; the
+    others (captures and game ends) are returned as their final value,
+    using the smaller slices already in the file. Values here are from
+    Player 1's point of view.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as solved:
+        move_counts = array("b")
+        successor_counts = array("b")
+        successors = array("i")
+        exit_counts = array("b")
+        exits = array("b")
+        for board in _boards(seeds, first, stop):
+            valid = any(board[0:6]) and any(board[6:12])
+            for player in (1, 2):
+                moves = AyoState(board, (0, 0), player).legal_moves() if valid else []
+                move_counts.append(len(moves))
+                in_slice = exit_total = 0
+                for move in moves:
+                    # With no seeds captured yet, the scores afterwards are what the move captures.
+                    child = apply_move(AyoState(board, (0, 0), player), move)
+                    gain = child.scores[0] - child.scores[1]
+                    remaining = sum(child.board)
+                    if remaining == seeds:
+                        successors.append(2 * board_rank(child.board) + child.player - 1)
+                        in_slice += 1
+                        continue
+                    if remaining:
+                        value = _signed(solved[slice_offset(remaining) + 2 * board_rank(child.board) + child.player - 1])
+                        gain += value if child.player == 1 else -value
+                    exits.append(gain)
+                    exit_total += 1
+                successor_counts.append(in_slice)
+                exit_counts.append(exit_total)
+        return (move_counts.tobytes(), successor_counts.tobytes(), successors.tobytes(),
+                exit_counts.tobytes(), exits.tobytes())
+
+
+def _solve_slice(seeds: int, move_counts, successor_counts, successors, exit_counts, exits) -> bytes:
+    """
+    Solves one slice, given every position's moves (see `_expand_chunk`).
+
+    For each threshold t, Player 1 can make sure of a value of at least t > 0
+    exactly when he can force the game into a move out of the slice worth at
+    least t (the attractor of those moves); since going round in circles is
+    worth 0, for t <= 0 it is Player 2 who has to force a move worth less
+    than t. Both sets only grow as t moves away from 0, so each is built up
+    incrementally, working back from the moves out of the slice through the
+    positions that lead to them, and every move is looked at once per pass.
+    """
+    positions = len(move_counts)
+    # Predecessors of every position within the slice, as a compressed sparse row.
+    predecessor_start = array("i", bytes(4 * (positions + 1)))
+    for target in successors:
+        predecessor_start[target + 1] += 1
+    for index in range(positions):
+        predecessor_start[index + 1] += predecessor_start[index]
+    predecessors = array("i", bytes(4 * len(successors)))
+    fill = array("i", predecessor_start[:-1])
+    exit_list = []
+    edge = exit_edge = 0
+    for index in range(positions):
+        for _ in range(successor_counts[index]):
+            target = successors[edge]
+            predecessors[fill[target]] = index
+            fill[target] += 1
+            edge += 1
+        for _ in range(exit_counts[index]):
+            exit_list.append((exits[exit_edge], index))
+            exit_edge += 1
+
+    values = array("b", bytes(positions))
+    solved = bytearray(positions)
+    # Pass 1 is Player 1 forcing values >= t (t = seeds..1), pass 2 is Player 2
+    # forcing values < t (t = 1-seeds..0); the forcing player needs any one good
+    # move, the other player must have nothing but good moves left.
+    for forcing_player, thresholds, good_exits, reached_value in (
+            (1, range(seeds, 0, -1), sorted((e for e in exit_list if e[0] > 0), reverse=True), lambda t: t),
+            (2, range(1 - seeds, 1), sorted(e for e in exit_list if e[0] < 0), lambda t: t - 1)):
+        needed = array("b", (0 if not move_counts[index] or solved[index]
+                             else 1 if index % 2 + 1 == forcing_player else move_counts[index]
+                             for index in range(positions)))
+        next_exit = 0
+        for t in thresholds:
+            reached = []
+            while next_exit < len(good_exits) and (good_exits[next_exit][0] >= t if forcing_player == 1
+                                                   else good_exits[next_exit][0] < t):
+                index = good_exits[next_exit][1]
+                next_exit += 1
+                if needed[index]:
+                    needed[index] -= 1
+                    if not needed[index]:
+                        reached.append(index)
+            value = reached_value(t)
+            while reached:
+                index = reached.pop()
+                values[index] = value
+                solved[index] = 1
+                for source in predecessors[predecessor_start[index]:predecessor_start[index + 1]]:
+                    if needed[source]:
+                        needed[source] -= 1
+                        if not needed[source]:
+                            reached.append(source)
+
+    # Store each value from the point of view of the player to move.
+    return bytes((value if index % 2 == 0 else -value) & 0xFF for index, value in enumerate(values))
+
+
+def solved_seeds(path: str) -> int:
+    """Returns how many seeds the tablebase at `path` is solved up to (0 if it doesn't exist)."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+    except FileNotFoundError:
+        return 0
+    if len(header) < HEADER.size:
+        return 0
+    magic, seeds = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an Ayo tablebase.")
+    return seeds
+
+
+def generate(path: str = TABLEBASE_FILE, max_seeds: int = 10, workers: int = None, progress=print):
+    """
+    Solves every position with up to `max_seeds` seeds on the board into the
+    file at `path`, one slice at a time, smallest first (each slice's moves
+    lead only into itself and smaller slices). A slice is complete once the
+    header says so; anything after that is redone, so an interrupted run
+    can simply be started again. Positions are expanded on `workers` processes.
+    """
+    done = solved_seeds(path)
+    if not done:
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, 0))
+    with ProcessPoolExecutor(workers) as pool:
+        for seeds in range(done + 1, max_seeds + 1):
+            start = time.perf_counter()
+            boards = slice_boards(seeds)
+            jobs = [pool.submit(_expand_chunk, path, seeds, first, min(first + CHUNK_BOARDS, boards))
+                    for first in range(0, boards, CHUNK_BOARDS)]
+            parts = [array(code) for code in "bbibb"]
+            for job in jobs:
+                for part, data in zip(parts, job.result()):
+                    part.frombytes(data)
+            data = _solve_slice(seeds, *parts)
+            with open(path, "r+b") as f:
+                f.seek(slice_offset(seeds))
+                f.write(data)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, seeds))
+                f.flush()
+                os.fsync(f.fileno())
+            if progress:
+                progress(f"{seeds} seeds: {2 * boards} positions solved in {time.perf_counter() - start:.1f} s")
+
+
+class Tablebase:
+    """Read-only access to a generated tablebase file, through a memory map."""
+    def __init__(self, path: str = TABLEBASE_FILE):
+        self.max_seeds = solved_seeds(path)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def open_if_exists(cls, path: str = TABLEBASE_FILE):
+        """Returns the tablebase at `path`, or None if there isn't one."""
+        return cls(path) if solved_seeds(path) else None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def probe(self, state: AyoState):
+        """
+        Returns the seeds the player to move will capture from `state` onwards,
+        minus the opponent's, with perfect play; or None if `state` has more
+        seeds on the board than the tablebase covers (or the game is over).
+        """
+        seeds = sum(state.board)
+        if not seeds or seeds > self.max_seeds:
+            return None
+        return _signed(self._map[slice_offset(seeds) + 2 * board_rank(state.board) + state.player - 1])
+
+    def best_move(self, state: AyoState):
+        """Returns a perfect move for `state`, or None if it isn't covered."""
+        if self.probe(state) is None:
+            return None
+        mover = state.player - 1
+        best_move, best_value = None, None
+        for move in state.legal_moves():
+            child = apply_move(state, move)
+            value = (child.scores[mover] - state.scores[mover]) - (child.scores[1 - mover] - state.scores[1 - mover])
+            if not child.game_over:
+                value -= self.probe(child)
+            if best_value is None or value > best_value:
+                best_move, best_value = move, value
+        return best_move
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the Ayo endgame tablebase.")
+    parser.add_argument("--seeds", type=int, default=10, help="Solve every position with up to this many seeds on the board.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: one per CPU).")
+    parser.add_argument("--output", default=TABLEBASE_FILE, help="Tablebase file to create or extend.")
+    args = parser.parse_args()
+    if not 1 <= args.seeds <= 48:
+        parser.error("--seeds must be between 1 and 48.")
+    done = solved_seeds(args.output)
+    if done >= args.seeds:
+        print(f"{args.output} is already solved up to {done} seeds.")
+        return
+    if done:
+        print(f"Resuming {args.output} from {done + 1} seeds.")
+    generate(args.output, args.seeds, args.workers)
+    print(f"{args.output}: {os.path.getsize(args.output)} bytes, solved up to {args.seeds} seeds.")
+
+
+if __name__ == "__main__":
+    main()
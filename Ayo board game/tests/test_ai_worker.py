@@ -0,0 +1,63 @@
+import threading
+import time
+
+from ai import AyoAI
+from ai_worker import AIWorker
+from game_logic import AyoState
+
+
+class FakeRoot:
+    """Stands in for a Tk root: `after` callbacks run when `run_pending` is called."""
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def run_pending(self, timeout=10):
+        deadline = time.perf_counter() + timeout
+        while self.pending and time.perf_counter() < deadline:
+            self.pending.pop(0)()
+            time.sleep(0.001)
+
+
+def test_move_is_delivered_on_the_tk_thread():
+    root = FakeRoot()
+    worker = AIWorker(root)
+    delivered = []
+    worker.request_move(AyoAI('hard'), AyoState(),
+                        lambda state, move, result: delivered.append((state, move, threading.current_thread())))
+    assert worker.thinking
+    root.run_pending()
+    [(state, move, thread)] = delivered
+    assert state == AyoState() and move in state.legal_moves()
+    assert thread is threading.current_thread()
+    assert not worker.thinking
+
+
+def test_cancel_stops_the_search_and_drops_its_move():
+    root = FakeRoot()
+    worker = AIWorker(root)
+    delivered = []
+    ai = AyoAI('expert', time_limit=30)
+    ai.book = ai.tablebase = None
+    worker.request_move(ai, AyoState(), lambda *args: delivered.append(args))
+    time.sleep(0.1)
+    start = time.perf_counter()
+    worker.cancel()
+    assert time.perf_counter() - start < 2
+    root.run_pending()
+    assert delivered == [] and not worker.thinking
+
+
+def test_a_new_request_replaces_pondering():
+    root = FakeRoot()
+    worker = AIWorker(root)
+    ai = AyoAI('expert', time_limit=0.1)
+    ai.book = ai.tablebase = None
+    worker.ponder(ai, AyoState())
+    assert not worker.thinking
+    delivered = []
+    worker.request_move(ai, AyoState(), lambda state, move, result: delivered.append(move))
+    root.run_pending()
+    assert len(delivered) == 1
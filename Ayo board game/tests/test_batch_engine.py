@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+
+from batch_engine import apply_moves, from_states, game_over, legal_moves, random_moves, random_playouts, to_states
+from game_logic import PITS, AyoState, apply_move
+
+
+def _random_states(rng, count):
+    # Positions from random games, plus random splits of the seeds with big pits
+    states = []
+    while len(states) < count:
+        state = AyoState()
+        while not state.game_over and len(states) < count:
+            states.append(state)
+            state = apply_move(state, rng.choice(state.legal_moves()))
+        board = [0] * PITS
+        for _ in range(rng.randrange(2, 49)):
+            board[rng.choice((rng.randrange(PITS), rng.randrange(3), 6 + rng.randrange(3)))] += 1
+        board[0] += 1
+        board[6] += 1
+        states.append(AyoState(board, (rng.randrange(10), rng.randrange(10)), rng.choice((1, 2))))
+    return states[:count]
+
+
+def test_apply_moves_matches_apply_move():
+    rng = random.Random(1)
+    states = _random_states(rng, 5000)
+    pits = [rng.choice(state.legal_moves()) for state in states]
+    batch = from_states(states)
+    result = to_states(*apply_moves(*batch, np.array(pits)))
+    assert result == [apply_move(state, pit) for state, pit in zip(states, pits)]
+    # The arrays given are not changed
+    assert to_states(*batch) == states
+
+
+def test_legal_moves_and_game_over_match_the_states():
+    rng = random.Random(2)
+    states = _random_states(rng, 1000) + [AyoState((0,) * PITS, (24, 24), 1)]
+    boards, _, players = from_states(states)
+    mask = legal_moves(boards, players)
+    assert [list(np.flatnonzero(row)) for row in mask] == [state.legal_moves() for state in states]
+    assert game_over(boards).tolist() == [state.game_over for state in states]
+
+
+def test_random_moves_are_legal():
+    states = _random_states(random.Random(3), 1000)
+    boards, _, players = from_states(states)
+    moves = random_moves(boards, players, np.random.default_rng(3))
+    assert all(move in state.legal_moves() for state, move in zip(states, moves.tolist()))
+
+
+def test_random_playouts_finish_with_all_seeds_captured():
+    states = _random_states(random.Random(4), 500)
+    boards, scores, players = from_states(states)
+    final = random_playouts(boards, scores, players, np.random.default_rng(4), max_plies=2000)
+    assert final.sum(axis=1).tolist() == [sum(state.board) + sum(state.scores) for state in states]
+
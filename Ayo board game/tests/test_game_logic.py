@@ -0,0 +1,101 @@
+import random
+
+from game_logic import PITS, AyoState, apply_move, is_valid_move
+
+
+class LegacyAyoGame:
+    """The rules as AyoGame played them before AyoState, sowing one seed at a time."""
+    def __init__(self, board, scores, player):
+        self.board = list(board)
+        self.player_scores = {1: scores[0], 2: scores[1]}
+        self.current_player = player
+        self.game_over = False
+
+    def make_move(self, pit_index):
+        seeds = self.board[pit_index]
+        self.board[pit_index] = 0
+        current_index = pit_index
+        while seeds > 0:
+            current_index = (current_index + 1) % 12
+            self.board[current_index] += 1
+            seeds -= 1
+
+        opponent_range = range(6, 12) if self.current_player == 1 else range(0, 6)
+        index = current_index
+        while index in opponent_range and self.board[index] in [2, 3]:
+            self.player_scores[self.current_player] += self.board[index]
+            self.board[index] = 0
+            index = (index - 1) % 12
+
+        p1_empty = all(seeds == 0 for seeds in self.board[0:6])
+        p2_empty = all(seeds == 0 for seeds in self.board[6:12])
+        if p1_empty or p2_empty:
+            self.game_over = True
+            if p1_empty:
+                self.player_scores[2] += sum(self.board[6:12])
+                self.board[6:12] = [0] * 6
+            if p2_empty:
+                self.player_scores[1] += sum(self.board[0:6])
+                self.board[0:6] = [0] * 6
+        else:
+            self.current_player = 2 if self.current_player == 1 else 1
+
+    def state(self):
+        return AyoState(self.board, (self.player_scores[1], self.player_scores[2]), self.current_player)
+
+
+def _random_state(rng):
+    # Any split of the 48 seeds, often with a pit big enough to sow a full lap
+    board = [0] * PITS
+    for _ in range(rng.randrange(2, 49)):
+        board[rng.choice((rng.randrange(PITS), rng.randrange(3)))] += 1
+    if not any(board[:6]) or not any(board[6:]):
+        board[0] += 1
+        board[6] += 1
+    return AyoState(board, (0, 0), rng.choice((1, 2)))
+
+
+def test_apply_move_matches_the_legacy_rules_over_random_games():
+    rng = random.Random(1)
+    for _ in range(300):
+        state = AyoState()
+        legacy = LegacyAyoGame(state.board, state.scores, state.player)
+        while not state.game_over:
+            pit = rng.choice(state.legal_moves())
+            state = apply_move(state, pit)
+            legacy.make_move(pit)
+            assert state == legacy.state()
+            assert state.game_over == legacy.game_over
+
+
+def test_apply_move_matches_the_legacy_rules_from_random_positions():
+    rng = random.Random(2)
+    for _ in range(2000):
+        state = _random_state(rng)
+        for pit in state.legal_moves():
+            legacy = LegacyAyoGame(state.board, state.scores, state.player)
+            legacy.make_move(pit)
+            assert apply_move(state, pit) == legacy.state()
+
+
+def test_apply_move_leaves_the_state_unchanged():
+    state = AyoState()
+    assert apply_move(state, 2) != state
+    assert state == AyoState()
+
+
+def test_state_bytes_round_trip():
+    rng = random.Random(3)
+    for _ in range(100):
+        state = _random_state(rng)
+        assert AyoState.from_bytes(state.to_bytes()) == state
+        assert len(state.to_bytes()) == 15
+
+
+def test_valid_moves():
+    state = AyoState((0, 1, 0, 0, 0, 0, 4, 4, 4, 4, 4, 4), (0, 0), 1)
+    assert state.legal_moves() == [1]
+    assert is_valid_move(state, 1)
+    assert not is_valid_move(state, 0)
+    assert not is_valid_move(state, 6)
+
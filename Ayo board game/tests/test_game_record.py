@@ -0,0 +1,74 @@
+import os
+import random
+
+import pytest
+
+from game_logic import AyoGame, AyoState, apply_move
+from game_record import GameRecord, append_game, load_game, read_games, replay, save_game
+
+
+def _random_game(rng, start=AyoState()):
+    # Played to the end, or stopped part way
+    state, moves, length = start, [], rng.randrange(1, 200)
+    while not state.game_over and len(moves) < length:
+        moves.append(rng.choice(state.legal_moves()))
+        state = apply_move(state, moves[-1])
+    return moves, state
+
+
+def test_games_round_trip(tmp_path):
+    path = os.path.join(tmp_path, "games.ayo")
+    rng = random.Random(1)
+    games = []
+    for _ in range(50):
+        start = AyoState() if rng.random() < 0.5 else apply_move(AyoState(), rng.randrange(6))
+        moves, end = _random_game(rng, start)
+        append_game(path, start, moves)
+        games.append((start, moves, end))
+    records = list(read_games(path))
+    assert [(record.start, record.moves) for record in records] == [(start, moves) for start, moves, _ in games]
+    assert [list(replay(record))[-1] for record in records] == [end for _, _, end in games]
+
+
+def test_save_and_load_one_game(tmp_path):
+    path = os.path.join(tmp_path, "game.ayo")
+    save_game(path, AyoState(), [2, 8, 1])
+    save_game(path, AyoState(), [3])
+    assert load_game(path) == (AyoState(), [3])
+
+
+def test_bad_files_are_rejected(tmp_path):
+    path = os.path.join(tmp_path, "game.ayo")
+    with open(path, "wb") as f:
+        f.write(b"not a game record")
+    with pytest.raises(ValueError):
+        load_game(path)
+
+    save_game(path, AyoState(), [2, 8, 1])
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+    with pytest.raises(ValueError, match="middle of a game"):
+        load_game(path)
+
+
+def test_replay_rejects_an_invalid_move():
+    with pytest.raises(ValueError, match="Move 2"):
+        list(replay(GameRecord(AyoState(), [2, 2])))
+
+
+def test_undo_and_redo():
+    game = AyoGame()
+    assert game.make_move(2) and game.make_move(8)
+    after = game.state
+    assert not game.make_move(8)
+    assert game.undo() and game.undo() and not game.undo()
+    assert game.state == AyoState()
+    assert game.redo() and game.redo() and not game.redo()
+    assert game.state == after and game.moves == [2, 8]
+
+
+def test_redo_rejects_an_invalid_loaded_move():
+    game = AyoGame()
+    game.load(AyoState(), [7])
+    with pytest.raises(ValueError):
+        game.redo()
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from game_logic import AyoState, apply_move
+from mcts import MCTSSearch
+
+
+def test_search_keeps_to_its_time_limit():
+    search = MCTSSearch(seed=0)
+    state = AyoState()
+    for time_limit in (0.02, 0.05, 0.2):
+        start = time.perf_counter()
+        result = search.search(state, time_limit)
+        assert time.perf_counter() - start < time_limit + 0.01
+        assert result.move in state.legal_moves()
+
+
+def test_search_stops_soon_after_stop_is_set():
+    stop = threading.Event()
+    threading.Timer(0.05, stop.set).start()
+    start = time.perf_counter()
+    MCTSSearch(seed=0).search(AyoState(), 5.0, stop=stop)
+    assert time.perf_counter() - start < 0.1
+
+
+def test_tree_stays_consistent_after_given_up_rounds():
+    # Rounds cut short by the deadline are undone: no child is left unvisited
+    search = MCTSSearch(seed=1)
+    state = AyoState()
+    for _ in range(6):
+        result = search.search(state, 0.03)
+        stack = [search.root]
+        while stack:
+            node = stack.pop()
+            for child in node.children:
+                assert child.visits > 0
+                assert child.move not in node.untried
+            stack.extend(node.children)
+        state = apply_move(state, result.move)
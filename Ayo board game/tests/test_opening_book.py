@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from game_logic import AyoState, apply_move
+from opening_book import OpeningBook, book_positions, build
+from search import AlphaBetaSearch
+
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp("book"), "opening.book")
+    build(path, plies=2, depth=3, workers=1, progress=None)
+    book = OpeningBook(path)
+    yield book
+    book.close()
+
+
+def test_book_positions():
+    assert book_positions(0) == [AyoState()]
+    positions = book_positions(2)
+    assert len(positions) == len(set(positions)) == 1 + 6 + 36
+    assert all(not state.game_over for state in positions)
+
+
+def test_every_position_has_the_searched_move(book):
+    assert (book.plies, book.depth) == (2, 3)
+    for state in book_positions(2):
+        result = AlphaBetaSearch().search(state, float("inf"), 3)
+        assert book.probe(state) == (result.move, result.value)
+        assert book.best_move(state) == result.move
+
+
+def test_positions_outside_the_book(book):
+    state = AyoState()
+    for move in (0, 6, 1):
+        state = apply_move(state, move)
+    assert book.probe(state) is None
+    assert book.best_move(state) is None
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = os.path.join(tmp_path, "not.book")
+    with open(path, "wb") as f:
+        f.write(bytes(64))
+    with pytest.raises(ValueError):
+        OpeningBook(path)
+    assert OpeningBook.open_if_exists(os.path.join(tmp_path, "missing.book")) is None
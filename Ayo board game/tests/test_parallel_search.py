@@ -0,0 +1,42 @@
+import random
+import threading
+
+import pytest
+
+from game_logic import AyoState, apply_move
+from parallel_search import ParallelSearch
+from search import AlphaBetaSearch
+
+
+@pytest.fixture(scope="module")
+def parallel():
+    search = ParallelSearch(workers=2)
+    yield search
+    search.close()
+
+
+def test_values_match_the_single_process_search(parallel):
+    rng = random.Random(1)
+    for _ in range(8):
+        state = AyoState()
+        for _ in range(rng.randrange(30)):
+            state = apply_move(state, rng.choice(state.legal_moves()))
+            if state.game_over:
+                state = AyoState()
+        if len(state.legal_moves()) < 2:
+            continue
+        result = parallel.search(state, time_limit=60, max_depth=4)
+        expected = AlphaBetaSearch().search(state, time_limit=60, max_depth=4)
+        assert (result.depth, result.value) == (expected.depth, expected.value)
+        assert result.line[0] == result.move
+        assert AlphaBetaSearch().move_value(state, result.move, 4) == result.value
+
+
+def test_stop_ends_the_search_early(parallel):
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+    result = parallel.search(AyoState(), time_limit=60, stop=stop)
+    assert result.seconds < 5
+    assert result.move in AyoState().legal_moves()
+    # The pool is still usable afterwards
+    assert parallel.search(AyoState(), time_limit=60, max_depth=2).depth == 2
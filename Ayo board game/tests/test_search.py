@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from game_logic import AyoState, apply_move
+from search import AlphaBetaSearch, evaluate, zobrist_hash
+
+
+def _child_value(mover, child, depth):
+    return evaluate(child, mover) if child.game_over else -_minimax(child, depth)
+
+
+def _minimax(state, depth):
+    # Plain negamax without pruning or a table: the value the search must match
+    if depth == 0:
+        return evaluate(state, state.player)
+    return max(_child_value(state.player, apply_move(state, move), depth - 1) for move in state.legal_moves())
+
+
+def _random_positions(rng, count):
+    positions = []
+    while len(positions) < count:
+        state = AyoState()
+        for _ in range(rng.randrange(40)):
+            state = apply_move(state, rng.choice(state.legal_moves()))
+            if state.game_over:
+                break
+        if not state.game_over and len(state.legal_moves()) > 1:
+            positions.append(state)
+    return positions
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4, 5])
+def test_search_value_matches_minimax(depth):
+    for state in _random_positions(random.Random(depth), 30):
+        result = AlphaBetaSearch().search(state, time_limit=60, max_depth=depth)
+        assert result.depth == depth
+        assert result.value == _minimax(state, depth)
+        assert _child_value(state.player, apply_move(state, result.move), depth - 1) == result.value
+
+
+def test_table_kept_between_moves_gives_the_same_values():
+    search = AlphaBetaSearch()
+    for state in _random_positions(random.Random(6), 30):
+        assert search.search(state, time_limit=60, max_depth=4).value == _minimax(state, 4)
+
+
+def test_search_stops_when_asked():
+    class Stopped:
+        def is_set(self):
+            return True
+
+    result = AlphaBetaSearch().search(AyoState(), time_limit=60, stop=Stopped())
+    assert result.move in AyoState().legal_moves()
+    assert result.depth < 10
+
+
+def test_zobrist_hash_depends_on_the_whole_state():
+    state = AyoState()
+    assert zobrist_hash(state) == zobrist_hash(AyoState())
+    assert zobrist_hash(state) != zobrist_hash(AyoState(player=2))
+    assert zobrist_hash(state) != zobrist_hash(AyoState(scores=(1, 0)))
+    assert zobrist_hash(apply_move(state, 0)) != zobrist_hash(apply_move(state, 1))
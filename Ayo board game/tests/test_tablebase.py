@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from game_logic import PITS, AyoState, apply_move
+from tablebase import Tablebase, _boards, board_rank, generate, slice_boards, solved_seeds
+
+MAX_SEEDS = 5
+
+
+@pytest.fixture(scope="module")
+def path(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp("tablebase"), "endgame.tb")
+    generate(path, MAX_SEEDS, workers=1, progress=None)
+    return path
+
+
+@pytest.fixture(scope="module")
+def tablebase(path):
+    tablebase = Tablebase(path)
+    yield tablebase
+    tablebase.close()
+
+
+def _positions(seeds):
+    for board in _boards(seeds, 0, slice_boards(seeds)):
+        if any(board[:6]) and any(board[6:]):
+            for player in (1, 2):
+                yield AyoState(board, (0, 0), player)
+
+
+def _gain(state, child):
+    mover = state.player - 1
+    return child.scores[mover] - child.scores[1 - mover]
+
+
+def _solve(max_seeds):
+    # Reference values by value iteration: play with a horizon of k moves
+    # (unfinished games scoring 0) for growing k until nothing changes. Seeds
+    # only leave the board by capture, so once the values stop changing they
+    # are those of play with no horizon, where going round forever scores 0.
+    # Seeds already captured don't matter, so positions are (board, player).
+    children = {}
+    for seeds in range(1, max_seeds + 1):
+        for state in _positions(seeds):
+            moves = [apply_move(state, move) for move in state.legal_moves()]
+            children[state.board, state.player] = [(_gain(state, child), (child.board, child.player))
+                                                   for child in moves]
+    values = dict.fromkeys(children, 0)
+    while True:
+        new_values = {position: max(gain - values.get(child, 0) for gain, child in moves)
+                      for position, moves in children.items()}
+        if new_values == values:
+            return values
+        values = new_values
+
+
+def test_board_rank_numbers_each_slice_without_gaps():
+    for seeds in range(1, 5):
+        ranks = [board_rank(board) for board in _boards(seeds, 0, slice_boards(seeds))]
+        assert ranks == list(range(slice_boards(seeds)))
+    board = [0] * PITS
+    board[11] = 48
+    assert board_rank(board) == 0
+    board.reverse()
+    assert board_rank(board) == slice_boards(48) - 1
+
+
+def test_values_agree_with_the_best_move(tablebase):
+    assert tablebase.max_seeds == MAX_SEEDS
+    for seeds in range(1, MAX_SEEDS + 1):
+        for state in _positions(seeds):
+            values = []
+            for move in state.legal_moves():
+                child = apply_move(state, move)
+                values.append(_gain(state, child) - (0 if child.game_over else tablebase.probe(child)))
+            assert tablebase.probe(state) == max(values)
+            child = apply_move(state, tablebase.best_move(state))
+            assert _gain(state, child) - (0 if child.game_over else tablebase.probe(child)) == max(values)
+
+
+def test_values_agree_with_value_iteration(tablebase):
+    for (board, player), value in _solve(4).items():
+        assert tablebase.probe(AyoState(board, (0, 0), player)) == value
+
+
+def test_positions_outside_the_tablebase(tablebase):
+    assert tablebase.probe(AyoState()) is None
+    assert tablebase.best_move(AyoState()) is None
+
+
+def test_generation_resumes(path, tmp_path):
+    resumed = os.path.join(tmp_path, "endgame.tb")
+    generate(resumed, 3, workers=1, progress=None)
+    assert solved_seeds(resumed) == 3
+    generate(resumed, MAX_SEEDS, workers=1, progress=None)
+    with open(path, "rb") as f, open(resumed, "rb") as g:
+        assert f.read() == g.read()
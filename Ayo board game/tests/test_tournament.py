@@ -0,0 +1,27 @@
+import math
+
+import pytest
+
+from tournament import BASE_ELO, elo_ratings
+
+
+def _result(first, second, winner):
+    return {"players": (first, second), "winner": winner}
+
+
+@pytest.mark.parametrize("wins, losses, draws", [(3, 1, 0), (10, 0, 0), (0, 0, 4), (5, 2, 3)])
+def test_two_player_ratings_match_the_score_with_one_virtual_draw(wins, losses, draws):
+    results = ([_result("a", "b", 1)] * wins + [_result("b", "a", 1)] * losses
+               + [_result("a", "b", 0)] * draws)
+    ratings = elo_ratings(["a", "b"], results)
+    # One virtual draw: half a point for each player, over one extra game
+    points = wins + draws / 2 + 0.5
+    games = wins + losses + draws + 1
+    expected_difference = 400 * math.log10(points / (games - points))
+    assert ratings["a"] - ratings["b"] == pytest.approx(expected_difference, abs=0.2)
+    assert (ratings["a"] + ratings["b"]) / 2 == pytest.approx(BASE_ELO, abs=0.1)
+
+
+def test_games_against_itself_are_ignored():
+    ratings = elo_ratings(["a", "b"], [_result("a", "a", 1)] * 5)
+    assert ratings["a"] == ratings["b"] == BASE_ELO
@@ -0,0 +1,244 @@
+"""
+Headless tournaments between Ayo AIs, with Elo ratings, for comparing the
+difficulties (and catching strength or speed regressions) without the GUI.
+
+Run from this directory, for example:
+
+    python tournament.py easy hard expert:0.1 master:0.2 --games 100 --output report.json
+
+Each player is an AI difficulty, optionally with its thinking time per move
+in seconds after a colon. Every pair of players plays --games games, taking
+turns to move first, spread over a pool of processes.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai import AyoAI
+from game_logic import AyoGame
+from game_record import append_game
+
+# A game still going after this many moves is stopped and counted as a draw
+# (with perfect endgame play, both sides may be happy to go round in circles).
+MAX_PLIES = 400
+
+# Ratings are anchored so the players average this.
+BASE_ELO = 1500
+
+
+def parse_player(spec: str):
+    """Splits a player such as "expert:0.1" into its difficulty and time limit (None for the default)."""
+    difficulty, _, seconds = spec.partition(":")
+    return difficulty, float(seconds) if seconds else None
+
+
+def play_game(first: str, second: str, seed: int, random_plies: int = 0, max_plies: int = MAX_PLIES) -> dict:
+    """
+    Plays one game between the players `first` (Player 1) and `second`,
+    after `random_plies` random opening moves chosen with `seed`, so that
+    games between the same players differ. Returns the result and, for
+    each player, its moves, thinking time, and positions searched.
+    """
+    random.seed(seed)
+    game = AyoGame()
+    for _ in range(random_plies):
+        if game.game_over:
+            break
+        game.make_move(random.choice(game.state.legal_moves()))
+
+    ais = {}
+    for player, spec in ((1, first), (2, second)):
+        difficulty, time_limit = parse_player(spec)
+        ais[player] = AyoAI(difficulty, time_limit=time_limit)
+    stats = {player: {"moves": 0, "seconds": 0.0, "nodes": 0, "simulations": 0, "search_seconds": 0.0}
+             for player in (1, 2)}
+    plies = 0
+    while not game.game_over and plies < max_plies:
+        player = game.current_player
+        start = time.perf_counter()
+        move = ais[player].choose_move(game)
+        elapsed = time.perf_counter() - start
+        game.make_move(move)
+        plies += 1
+        stats[player]["moves"] += 1
+        stats[player]["seconds"] += elapsed
+        result = ais[player].last_search
+        if result is not None:
+            stats[player]["nodes"] += result.nodes
+            # MCTS results also count their random playouts.
+            stats[player]["simulations"] += getattr(result, "simulations", 0)
+            stats[player]["search_seconds"] += result.seconds
+            ais[player].last_search = None
+    for ai in ais.values():
+        ai.close()
+
+    return {
+        "players": (first, second),
+        "winner": game.get_winner() if game.game_over else 0,
+        "scores": game.state.scores,
+        "plies": plies,
+        "finished": game.game_over,
+        "stats": (stats[1], stats[2]),
+        "start": game.start,
+        "moves": game.moves,
+    }
+
+
+def elo_ratings(players: list, results: list, iterations: int = 2000) -> dict:
+    """
+    Fits Elo ratings to the game results (a win scores 1, a draw 1/2): the
+    ratings for which every player's expected score over its games equals
+    its actual score. Each pair is also given one virtual draw, so a player
+    that won every game still gets a finite rating.
+    """
+    scores = {pair: [0.5, 1] for pair in itertools.combinations(sorted(players), 2)}
+    for result in results:
+        first, second = result["players"]
+        if first == second:
+            continue
+        pair = tuple(sorted((first, second)))
+        points = {1: 1.0, 2: 0.0, 0: 0.5}[result["winner"]]
+        scores[pair][0] += points if pair[0] == first else 1 - points
+        scores[pair][1] += 1
+
+    ratings = dict.fromkeys(players, 0.0)
+    for _ in range(iterations):
+        step = dict.fromkeys(players, 0.0)
+        for (a, b), (points, games) in scores.items():
+            expected = games / (1 + 10 ** ((ratings[b] - ratings[a]) / 400))
+            step[a] += points - expected
+            step[b] -= points - expected
+        change = 0.0
+        for player in players:
+            ratings[player] += 16 * step[player]
+            change = max(change, abs(step[player]))
+        if change < 1e-6:
+            break
+    mean = sum(ratings.values()) / len(ratings)
+    return {player: round(BASE_ELO + rating - mean, 1) for player, rating in ratings.items()}
+
+
+def run_tournament(players: list, games: int, workers: int = None, random_plies: int = 2, seed: int = 0,
+                   progress=print, record_path: str = None) -> dict:
+    """
+    Plays `games` games between every pair of `players` on `workers`
+    processes (each player moving first in half of them) and returns the
+    report: each player's record, win rate, Elo, average thinking time per
+    move and positions searched per second, and the result of each pairing.
+    With `record_path`, every game is also appended to that game record file.
+    """
+    schedule = []
+    for a, b in itertools.combinations(players, 2):
+        for index in range(games):
+            schedule.append((a, b) if index % 2 == 0 else (b, a))
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(workers) as pool:
+        jobs = [pool.submit(play_game, first, second, seed + index, random_plies)
+                for index, (first, second) in enumerate(schedule)]
+        for job in as_completed(jobs):
+            results.append(job.result())
+            if record_path:
+                append_game(record_path, results[-1]["start"], results[-1]["moves"])
+            if progress and len(results) % max(1, len(schedule) // 10) == 0:
+                progress(f"{len(results)}/{len(schedule)} games played")
+    elapsed = time.perf_counter() - start
+
+    totals = {player: {"games": 0, "wins": 0, "losses": 0, "draws": 0, "moves": 0, "seconds": 0.0,
+                       "nodes": 0, "simulations": 0, "search_seconds": 0.0} for player in players}
+    pairings = {f"{a} vs {b}": {a: 0, b: 0, "draws": 0} for a, b in itertools.combinations(players, 2)}
+    for result in results:
+        first, second = result["players"]
+        for side, (player, stats) in enumerate(zip(result["players"], result["stats"]), start=1):
+            total = totals[player]
+            total["games"] += 1
+            for key in ("moves", "seconds", "nodes", "simulations", "search_seconds"):
+                total[key] += stats[key]
+            if result["winner"] == 0:
+                total["draws"] += 1
+            elif result["winner"] == side:
+                total["wins"] += 1
+            else:
+                total["losses"] += 1
+        pairing = pairings.get(f"{first} vs {second}") or pairings[f"{second} vs {first}"]
+        if result["winner"] == 0:
+            pairing["draws"] += 1
+        else:
+            pairing[result["players"][result["winner"] - 1]] += 1
+
+    ratings = elo_ratings(players, results)
+    report_players = {}
+    for player, total in totals.items():
+        report_players[player] = {
+            "games": total["games"],
+            "wins": total["wins"],
+            "losses": total["losses"],
+            "draws": total["draws"],
+            "win_rate": round((total["wins"] + total["draws"] / 2) / max(total["games"], 1), 4),
+            "elo": ratings[player],
+            "average_move_seconds": round(total["seconds"] / max(total["moves"], 1), 6),
+            # Only moves that were searched count here (not easy, hard or tablebase moves).
+            "nodes_per_second": round(total["nodes"] / total["search_seconds"]) if total["search_seconds"] else None,
+            "simulations_per_second": (round(total["simulations"] / total["search_seconds"])
+                                       if total["simulations"] else None),
+        }
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "games_per_pairing": games,
+        "random_plies": random_plies,
+        "seed": seed,
+        "workers": workers or os.cpu_count(),
+        "games": len(results),
+        "unfinished_games": sum(not result["finished"] for result in results),
+        "seconds": round(elapsed, 2),
+        "games_per_second": round(len(results) / elapsed, 2),
+        "players": report_players,
+        "pairings": pairings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a tournament between Ayo AIs and rate them.")
+    parser.add_argument("players", nargs="+", help="AI difficulties, optionally with seconds per move, e.g. expert:0.1")
+    parser.add_argument("--games", type=int, default=20, help="Games between each pair of players.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: one per CPU).")
+    parser.add_argument("--random-plies", type=int, default=2, help="Random opening moves, so games differ.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random opening moves.")
+    parser.add_argument("--output", help="Write the JSON report to this file (default: print it).")
+    parser.add_argument("--record", help="Append every game to this game record file (see game_record.py).")
+    args = parser.parse_args()
+    if len(set(args.players)) < 2:
+        parser.error("A tournament needs at least two different players.")
+    for spec in args.players:
+        difficulty, seconds = parse_player(spec)
+        if difficulty not in ("easy", "hard", "expert", "master", "mcts") or (seconds is not None and seconds <= 0):
+            parser.error(f"Unknown player {spec!r}.")
+
+    players = list(dict.fromkeys(args.players))
+    report = run_tournament(players, args.games, args.workers, args.random_plies, args.seed, record_path=args.record)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Report written to {args.output}")
+    else:
+        print(text)
+    for player, stats in sorted(report["players"].items(), key=lambda item: -item[1]["elo"]):
+        if stats["simulations_per_second"]:
+            rate = f"{stats['simulations_per_second']:,} simulations/sec"
+        elif stats["nodes_per_second"]:
+            rate = f"{stats['nodes_per_second']:,} nodes/sec"
+        else:
+            rate = "-"
+        print(f"  {player:>14}: Elo {stats['elo']:7.1f}, {stats['win_rate']:.0%} of points, "
+              f"{stats['average_move_seconds'] * 1000:.1f} ms/move, {rate}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,81 @@
-import random
+"""
+Batch password generation from the operating system's CSPRNG.
+
+Run from this directory to print passwords, one per line, for example:
+
+    python password_generator.py --count 1000 --length 16 > passwords.txt
+    python password_generator.py --count 50 --no-special
+"""
+import argparse
+import secrets
 import string
+import sys
+from itertools import combinations
+
+# Passwords generated per block of random bytes
+BLOCK_PASSWORDS = 8192
+
+
+def _character_classes(use_upper, use_numbers, use_special):
+    classes = [string.ascii_lowercase]
+    if use_upper:
+        classes.append(string.ascii_uppercase)
+    if use_numbers:
+        classes.append(string.digits)
+    if use_special:
+        classes.append(string.punctuation)
+    return classes
+
+
+def generate_passwords(count, length=12, use_upper=True, use_numbers=True, use_special=True):
+    """
+    Generates many random passwords at once with the given criteria.
+    Random bytes come from the secrets module in large blocks and are mapped to
+    characters with bytes.translate; bytes that would make some characters more
+    likely than others are dropped (rejection sampling). Passwords missing any of
+    the selected character types are dropped too, so each one contains at least
+    one of every type.
+    :param count: Number of passwords to generate
+    :param length: Length of each password
+    :param use_upper: Include uppercase letters
+    :param use_numbers: Include digits
+    :param use_special: Include special characters
+    :return: List of randomly generated password strings
+    """
+    if length < 4:
+        raise ValueError("Password must be at least 4 characters long.")
+
+    classes = _character_classes(use_upper, use_numbers, use_special)
+    chars = "".join(classes).encode('ascii')
+    limit = 256 - 256 % len(chars)
+    char_table = bytes(chars[byte % len(chars)] for byte in range(limit)) + bytes(256 - limit)
+    rejected_bytes = bytes(range(limit, 256))
+    class_table = bytearray(256)
+    for index, members in enumerate(classes):
+        for char in members.encode('ascii'):
+            class_table[char] = index
+
+    # Expected fraction of random bytes kept, and of passwords that contain
+    # every class (by inclusion-exclusion), used to size each block (the same
+    # sizing as the account manager's PasswordGenerator)
+    sizes = [len(members) for members in classes]
+    policy_rate = sum((-1) ** r * ((len(chars) - sum(missing)) / len(chars)) ** length
+                      for r in range(len(sizes) + 1) for missing in combinations(sizes, r))
+    bytes_per_password = length / (limit / 256) / policy_rate
+
+    passwords = []
+    while len(passwords) < count:
+        wanted = min(count - len(passwords), BLOCK_PASSWORDS)
+        # A little over what should be needed; any shortfall is made up by the next block
+        block = secrets.token_bytes(int(wanted * bytes_per_password * 1.05) + 64).translate(
+            char_table, rejected_bytes)
+        block_classes = block.translate(class_table)
+        text = block.decode('ascii')
+        found = [text[start:start + length] for start in range(0, len(block) - length + 1, length)
+                 if len(set(block_classes[start:start + length])) == len(classes)]
+        passwords.extend(found[:wanted])
+    return passwords
+
 
 def generate_password(length=12, use_upper=True, use_numbers=True, use_special=True):
     """
@@ -10,17 +86,27 @@ def generate_password(length=12, use_upper=True, use_numbers=True, use_special=T
     :param use_special: Include special characters
     :return: Randomly generated password string
     """
-    if length < 4:
-        raise ValueError("Password must be at least 4 characters long.")
+    return generate_passwords(1, length, use_upper, use_numbers, use_special)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate random passwords, one per line.")
+    parser.add_argument("--count", type=int, default=1, help="Number of passwords to generate.")
+    parser.add_argument("--length", type=int, default=12, help="Length of each password.")
+    parser.add_argument("--no-upper", dest="upper", action="store_false", help="Leave out uppercase letters.")
+    parser.add_argument("--no-numbers", dest="numbers", action="store_false", help="Leave out digits.")
+    parser.add_argument("--no-special", dest="special", action="store_false", help="Leave out special characters.")
+    args = parser.parse_args()
+
+    try:
+        # In blocks, so a large count never has to be held in memory at once
+        for first in range(0, args.count, BLOCK_PASSWORDS):
+            block = generate_passwords(min(BLOCK_PASSWORDS, args.count - first), args.length,
+                                       args.upper, args.numbers, args.special)
+            sys.stdout.write("\n".join(block) + "\n")
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
 
-    chars = string.ascii_lowercase
-    if use_upper:
-        chars += string.ascii_uppercase
-    if use_numbers:
-        chars += string.digits
-    if use_special:
-        chars += string.punctuation
 
-    # Generate password from the constructed character pool
-    password = ''.join(random.choice(chars) for _ in range(length))
-    return password
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The project's modules import each other by name, as when run from their folder.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
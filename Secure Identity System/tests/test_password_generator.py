@@ -0,0 +1,44 @@
+import string
+
+import pytest
+
+import password_generator
+from password_generator import generate_password, generate_passwords
+
+
+def test_every_password_has_every_class():
+    passwords = generate_passwords(2000, length=4)
+    assert len(passwords) == 2000
+    for password in passwords:
+        assert len(password) == 4
+        assert any(c in string.ascii_lowercase for c in password)
+        assert any(c in string.ascii_uppercase for c in password)
+        assert any(c in string.digits for c in password)
+        assert any(c in string.punctuation for c in password)
+
+
+def test_left_out_classes_never_appear():
+    for password in generate_passwords(500, length=8, use_upper=False, use_special=False):
+        assert set(password) <= set(string.ascii_lowercase + string.digits)
+        assert any(c in string.digits for c in password)
+
+
+def test_one_draw_per_block(monkeypatch):
+    # Blocks are sized from the policy's acceptance rate, so even short
+    # passwords, most of which miss a class, rarely need a second draw
+    draws = []
+    token_bytes = password_generator.secrets.token_bytes
+
+    def counting_token_bytes(n):
+        draws.append(n)
+        return token_bytes(n)
+
+    monkeypatch.setattr(password_generator.secrets, "token_bytes", counting_token_bytes)
+    count = 5 * password_generator.BLOCK_PASSWORDS
+    assert len(generate_passwords(count, length=4)) == count
+    assert len(draws) <= 6
+
+
+def test_short_length_rejected():
+    with pytest.raises(ValueError):
+        generate_password(3)
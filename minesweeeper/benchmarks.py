@@ -0,0 +1,170 @@
+"""
+Benchmarks for the minesweeper board model.
+
+Run from this directory, for example:
+
+    python benchmarks.py lookup --sizes 100 1000
+    python benchmarks.py flood --sizes 300 1000
+    python benchmarks.py solve --sizes 9 16 30 --games 2000
+
+None of these need a display.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from engine import Game
+from solver import Solver
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class _LegacyCell:
+    # The previous way of finding cells: search the list of all cells for
+    # each neighbour's x and y, and count the mines on every click
+    def __init__(self, x, y, cells):
+        self.x = x
+        self.y = y
+        self.is_mine = False
+        self.cells = cells
+
+    def get_cell_by_axis(self, x, y):
+        for cell in self.cells:
+            if cell.x == x and cell.y == y:
+                return cell
+
+    def surrounded_cells_mines_length(self):
+        cells = [self.get_cell_by_axis(self.x + dx, self.y + dy)
+                 for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+        return sum(cell.is_mine for cell in cells if cell is not None)
+
+
+def make_board(size, mines, seed=0):
+    # A size x size board with `mines` mines in random places
+    board = Board(size, size)
+    board.place_mines(random.Random(seed).sample(range(board.size), mines))
+    return board
+
+
+def bench_lookup(sizes, clicks, legacy_clicks):
+    """Board setup time and click latency (neighbours and mine count) per board size."""
+    for size in sizes:
+        mines = size * size // 4
+        board, setup_time = _timed(make_board, size, mines)
+        picks = random.Random(1).sample(range(board.size), min(clicks, board.size))
+        _, click_time = _timed(lambda: [(board.neighbors(index), board.adjacent_mines[index]) for index in picks])
+        print(f"{size}x{size} board, {mines} mines")
+        print(f"  setup (place mines, count neighbours): {setup_time * 1000:.1f} ms")
+        print(f"  click lookup: {click_time / len(picks) * 1e6:.2f} us per cell")
+
+        if legacy_clicks:
+            cells = []
+            cells.extend(_LegacyCell(x, y, cells) for x in range(size) for y in range(size))
+            for index in range(board.size):
+                if board.mines[index]:
+                    x, y = board.position(index)
+                    cells[x * size + y].is_mine = True
+            legacy_picks = [cells[index] for index in picks[:legacy_clicks]]
+            _, legacy_time = _timed(lambda: [cell.surrounded_cells_mines_length() for cell in legacy_picks])
+            print(f"  click lookup, scanning all cells: {legacy_time / len(legacy_picks) * 1e6:,.0f} us per cell "
+                  f"({legacy_time / len(legacy_picks) / (click_time / len(picks)):,.0f}x slower)")
+
+
+def _recursive_reveal(board, index):
+    # A naive flood fill that calls itself for every empty neighbour
+    if board.opened[index]:
+        return
+    board.opened[index] = 1
+    if not board.adjacent_mines[index]:
+        for neighbor in board.neighbors(index):
+            _recursive_reveal(board, neighbor)
+
+
+def bench_flood(sizes, density):
+    """Time to reveal the empty region around one click, on empty and sparsely mined boards."""
+    for size in sizes:
+        for mines in (0, int(size * size * density)):
+            board = make_board(size, mines)
+            # Click the first empty cell
+            start = board.adjacent_mines.find(0) if mines else 0
+            while board.mines[start]:
+                start = board.adjacent_mines.find(0, start + 1)
+            opened, reveal_time = _timed(board.reveal, start)
+            print(f"{size}x{size} board, {mines} mines: revealed {len(opened):,} cells in "
+                  f"{reveal_time * 1000:.1f} ms ({len(opened) / reveal_time:,.0f} cells/sec)")
+            try:
+                _recursive_reveal(make_board(size, mines), start)
+            except RecursionError:
+                print("  (a recursive flood fill hits Python's recursion limit on this board)")
+
+
+def _play_games(size, mines, seeds):
+    # Solve the games with these seeds; (won, guesses, seconds) for each
+    results = []
+    for seed in seeds:
+        game = Game(size, size, mines, seed)
+        solver = Solver(game)
+        start = time.perf_counter()
+        won = solver.play()
+        results.append((won, solver.guesses, time.perf_counter() - start))
+    return results
+
+
+def bench_solve(sizes, density, games, workers, chunk):
+    """Win rate and solve time of the solver on seeded games of each board size, over a process pool."""
+    print(f"{games} games per size, {workers or os.cpu_count()} worker processes")
+    with ProcessPoolExecutor(workers) as pool:
+        for size in sizes:
+            mines = max(1, int(size * size * density))
+            start = time.perf_counter()
+            seeds = [range(first, min(first + chunk, games)) for first in range(0, games, chunk)]
+            batches = pool.map(_play_games, [size] * len(seeds), [mines] * len(seeds), seeds)
+            results = [result for batch in batches for result in batch]
+            elapsed = time.perf_counter() - start
+            times = [seconds for _, _, seconds in results]
+            print(f"{size}x{size} board, {mines} mines: won {sum(won for won, _, _ in results) / len(results):.1%}, "
+                  f"{statistics.mean(guesses for _, guesses, _ in results):.2f} guesses per game, "
+                  f"solve time mean {statistics.mean(times) * 1000:.2f} ms, median {statistics.median(times) * 1000:.2f} ms, "
+                  f"max {max(times) * 1000:.1f} ms ({len(results) / elapsed:,.0f} games/sec)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minesweeper board benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    lookup_parser = subparsers.add_parser("lookup", help="Board setup time and click latency.")
+    lookup_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="Board sizes (cells per side).")
+    lookup_parser.add_argument("--clicks", type=int, default=100000, help="Cells to look up per board.")
+    lookup_parser.add_argument("--legacy-clicks", type=int, default=5,
+                               help="Cells to look up the old way, by scanning every cell (0 to skip).")
+
+    flood_parser = subparsers.add_parser("flood", help="Flood reveal of large empty regions.")
+    flood_parser.add_argument("--sizes", type=int, nargs="+", default=[300, 1000], help="Board sizes (cells per side).")
+    flood_parser.add_argument("--density", type=float, default=0.01, help="Share of cells with mines on the mined boards.")
+
+    solve_parser = subparsers.add_parser("solve", help="Win rate and solve time of the solver.")
+    solve_parser.add_argument("--sizes", type=int, nargs="+", default=[9, 16, 30], help="Board sizes (cells per side).")
+    solve_parser.add_argument("--density", type=float, default=0.15, help="Share of cells with mines.")
+    solve_parser.add_argument("--games", type=int, default=2000, help="Games per board size (seeds 0 to games - 1).")
+    solve_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU).")
+    solve_parser.add_argument("--chunk", type=int, default=50, help="Games sent to a worker at a time.")
+
+    args = parser.parse_args()
+    if args.benchmark == "lookup":
+        bench_lookup(args.sizes, args.clicks, args.legacy_clicks)
+    elif args.benchmark == "flood":
+        bench_flood(args.sizes, args.density)
+    elif args.benchmark == "solve":
+        bench_solve(args.sizes, args.density, args.games, args.workers, args.chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+The board model: where the mines are and how many mines each cell touches,
+kept in flat arrays indexed by cell number, so looking up a cell or its
+neighbours takes the same time however big the board is.
+"""
+
+from collections import deque
+
+
+class Board:
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+        self.size = columns * rows
+        # One byte per cell, numbered row by row: index = y * columns + x
+        self.mines = bytearray(self.size)
+        self.adjacent_mines = bytearray(self.size)
+        self.opened = bytearray(self.size)
+        self.flags = bytearray(self.size)
+        self.opened_count = 0
+
+    def index(self, x, y):
+        return y * self.columns + x
+
+    def position(self, index):
+        # Return the (x, y) of a cell number
+        return index % self.columns, index // self.columns
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.columns and 0 <= y < self.rows
+
+    def neighbors(self, index):
+        # The up to 8 cells around a cell, worked out from its position
+        # (so nothing has to be stored per cell, even on huge boards)
+        columns = self.columns
+        x, y = index % columns, index // columns
+        left = x - 1 if x > 0 else x
+        right = x + 1 if x < columns - 1 else x
+        top = y - 1 if y > 0 else y
+        bottom = y + 1 if y < self.rows - 1 else y
+        cells = []
+        for row in range(top, bottom + 1):
+            start = row * columns
+            for cell in range(start + left, start + right + 1):
+                if cell != index:
+                    cells.append(cell)
+        return cells
+
+    def place_mines(self, indices):
+        # Put mines on the given cells, and count each cell's adjacent mines
+        # once here (each mine adds one to its neighbours) instead of on
+        # every click
+        columns = self.columns
+        mines = self.mines
+        adjacent = self.adjacent_mines
+        # Neighbours of a cell away from the edges are at fixed offsets
+        offsets = (-columns - 1, -columns, -columns + 1, -1, 1, columns - 1, columns, columns + 1)
+        last_row = self.size - columns
+        for index in indices:
+            if mines[index]:
+                continue
+            mines[index] = 1
+            x = index % columns
+            if 0 < x < columns - 1 and columns <= index < last_row:
+                for offset in offsets:
+                    adjacent[index + offset] += 1
+            else:
+                for neighbor in self.neighbors(index):
+                    adjacent[neighbor] += 1
+
+    def reveal(self, index):
+        # Open a cell, and if it has no adjacent mines, the whole empty region
+        # around it and that region's border. The region is walked with a
+        # queue rather than recursion, so it can be as big as the board.
+        # Flagged cells are left closed. Returns the cells newly opened.
+        if self.opened[index] or self.flags[index]:
+            return []
+        opened = self.opened
+        adjacent = self.adjacent_mines
+        flags = self.flags
+        opened[index] = 1
+        newly_opened = [index]
+        if not self.mines[index] and not adjacent[index]:
+            columns = self.columns
+            offsets = (-columns - 1, -columns, -columns + 1, -1, 1, columns - 1, columns, columns + 1)
+            last_row = self.size - columns
+            queue = deque([index])
+            while queue:
+                cell = queue.popleft()
+                if 0 < cell % columns < columns - 1 and columns <= cell < last_row:
+                    neighbors = [cell + offset for offset in offsets]
+                else:
+                    neighbors = self.neighbors(cell)
+                for neighbor in neighbors:
+                    if not opened[neighbor] and not flags[neighbor]:
+                        opened[neighbor] = 1
+                        newly_opened.append(neighbor)
+                        # A cell next to an empty one can't be a mine
+                        if not adjacent[neighbor]:
+                            queue.append(neighbor)
+        self.opened_count += len(newly_opened)
+        return newly_opened
+
+    def __repr__(self):
+        return f"Board({self.columns}x{self.rows}, {sum(self.mines)} mines)"
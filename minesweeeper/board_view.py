@@ -0,0 +1,179 @@
+from tkinter import Canvas, Scrollbar, messagebox
+import settings
+
+# Colours of closed, flagged, opened and exploded cells
+CLOSED_COLOR = 'gray70'
+FLAG_COLOR = 'orange'
+OPENED_COLOR = 'gray92'
+MINE_COLOR = 'red'
+# Colours of the adjacent mine counts
+NUMBER_COLORS = ['', 'blue', 'green', 'red', 'navy', 'maroon', 'teal', 'black', 'gray40']
+
+
+class BoardView:
+    # Draws a Game (see engine.py) on one Canvas instead of one Button per cell.
+    #
+    # Only the cells that fit in the window are drawn: there is one
+    # rectangle and one text item per visible cell, whatever the size of
+    # the board, and scrolling just changes which cells they show. A click
+    # is turned into a cell by dividing its position by the cell size, and
+    # after a move only the cells that changed are redrawn.
+    def __init__(self, location, game, width, height, cells_left_label=None):
+        self.game = game
+        self.board = board = game.board
+        self.cells_left_label = cells_left_label
+        # Cells are as big as fits in the window, within the limits in settings
+        self.cell_size = max(settings.MIN_CELL_SIZE,
+                             min(width // board.columns, height // board.rows, settings.MAX_CELL_SIZE))
+        # The cells that fit in the window, and the top left one showing
+        self.visible_columns = min(board.columns, width // self.cell_size)
+        self.visible_rows = min(board.rows, height // self.cell_size)
+        self.first_column = 0
+        self.first_row = 0
+
+        self.canvas = Canvas(location, width=width, height=height, bg='Black', highlightthickness=0)
+        self.canvas.grid(column=0, row=0)
+        # Scrollbars, only if the board is bigger than the window
+        self.x_scrollbar = self.y_scrollbar = None
+        if self.visible_columns < board.columns or self.visible_rows < board.rows:
+            self.x_scrollbar = Scrollbar(location, orient='horizontal', command=self.on_scroll_x)
+            self.x_scrollbar.grid(column=0, row=1, sticky='ew')
+            self.y_scrollbar = Scrollbar(location, orient='vertical', command=self.on_scroll_y)
+            self.y_scrollbar.grid(column=1, row=0, sticky='ns')
+            self.canvas.bind('<MouseWheel>', self.on_mouse_wheel)
+            self.canvas.bind('<Shift-MouseWheel>', self.on_mouse_wheel)
+            self.canvas.bind('<Button-4>', self.on_mouse_wheel)
+            self.canvas.bind('<Button-5>', self.on_mouse_wheel)
+            for key, columns, rows in (('<Left>', -1, 0), ('<Right>', 1, 0), ('<Up>', 0, -1), ('<Down>', 0, 1)):
+                self.canvas.bind(key, lambda event, columns=columns, rows=rows: self.scroll_by(columns, rows))
+
+        # One rectangle and text per visible cell ("slot"), and what each
+        # slot shows now, so unchanged cells are not configured again
+        size = self.cell_size
+        self.rectangles = []
+        self.texts = []
+        for row in range(self.visible_rows):
+            for column in range(self.visible_columns):
+                x, y = column * size, row * size
+                self.rectangles.append(self.canvas.create_rectangle(
+                    x + 1, y + 1, x + size - 1, y + size - 1, fill=CLOSED_COLOR, outline=''))
+                self.texts.append(self.canvas.create_text(
+                    x + size // 2, y + size // 2, text='', font=('', max(size // 3, 8), 'bold')))
+        self.shown = [None] * len(self.rectangles)
+
+        self.canvas.bind('<Button-1>', self.left_click_actions) # Left click
+        self.canvas.bind('<Button-2>', self.right_click_actions) # Right click (macOS)
+        self.canvas.bind('<Button-3>', self.right_click_actions) # Right click
+        self.redraw()
+        self.update_cells_left()
+
+    def cell_at(self, event):
+        # Return the board index of the cell under the mouse, or None
+        column = event.x // self.cell_size
+        row = event.y // self.cell_size
+        if 0 <= column < self.visible_columns and 0 <= row < self.visible_rows:
+            return self.board.index(self.first_column + column, self.first_row + row)
+
+    def left_click_actions(self, event):
+        self.canvas.focus_set()
+        index = self.cell_at(event)
+        if index is None or self.game.over:
+            return
+        # Open the cell (and its empty region), then draw just those cells
+        self.redraw_cells(self.game.reveal(index))
+        if self.game.lost:
+            self.redraw_cells(self.game.open_mines())
+            messagebox.showinfo('Game over', 'You clicked a mine')
+            return
+        self.update_cells_left()
+        if self.game.won:
+            messagebox.showinfo('You Won', 'Congratulations!')
+
+    def right_click_actions(self, event):
+        index = self.cell_at(event)
+        if index is not None:
+            self.game.toggle_flag(index)
+            self.redraw_cells([index])
+
+    def update_cells_left(self):
+        if self.cells_left_label:
+            self.cells_left_label.configure(text=f"Cells Left:{self.board.size - self.board.opened_count}")
+
+    # --- Drawing ---
+
+    def redraw(self):
+        # Draw every visible cell (after scrolling)
+        for row in range(self.visible_rows):
+            start = self.board.index(self.first_column, self.first_row + row)
+            for column in range(self.visible_columns):
+                self.draw_slot(row * self.visible_columns + column, start + column)
+        self.update_scrollbars()
+
+    def redraw_cells(self, indices):
+        # Draw the given cells, if they are in view
+        if len(indices) >= len(self.rectangles):
+            self.redraw()
+            return
+        columns = self.board.columns
+        for index in indices:
+            column = index % columns - self.first_column
+            row = index // columns - self.first_row
+            if 0 <= column < self.visible_columns and 0 <= row < self.visible_rows:
+                self.draw_slot(row * self.visible_columns + column, index)
+
+    def draw_slot(self, slot, index):
+        board = self.board
+        if not board.opened[index]:
+            look = (FLAG_COLOR if board.flags[index] else CLOSED_COLOR, '')
+        elif board.mines[index]:
+            look = (MINE_COLOR, '*')
+        else:
+            count = board.adjacent_mines[index]
+            look = (OPENED_COLOR, count or '')
+        if self.shown[slot] == look:
+            return
+        self.shown[slot] = look
+        self.canvas.itemconfigure(self.rectangles[slot], fill=look[0])
+        self.canvas.itemconfigure(self.texts[slot], text=look[1],
+                                  fill=NUMBER_COLORS[look[1]] if isinstance(look[1], int) else 'black')
+
+    # --- Scrolling ---
+
+    def scroll_to(self, column, row):
+        column = max(0, min(column, self.board.columns - self.visible_columns))
+        row = max(0, min(row, self.board.rows - self.visible_rows))
+        if (column, row) != (self.first_column, self.first_row):
+            self.first_column, self.first_row = column, row
+            self.redraw()
+
+    def scroll_by(self, columns, rows):
+        self.scroll_to(self.first_column + columns, self.first_row + rows)
+
+    def on_scroll_x(self, action, amount, unit=None):
+        self.scroll_to(self._scrolled(action, amount, unit, self.first_column, self.visible_columns,
+                                       self.board.columns), self.first_row)
+
+    def on_scroll_y(self, action, amount, unit=None):
+        self.scroll_to(self.first_column, self._scrolled(action, amount, unit, self.first_row,
+                                                         self.visible_rows, self.board.rows))
+
+    @staticmethod
+    def _scrolled(action, amount, unit, first, visible, total):
+        # The first cell to show after a scrollbar command
+        if action == 'moveto':
+            return round(float(amount) * total)
+        return first + int(amount) * (visible if unit == 'pages' else 1)
+
+    def on_mouse_wheel(self, event):
+        steps = -1 if event.num == 4 or getattr(event, 'delta', 0) > 0 else 1
+        if event.state & 0x1: # Shift scrolls sideways
+            self.scroll_by(3 * steps, 0)
+        else:
+            self.scroll_by(0, 3 * steps)
+
+    def update_scrollbars(self):
+        if self.x_scrollbar:
+            self.x_scrollbar.set(self.first_column / self.board.columns,
+                                 (self.first_column + self.visible_columns) / self.board.columns)
+            self.y_scrollbar.set(self.first_row / self.board.rows,
+                                 (self.first_row + self.visible_rows) / self.board.rows)
@@ -0,0 +1,107 @@
+"""
+The game without a window: a board with mines placed from a seeded random
+generator, opening and flagging cells, and whether the game is won or lost.
+board_view.py draws a Game, and solver.py and benchmarks.py play it with no
+display.
+
+The mines are placed on the first click, away from the clicked cell and its
+neighbours, so the first click always opens a region. With no_guess set, they
+are placed where the solver can clear the board without guessing (see
+generator.py).
+"""
+
+import random
+
+from board import Board
+
+
+class Game:
+    def __init__(self, columns, rows, mines, seed=None, no_guess=False, layout=None):
+        if not 0 <= mines < columns * rows:
+            raise ValueError(f"A {columns}x{rows} board can't have {mines} mines.")
+        self.board = Board(columns, rows)
+        self.mines_count = mines
+        self.no_guess = no_guess
+        # The same seed (and first click) always gives the same board
+        self.random = random.Random(seed)
+        self.lost = False
+        self.placed = False
+        # A board made in advance (see generator.py): its first cell and
+        # its mines. The game starts with that cell opened.
+        if layout is not None:
+            start, mine_indices = layout
+            if len(mine_indices) != mines:
+                raise ValueError(f"The layout has {len(mine_indices)} mines, not {mines}.")
+            self.board.place_mines(mine_indices)
+            self.placed = True
+            self.reveal(start)
+
+    @property
+    def won(self):
+        # Won once the only cells left closed are mines
+        return not self.lost and self.board.opened_count == self.board.size - self.mines_count
+
+    @property
+    def over(self):
+        return self.lost or self.won
+
+    def reveal(self, index):
+        # Open a cell (and its empty region, see Board.reveal) and return the
+        # cells opened; opening a mine loses the game
+        if self.over:
+            return []
+        if not self.placed:
+            self.place_mines(index)
+        opened = self.board.reveal(index)
+        if opened and self.board.mines[index]:
+            self.lost = True
+        return opened
+
+    def place_mines(self, first):
+        # Place the mines, keeping them off the first cell opened
+        board = self.board
+        mine_indices = None
+        if self.no_guess:
+            # Imported here, as generator.py uses Game to try out its boards
+            from generator import no_guess_mines
+            mine_indices = no_guess_mines(board.columns, board.rows, self.mines_count, first, self.random)
+        if mine_indices is None:
+            mine_indices = random_mines(board.size, self.mines_count, safe_area(board, first, self.mines_count),
+                                        self.random)
+        board.place_mines(mine_indices)
+        self.placed = True
+
+    def toggle_flag(self, index):
+        # Flag or unflag a closed cell; returns whether it is flagged now
+        board = self.board
+        if self.over or board.opened[index]:
+            return bool(board.flags[index])
+        board.flags[index] = not board.flags[index]
+        return bool(board.flags[index])
+
+    def open_mines(self):
+        # Open every mine at the end of the game, and return them
+        board = self.board
+        mines = [index for index in range(board.size) if board.mines[index] and not board.opened[index]]
+        for index in mines:
+            board.opened[index] = 1
+        return mines
+
+    def __repr__(self):
+        state = 'lost' if self.lost else 'won' if self.won else 'playing'
+        return f"Game({self.board.columns}x{self.board.rows}, {self.mines_count} mines, {state})"
+
+
+def safe_area(board, first, mines):
+    # The cells kept free of mines around the first click: the cell and its
+    # neighbours, or just the cell if the rest of the board can't hold the mines
+    area = {first, *board.neighbors(first)}
+    return area if board.size - len(area) >= mines else {first}
+
+
+def random_mines(size, mines, excluded, rng):
+    # `mines` different cells, chosen at random from those not in `excluded`.
+    # Sampling a few more than needed and dropping the excluded ones takes
+    # time in proportion to the mines, not to the size of the board.
+    sample = rng.sample(range(size), mines + len(excluded))
+    return [index for index in sample if index not in excluded][:mines]
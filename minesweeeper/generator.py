@@ -0,0 +1,149 @@
+"""
+No-guess boards: mines placed so that, from the first cell opened, the solver
+can clear the whole board without ever guessing. Candidate boards are tried
+one after another (or spread over processes) until one works or the retry
+budget runs out.
+
+Finding one can take a while on big boards, so a pool of them is made ahead
+of time for each difficulty and kept in POOL_FILE; a new no-guess game takes
+a board from the pool and starts at once. Fill the pool from this directory,
+for example:
+
+    python generator.py expert --boards 50
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import settings
+from board import Board
+from engine import Game, random_mines, safe_area
+from solver import Solver
+
+POOL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "board_pool.json")
+
+# Candidate boards tried for one no-guess board before giving up, and
+# candidates sent to a worker process at a time
+ATTEMPTS = 2000
+CHUNK = 25
+
+
+def candidate_mines(columns, rows, mines, start, seed):
+    # A random board with the cells around `start` kept free of mines
+    board = Board(columns, rows)
+    return random_mines(board.size, mines, safe_area(board, start, mines), random.Random(seed))
+
+
+def is_no_guess(columns, rows, mines, start, mine_indices):
+    # Whether the solver clears this board from `start` without a guess
+    game = Game(columns, rows, mines, layout=(start, mine_indices))
+    return Solver(game).play(guess=False)
+
+
+def _try_candidates(columns, rows, mines, start, seeds):
+    # The first candidate board (from these seeds) that needs no guessing, or None
+    for seed in seeds:
+        mine_indices = candidate_mines(columns, rows, mines, start, seed)
+        if is_no_guess(columns, rows, mines, start, mine_indices):
+            return mine_indices
+    return None
+
+
+def no_guess_mines(columns, rows, mines, start, rng, attempts=ATTEMPTS, workers=1):
+    # Mines for a board that can be cleared from `start` without guessing,
+    # trying up to `attempts` candidates (on `workers` processes). Returns
+    # None if none of them works.
+    seeds = [rng.getrandbits(64) for _ in range(attempts)]
+    if workers == 1:
+        return _try_candidates(columns, rows, mines, start, seeds)
+    chunks = [seeds[first:first + CHUNK] for first in range(0, attempts, CHUNK)]
+    with ProcessPoolExecutor(workers) as pool:
+        for mine_indices in pool.map(_try_candidates, [columns] * len(chunks), [rows] * len(chunks),
+                                     [mines] * len(chunks), [start] * len(chunks), chunks):
+            if mine_indices is not None:
+                pool.shutdown(cancel_futures=True)
+                return mine_indices
+    return None
+
+
+def _pool_key(columns, rows, mines):
+    return f"{columns}x{rows}:{mines}"
+
+
+def _load_pool(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_pool(pool, path):
+    # Written to a temporary file first, so a game never reads half a pool
+    with open(path + ".tmp", "w") as f:
+        json.dump(pool, f)
+    os.replace(path + ".tmp", path)
+
+
+def pool_size(columns, rows, mines, path=POOL_FILE):
+    return len(_load_pool(path).get(_pool_key(columns, rows, mines), []))
+
+
+def take_board(columns, rows, mines, path=POOL_FILE):
+    # Take a no-guess board from the pool, as a Game layout (start cell,
+    # mines), or None if the pool has none of this size
+    pool = _load_pool(path)
+    boards = pool.get(_pool_key(columns, rows, mines))
+    if not boards:
+        return None
+    start, mine_indices = boards.pop()
+    _save_pool(pool, path)
+    return start, mine_indices
+
+
+def _make_board(columns, rows, mines, seed):
+    # A no-guess board starting from a random cell, or None
+    rng = random.Random(seed)
+    start = rng.randrange(columns * rows)
+    mine_indices = no_guess_mines(columns, rows, mines, start, rng)
+    return None if mine_indices is None else [start, mine_indices]
+
+
+def fill_pool(columns, rows, mines, boards, workers=None, path=POOL_FILE, seed=None, progress=print):
+    # Make `boards` more no-guess boards of this size, one per process at a
+    # time, and add them to the pool
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(boards)]
+    with ProcessPoolExecutor(workers) as executor:
+        made = [board for board in executor.map(_make_board, [columns] * boards, [rows] * boards,
+                                                [mines] * boards, seeds) if board is not None]
+    pool = _load_pool(path)
+    pool.setdefault(_pool_key(columns, rows, mines), []).extend(made)
+    _save_pool(pool, path)
+    if progress:
+        elapsed = time.perf_counter() - start
+        progress(f"{columns}x{rows}, {mines} mines: made {len(made)} of {boards} boards in {elapsed:.1f} s "
+                 f"({elapsed / max(len(made), 1):.2f} s per board), "
+                 f"{len(pool[_pool_key(columns, rows, mines)])} in the pool")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Make no-guess minesweeper boards ahead of time.")
+    parser.add_argument("difficulty", choices=sorted(settings.DIFFICULTIES), help="Difficulty to make boards for.")
+    parser.add_argument("--boards", type=int, default=20, help="Boards to add to the pool.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: one per CPU).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the boards.")
+    parser.add_argument("--output", default=POOL_FILE, help="Pool file to add to.")
+    args = parser.parse_args()
+    if args.boards < 1:
+        parser.error("--boards must be at least 1.")
+    columns, rows, mines = settings.DIFFICULTIES[args.difficulty]
+    fill_pool(columns, rows, mines, args.boards, args.workers, args.output, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,9 @@ Python Version: 3.13.1
 """
 
 from tkinter import *
-from cell import Cell
+from engine import Game
+from generator import take_board
+from board_view import BoardView
 import settings
 import utils
 
@@ -69,25 +71,34 @@ center_frame = Frame(
 center_frame.place(x=utils.width_prct(25), y=utils.height_prct(25))
 
 
-# Making a grid for the game
-for x in range(settings.GRID_SIZE):
-    for y in range(settings.GRID_SIZE):
-        c = Cell(x,y)
-        c.create_btn_object(center_frame)
-        c.cell_btn_object.grid(
-            column=x, row=y
-            )
-        
-# Call the label from the cell class
-Cell.create_cell_count_label(left_frame)
-Cell.cell_count_label_object.place(
+# Label showing how many cells are still closed
+cell_count_label = Label(
+    left_frame,
+    bg='Black',
+    fg='White',
+    width=12,
+    height=4,
+    font=('', 30)
+)
+cell_count_label.place(
     x=0, y=0
 )
 
-Cell.randomize_mines()
-
-# for c in Cell.all:    # Testing if i was able to make mines
-#     print(c.is_mine)
+# The mines are placed on the first click; a no-guess game starts from a
+# board made ahead of time if there is one (see generator.py)
+columns, rows, mines = settings.DIFFICULTIES[settings.DIFFICULTY]
+layout = take_board(columns, rows, mines) if settings.NO_GUESS else None
+game = Game(columns, rows, mines, no_guess=settings.NO_GUESS, layout=layout)
+
+# Drawing the grid for the game on one canvas (it scrolls if the board
+# doesn't fit in the center frame)
+board_view = BoardView(
+    center_frame,
+    game,
+    width=utils.width_prct(75) - 20,
+    height=utils.height_prct(75) - 20,
+    cells_left_label=cell_count_label
+)
 
 # Run the window
 root.mainloop()
\ No newline at end of file
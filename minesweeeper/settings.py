@@ -1,5 +1,12 @@
 WIDTH=1440 # Width of game screen
 HEIGHT=720 # Height of game screen
-GRID_SIZE=6 # Grid size of the game
-CELL_COUNT = GRID_SIZE ** 2 # The number of all tiles
-MINES_COUNT=(CELL_COUNT)//4 # A quarter of all the tiles would be mines
\ No newline at end of file
+# Columns, rows and mines of each difficulty
+DIFFICULTIES = {
+    'beginner': (9, 9, 10),
+    'intermediate': (16, 16, 40),
+    'expert': (30, 16, 99),
+}
+DIFFICULTY='beginner' # Difficulty of the game
+NO_GUESS=False # Only deal boards that can be cleared without guessing
+MIN_CELL_SIZE=16 # Smallest a cell is drawn, in pixels (bigger boards scroll)
+MAX_CELL_SIZE=90 # Biggest a cell is drawn, in pixels
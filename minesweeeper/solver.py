@@ -0,0 +1,293 @@
+"""
+A minesweeper solver that plays a Game (see engine.py) from what a player can
+see: the numbers on the opened cells and the number of mines.
+
+Each move it tries, in order:
+  - single cell rules: a number whose mines are all found makes its other
+    closed neighbours safe, and one with as many closed neighbours as mines
+    left makes them all mines;
+  - subset rules: if one number's closed neighbours are all among another's,
+    the other's remaining cells hold the difference of their mines;
+  - working out every way the mines can lie along the edge of the opened
+    area, and weighting each by how many ways the other mines can fill the
+    rest of the board. A cell that is a mine in none (or all) of them is
+    safe (or a mine); otherwise it opens the cell least likely to be a mine.
+"""
+
+from collections import defaultdict
+from math import comb
+
+# Cells in one connected stretch of the edge up to which every arrangement
+# of its mines is counted; past this (or MAX_STEPS steps of the search) the
+# chances are estimated from the numbers around each cell instead.
+MAX_EXACT_CELLS = 60
+MAX_STEPS = 20000
+
+
+class Solver:
+    def __init__(self, game):
+        self.game = game
+        self.board = game.board
+        # Cells worked out to be mines (and flagged), and opened cells with a
+        # number that still have closed neighbours that aren't known mines
+        self.mines = set()
+        board = self.board
+        self.numbers = {index for index in range(board.size)
+                        if board.opened[index] and board.adjacent_mines[index] and not board.mines[index]}
+        self.guesses = 0
+        # Chances of a mine from the last deduce that got as far as counting
+        self.chances = {}
+        self.inside_chance = 1.0
+
+    def play(self, guess=True):
+        # Play until the game is over, and return whether it was won. With
+        # guess False, stop (and return False) instead of guessing.
+        game = self.game
+        while not game.over:
+            safe, mines = self.deduce()
+            for index in mines:
+                self.mines.add(index)
+                if not self.board.flags[index]:
+                    game.toggle_flag(index)
+            if safe:
+                for index in safe:
+                    self.open(index)
+            elif not mines:
+                if not guess:
+                    return False
+                # The opening click is forced (and the mines avoid it), so it isn't a guess
+                if self.board.opened_count:
+                    self.guesses += 1
+                self.open(self.guess())
+        return game.won
+
+    def open(self, index):
+        board = self.board
+        for cell in self.game.reveal(index):
+            if board.adjacent_mines[cell] and not board.mines[cell]:
+                self.numbers.add(cell)
+
+    def constraints(self):
+        # For each number on the edge: its closed neighbours (not known to be
+        # mines) and how many mines are among them
+        board = self.board
+        opened = board.opened
+        constraints = {}
+        for cell in list(self.numbers):
+            unknown = []
+            mines = board.adjacent_mines[cell]
+            for neighbor in board.neighbors(cell):
+                if neighbor in self.mines:
+                    mines -= 1
+                elif not opened[neighbor]:
+                    unknown.append(neighbor)
+            if unknown:
+                constraints[frozenset(unknown)] = mines
+            else:
+                self.numbers.discard(cell)
+        return constraints
+
+    def deduce(self):
+        # Return the cells known to be safe, and those known to be mines
+        constraints = self.constraints()
+        safe, mines = set(), set()
+
+        # Single cell rules
+        for cells, count in constraints.items():
+            if count == 0:
+                safe |= cells
+            elif count == len(cells):
+                mines |= cells
+        if safe or mines:
+            return safe, mines
+
+        # Subset rules
+        containing = defaultdict(list)
+        for cells in constraints:
+            for cell in cells:
+                containing[cell].append(cells)
+        for smaller, count in constraints.items():
+            for larger in containing[next(iter(smaller))]:
+                if len(larger) > len(smaller) and smaller < larger:
+                    rest = larger - smaller
+                    rest_mines = constraints[larger] - count
+                    if rest_mines == 0:
+                        safe |= rest
+                    elif rest_mines == len(rest):
+                        mines |= rest
+        if safe or mines:
+            return safe, mines
+
+        # Every arrangement of the mines along the edge
+        self.chances = self.probabilities(constraints)
+        for cell, (mine_ways, ways) in self.chances.items():
+            if mine_ways == 0:
+                safe.add(cell)
+            elif mine_ways == ways:
+                mines.add(cell)
+        return safe, mines
+
+    def guess(self):
+        # The closed cell least likely to be a mine (from the last deduce)
+        board = self.board
+        if not board.opened_count:
+            # Nothing to go on yet: start in the middle
+            return board.index(board.columns // 2, board.rows // 2)
+        best, best_chance = None, 2.0
+        for cell, (mine_ways, ways) in self.chances.items():
+            chance = mine_ways / ways
+            if chance < best_chance:
+                best, best_chance = cell, chance
+        if self.inside_chance < best_chance:
+            # Away from the edge every cell is as likely as the others to be
+            # a mine, so take one with few neighbours (a corner, then a side),
+            # which is the likeliest to open a region
+            inside = (index for index in range(board.size)
+                      if not board.opened[index] and index not in self.mines and index not in self.chances)
+            return min(inside, key=lambda index: len(board.neighbors(index)), default=best)
+        return best
+
+    def probabilities(self, constraints):
+        # For each cell on the edge, (ways it is a mine, ways in all), and
+        # the chance for the closed cells away from the edge in inside_chance
+        board = self.board
+        mines_left = self.game.mines_count - len(self.mines)
+        edge = set().union(*constraints)
+        inside = board.size - board.opened_count - len(self.mines) - len(edge)
+
+        components = []
+        for cells, mines_count in self.components(constraints):
+            counted = self.count_arrangements(cells, mines_count)
+            if counted is None:
+                return self.estimate(constraints, mines_left, inside)
+            components.append((cells, counted))
+
+        # ways[k]: arrangements of the whole edge with k mines
+        def combine(parts):
+            ways = {0: 1}
+            for _, counted in parts:
+                combined = defaultdict(int)
+                for total, total_ways in ways.items():
+                    for mines_count, (count_ways, _) in counted.items():
+                        combined[total + mines_count] += total_ways * count_ways
+                ways = combined
+            return ways
+
+        def fill(mines_on_edge):
+            # Ways to put the rest of the mines on the cells away from the edge
+            rest = mines_left - mines_on_edge
+            return comb(inside, rest) if 0 <= rest <= inside else 0
+
+        all_ways = combine(components)
+        total = sum(ways * fill(mines_count) for mines_count, ways in all_ways.items())
+        if not total:
+            return self.estimate(constraints, mines_left, inside)
+        inside_mines = sum(ways * fill(mines_count) * (mines_left - mines_count)
+                           for mines_count, ways in all_ways.items())
+        self.inside_chance = inside_mines / (total * inside) if inside else 2.0
+
+        chances = {}
+        for number, (cells, counted) in enumerate(components):
+            others = combine(components[:number] + components[number + 1:])
+            mine_ways = [0] * len(cells)
+            for mines_count, (_, cell_ways) in counted.items():
+                weight = sum(ways * fill(mines_count + other) for other, ways in others.items())
+                for position, ways in enumerate(cell_ways):
+                    mine_ways[position] += ways * weight
+            for cell, ways in zip(cells, mine_ways):
+                chances[cell] = (ways, total)
+        return chances
+
+    def components(self, constraints):
+        # Split the edge into stretches whose numbers share no cells, as
+        # (cells, constraints as (cell positions, mines)) pairs
+        containing = defaultdict(list)
+        for cells in constraints:
+            for cell in cells:
+                containing[cell].append(cells)
+        seen = set()
+        for start in containing:
+            if start in seen:
+                continue
+            seen.add(start)
+            cells, stack = [], [start]
+            found = set()
+            while stack:
+                cell = stack.pop()
+                cells.append(cell)
+                for group in containing[cell]:
+                    found.add(group)
+                    for other in group:
+                        if other not in seen:
+                            seen.add(other)
+                            stack.append(other)
+            position = {cell: number for number, cell in enumerate(cells)}
+            yield cells, [([position[cell] for cell in group], constraints[group]) for group in found]
+
+    def count_arrangements(self, cells, groups):
+        # Count the arrangements of mines on `cells` that agree with every
+        # number, by number of mines: {mines: (ways, ways each cell is a mine)}.
+        # Returns None if there are too many cells or steps to count them all.
+        if len(cells) > MAX_EXACT_CELLS:
+            return None
+        groups_of = [[] for _ in cells]
+        for number, (positions, _) in enumerate(groups):
+            for position in positions:
+                groups_of[position].append(number)
+        # Mines each number still needs, and cells it still has undecided
+        needed = [mines for _, mines in groups]
+        undecided = [len(positions) for positions, _ in groups]
+        assignment = [0] * len(cells)
+        counted = {}
+        steps = 0
+
+        def place(position, mines):
+            nonlocal steps
+            steps += 1
+            if steps > MAX_STEPS:
+                raise OverflowError
+            if position == len(cells):
+                ways, cell_ways = counted.get(mines, (0, [0] * len(cells)))
+                for cell, is_mine in enumerate(assignment):
+                    cell_ways[cell] += is_mine
+                counted[mines] = (ways + 1, cell_ways)
+                return
+            for is_mine in (0, 1):
+                if all(0 <= needed[number] - is_mine <= undecided[number] - 1 for number in groups_of[position]):
+                    for number in groups_of[position]:
+                        needed[number] -= is_mine
+                        undecided[number] -= 1
+                    assignment[position] = is_mine
+                    place(position + 1, mines + is_mine)
+                    for number in groups_of[position]:
+                        needed[number] += is_mine
+                        undecided[number] += 1
+            assignment[position] = 0
+
+        try:
+            place(0, 0)
+        except OverflowError:
+            return None
+        return counted
+
+    def estimate(self, constraints, mines_left, inside):
+        # Rough chances for boards too tangled to count exactly: each edge
+        # cell gets the highest share of mines among the numbers around it
+        chances = {}
+        for cells, count in constraints.items():
+            for cell in cells:
+                share = count / len(cells)
+                if share > chances.get(cell, -1.0):
+                    chances[cell] = share
+        edge_mines = sum(chances.values())
+        self.inside_chance = max(mines_left - edge_mines, 0) / inside if inside else 2.0
+        # As (ways it is a mine, ways in all), never exactly 0 or 1 so
+        # nothing is taken as certain
+        return {cell: (min(max(share, 1e-9), 1 - 1e-9), 1) for cell, share in chances.items()}
+
+
+def solve(game):
+    # Play a game to the end; returns (won, guesses)
+    solver = Solver(game)
+    won = solver.play()
+    return won, solver.guesses
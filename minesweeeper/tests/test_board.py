@@ -0,0 +1,85 @@
+import random
+
+from board import Board
+
+
+def _random_board(rng, columns, rows, mines):
+    board = Board(columns, rows)
+    board.place_mines(rng.sample(range(board.size), mines))
+    return board
+
+
+def _region(board, index):
+    # The cells a reveal should open, found the slow way: the empty cells
+    # connected to `index` and everything next to them, apart from flags
+    if board.opened[index] or board.flags[index]:
+        return set()
+    region, stack = {index}, [index]
+    while stack:
+        cell = stack.pop()
+        if board.mines[cell] or board.adjacent_mines[cell]:
+            continue
+        for neighbor in board.neighbors(cell):
+            if neighbor not in region and not board.opened[neighbor] and not board.flags[neighbor]:
+                region.add(neighbor)
+                stack.append(neighbor)
+    return region
+
+
+def test_reveal_opens_the_region_and_its_border():
+    rng = random.Random(1)
+    for _ in range(200):
+        columns, rows = rng.randrange(1, 20), rng.randrange(1, 20)
+        board = _random_board(rng, columns, rows, rng.randrange(columns * rows // 4 + 1))
+        for index in rng.sample(range(board.size), min(3, board.size)):
+            board.flags[index] = 1
+        for index in rng.sample(range(board.size), min(5, board.size)):
+            expected = _region(board, index)
+            opened = board.reveal(index)
+            assert len(opened) == len(set(opened))
+            assert set(opened) == expected
+        assert board.opened_count == sum(board.opened)
+
+
+def test_reveal_never_opens_a_mine_next_to_an_empty_cell():
+    rng = random.Random(2)
+    for _ in range(50):
+        board = _random_board(rng, 30, 16, 99)
+        start = next(index for index in range(board.size)
+                     if not board.mines[index] and not board.adjacent_mines[index])
+        assert not any(board.mines[index] for index in board.reveal(start))
+
+
+def test_reveal_opens_a_huge_empty_board_in_one_go():
+    board = Board(1000, 1000)
+    assert len(board.reveal(500500)) == board.size
+    assert board.opened_count == board.size
+    assert board.reveal(0) == []
+
+
+def test_reveal_of_a_mine_opens_only_that_cell():
+    board = Board(5, 5)
+    board.place_mines([12])
+    assert board.reveal(12) == [12]
+
+
+def test_neighbors_are_the_cells_around_each_position():
+    for columns, rows in [(1, 1), (1, 5), (5, 1), (4, 3), (9, 9)]:
+        board = Board(columns, rows)
+        for index in range(board.size):
+            x, y = board.position(index)
+            assert board.index(x, y) == index
+            expected = sorted(board.index(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                              if (dx or dy) and board.in_bounds(x + dx, y + dy))
+            assert sorted(board.neighbors(index)) == expected
+
+
+def test_adjacent_mines_are_counted_when_mines_are_placed():
+    rng = random.Random(3)
+    for _ in range(100):
+        board = _random_board(rng, rng.randrange(1, 15), rng.randrange(1, 15), 0)
+        mines = rng.sample(range(board.size), rng.randrange(board.size + 1))
+        board.place_mines(mines + mines[:3])
+        assert sum(board.mines) == len(mines)
+        for index in range(board.size):
+            assert board.adjacent_mines[index] == sum(board.mines[neighbor] for neighbor in board.neighbors(index))
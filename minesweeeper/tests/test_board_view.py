@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+import board_view
+from board_view import CLOSED_COLOR, FLAG_COLOR, OPENED_COLOR, BoardView
+from engine import Game
+
+
+@pytest.fixture
+def root():
+    tkinter = pytest.importorskip("tkinter")
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        pytest.skip("needs a display")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+@pytest.fixture(autouse=True)
+def no_dialogs(monkeypatch):
+    monkeypatch.setattr(board_view.messagebox, "showinfo", lambda *args: None)
+
+
+def _click(x, y):
+    return SimpleNamespace(x=x, y=y)
+
+
+def _fill(view, index):
+    # The colour the cell at `index` is drawn in (it must be in view)
+    board = view.board
+    column, row = board.position(index)
+    slot = (row - view.first_row) * view.visible_columns + column - view.first_column
+    return view.canvas.itemcget(view.rectangles[slot], "fill")
+
+
+def test_huge_board_draws_only_the_visible_cells(root):
+    view = BoardView(root, Game(1000, 1000, 0), 800, 400)
+    assert view.cell_size == 16
+    assert (view.visible_columns, view.visible_rows) == (50, 25)
+    assert len(view.canvas.find_all()) == 2 * 50 * 25
+
+
+def test_clicks_find_the_cell_after_scrolling(root):
+    game = Game(100, 100, 0)
+    view = BoardView(root, game, 400, 400)
+    view.scroll_to(30, 40)
+    assert view.cell_at(_click(0, 0)) == game.board.index(30, 40)
+    assert view.cell_at(_click(3 * view.cell_size + 1, 2 * view.cell_size + 1)) == game.board.index(33, 42)
+    view.scroll_to(1000, 1000)
+    assert (view.first_column, view.first_row) == (100 - view.visible_columns, 100 - view.visible_rows)
+
+
+def test_flags_and_reveals_redraw_the_cells(root):
+    game = Game(9, 9, 10, seed=1)
+    view = BoardView(root, game, 450, 450)
+    view.right_click_actions(_click(1, 1))
+    assert _fill(view, 0) == FLAG_COLOR
+    view.right_click_actions(_click(1, 1))
+    assert _fill(view, 0) == CLOSED_COLOR
+
+    view.left_click_actions(_click(4 * view.cell_size + 1, 4 * view.cell_size + 1))
+    assert not game.lost
+    for index in range(game.board.size):
+        assert _fill(view, index) == (OPENED_COLOR if game.board.opened[index] else CLOSED_COLOR)
@@ -0,0 +1,76 @@
+import os
+import random
+
+import pytest
+
+import generator
+from engine import Game, random_mines, safe_area
+
+
+@pytest.mark.parametrize("columns, rows, mines", [(9, 9, 10), (16, 16, 40), (30, 16, 99)])
+def test_first_click_opens_a_region(columns, rows, mines):
+    rng = random.Random(columns)
+    for seed in range(100):
+        game = Game(columns, rows, mines, seed)
+        first = rng.randrange(columns * rows)
+        opened = game.reveal(first)
+        board = game.board
+        assert not game.lost
+        assert sum(board.mines) == mines
+        assert not board.mines[first] and not board.adjacent_mines[first]
+        assert len(opened) > 1
+
+
+def test_crowded_board_keeps_just_the_first_cell_safe():
+    for seed in range(50):
+        game = Game(5, 5, 24, seed)
+        game.reveal(12)
+        assert not game.lost
+        assert sum(game.board.mines) == 24
+        assert game.won
+
+
+def test_same_seed_and_first_click_give_the_same_board():
+    first, second = Game(30, 16, 99, seed=7), Game(30, 16, 99, seed=7)
+    first.reveal(100)
+    second.reveal(100)
+    assert first.board.mines == second.board.mines
+
+
+def test_random_mines_are_distinct_and_avoid_the_excluded_cells():
+    rng = random.Random(1)
+    for _ in range(200):
+        size = rng.randrange(10, 500)
+        excluded = set(rng.sample(range(size), 9))
+        mines = random_mines(size, rng.randrange(size - 9), excluded, rng)
+        assert len(set(mines)) == len(mines)
+        assert not excluded & set(mines)
+
+
+def test_safe_area_is_the_cell_and_its_neighbours():
+    board = Game(9, 9, 10).board
+    assert safe_area(board, 0, 10) == {0, 1, 9, 10}
+    assert safe_area(board, 40, 80) == {40}
+
+
+def test_too_many_mines_rejected():
+    with pytest.raises(ValueError):
+        Game(3, 3, 9)
+
+
+def test_no_guess_game_is_cleared_by_the_solver_without_guessing():
+    for seed in range(5):
+        game = Game(9, 9, 10, seed, no_guess=True)
+        game.reveal(40)
+        assert generator.is_no_guess(9, 9, 10, 40, [index for index in range(81) if game.board.mines[index]])
+
+
+def test_boards_are_taken_from_the_pool(tmp_path):
+    path = os.path.join(tmp_path, "pool.json")
+    assert generator.take_board(9, 9, 10, path) is None
+    generator.fill_pool(9, 9, 10, 2, workers=1, path=path, seed=1, progress=None)
+    assert generator.pool_size(9, 9, 10, path) == 2
+    start, mines = generator.take_board(9, 9, 10, path)
+    game = Game(9, 9, 10, layout=(start, mines))
+    assert game.board.opened[start] and not game.lost
+    assert generator.pool_size(9, 9, 10, path) == 1
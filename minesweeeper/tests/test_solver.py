@@ -0,0 +1,96 @@
+import random
+from fractions import Fraction
+from itertools import combinations
+
+import pytest
+
+from engine import Game
+from generator import no_guess_mines
+from solver import Solver, solve
+
+
+def _consistent_layouts(game):
+    # Every way the mines could lie given what the player sees, the slow way
+    board = game.board
+    closed = [index for index in range(board.size) if not board.opened[index]]
+    layouts = []
+    for mines in combinations(closed, game.mines_count):
+        mines = set(mines)
+        if all(sum(neighbor in mines for neighbor in board.neighbors(index)) == board.adjacent_mines[index]
+               for index in range(board.size) if board.opened[index]):
+            layouts.append(mines)
+    return layouts
+
+
+def _opened_game(rng, columns, rows, mines):
+    game = Game(columns, rows, mines, seed=rng.getrandbits(32))
+    game.reveal(rng.randrange(columns * rows))
+    return game
+
+
+def test_deductions_hold_for_every_consistent_layout():
+    rng = random.Random(1)
+    checked = 0
+    for _ in range(100):
+        game = _opened_game(rng, 5, 4, 5)
+        if game.over:
+            continue
+        safe, mines = Solver(game).deduce()
+        layouts = _consistent_layouts(game)
+        assert all(cell not in layout for cell in safe for layout in layouts)
+        assert all(cell in layout for cell in mines for layout in layouts)
+        checked += bool(safe or mines)
+    assert checked > 20
+
+
+def test_probabilities_match_an_enumeration():
+    rng = random.Random(2)
+    for _ in range(60):
+        game = _opened_game(rng, 5, 4, 5)
+        if game.over:
+            continue
+        solver = Solver(game)
+        chances = solver.probabilities(solver.constraints())
+        layouts = _consistent_layouts(game)
+        for cell, (mine_ways, ways) in chances.items():
+            assert Fraction(mine_ways, ways) == Fraction(sum(cell in layout for layout in layouts), len(layouts))
+        inside = [index for index in range(game.board.size)
+                  if not game.board.opened[index] and index not in chances]
+        if inside:
+            expected = Fraction(sum(len(layout & set(inside)) for layout in layouts), len(layouts) * len(inside))
+            assert solver.inside_chance == pytest.approx(float(expected))
+
+
+def test_games_without_guesses_are_always_won():
+    rng = random.Random(3)
+    guess_free = 0
+    for _ in range(100):
+        game = Game(9, 9, 10, seed=rng.getrandbits(32))
+        won, guesses = solve(game)
+        assert game.over
+        if not guesses:
+            guess_free += 1
+            assert won
+        else:
+            assert guesses >= 1
+        # Flags only ever go on mines
+        assert all(game.board.mines[index] for index in range(game.board.size) if game.board.flags[index])
+    # The opening click isn't counted, so plenty of games need no guess at all
+    assert guess_free > 50
+
+
+def test_opening_click_is_not_a_guess():
+    assert solve(Game(9, 9, 0, seed=1)) == (True, 0)
+
+
+def test_no_guess_layouts_are_solved_without_guessing():
+    rng = random.Random(4)
+    for _ in range(10):
+        start = rng.randrange(81)
+        mine_indices = no_guess_mines(9, 9, 10, start, rng)
+        assert solve(Game(9, 9, 10, layout=(start, mine_indices))) == (True, 0)
+
+
+def test_solver_wins_most_beginner_games():
+    wins = sum(solve(Game(9, 9, 10, seed=seed))[0] for seed in range(200))
+    assert wins >= 150
@@ -0,0 +1,356 @@
+import os
+import string
+import time
+from itertools import islice
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from hashing_service import HashingService
+from key_session import PBKDF2_ITERATIONS, KeySession, derive_key
+from record_store import (SALT_SIZE, RecordStore, is_record_store, open_legacy, read_key_envelope,
+                          unwrap_data_key, wrap_data_key)
+from rekey import RekeyJob
+
+# --- Configuration ---
+# File to store encrypted user data. This file will hold all user accounts,
+# each encrypted as its own record (see record_store.py).
+USER_DATA_FILE = "user_data.encrypted"
+
+# Salt for PBKDF2 key derivation in data files from older versions.
+# Current data files store a random salt of their own next to the wrapped data
+# key (see record_store.py); this fixed salt is only needed to open and upgrade
+# files written before that. Changing it will make such files unreadable.
+PBKDF2_SALT = b'a_strong_random_fixed_salt_for_pbkdf2_derivation_for_your_app_12345'
+
+# Profile fields stored with every account, and which of them are whole numbers.
+PROFILE_FIELDS = ["age", "gender", "weight", "height", "occupation"]
+NUMERIC_PROFILE_FIELDS = ["age", "weight", "height"]
+
+
+def password_policy_error(password: str):
+    """
+    Checks if the provided password meets the required security policy:
+    - Minimum length of 8 characters.
+    - At least one uppercase letter.
+    - At least one lowercase letter.
+    - At least one number.
+    - At least one special character (from string.punctuation).
+    Returns None if the policy is met, otherwise a message describing the first failed rule.
+    """
+    if len(password) < 8:
+        return "Password must be at least 8 characters long."
+    if not any(char.isupper() for char in password):
+        return "Password must contain at least one uppercase letter."
+    if not any(char.islower() for char in password):
+        return "Password must contain at least one lowercase letter."
+    if not any(char.isdigit() for char in password):
+        return "Password must contain at least one number."
+    if not any(char in string.punctuation for char in password):
+        return "Password must contain at least one special character."
+    return None
+
+
+def parse_profile(raw_profile: dict) -> dict:
+    """
+    Builds a profile dictionary from raw text values (e.g. form entries or CSV cells).
+    Numeric fields are converted to integers; empty values become None.
+    Raises ValueError with a user-facing message if a numeric field isn't a number.
+    """
+    profile_data = {}
+    for key in PROFILE_FIELDS:
+        value = raw_profile.get(key)
+        value = value.strip() if isinstance(value, str) else value
+        if key in NUMERIC_PROFILE_FIELDS:
+            try:
+                # Attempt to convert to integer; store None if empty.
+                profile_data[key] = int(value) if value not in (None, "") else None
+            except (TypeError, ValueError):
+                raise ValueError(f"Please enter a valid number for {key}.")
+        else:
+            profile_data[key] = value if value not in (None, "") else None # Store string value or None if empty.
+    return profile_data
+
+
+class AccountCore:
+    """
+    The account manager without any user interface: unlocking the encrypted
+    data file, managing the master passphrase, and creating, importing and
+    exporting accounts. The Tk application and the bulk command-line tool
+    are both thin layers on top of this class.
+
+    Methods here report problems by raising exceptions (InvalidToken for a
+    wrong passphrase, ValueError for invalid input) and never show dialogs,
+    so they are safe to call from worker threads and scripts.
+    """
+    def __init__(self, data_file: str = USER_DATA_FILE, hashing: HashingService = None):
+        self.data_file = data_file
+        self.data_key = None # The random key the records are encrypted with, set when data is unlocked
+        self.fernet = None   # Fernet instance for encryption/decryption, tied to data_key
+        # User data: {username: {password_hash: ..., profile: {...}}}
+        # Once unlocked this is a RecordStore, which behaves like a dictionary but
+        # only decrypts an account when it is accessed and writes accounts one by one.
+        self.users = {}
+        # Flag to track if the data is currently unlocked.
+        self.is_data_unlocked = False
+        # Caches the key derived from the master passphrase for a while, so
+        # re-entering the same passphrase (e.g. for "View All Accounts") doesn't re-run PBKDF2.
+        self.key_session = KeySession()
+        # Pool of workers for bcrypt hashing and verification.
+        self.hashing = hashing or HashingService()
+
+    def derive_key(self, passphrase: str):
+        """
+        Stretches a NEW master passphrase with a fresh random salt using PBKDF2HMAC,
+        making it computationally harder to brute-force. Returns (salt, key), ready
+        for `set_master_key`. This is the slow part of setting a passphrase.
+        """
+        salt = os.urandom(SALT_SIZE)
+        return salt, derive_key(passphrase, salt)
+
+    def _passphrase_salt(self) -> bytes:
+        """The salt the master passphrase is stretched with for the current data file."""
+        envelope = read_key_envelope(self.data_file) if is_record_store(self.data_file) else None
+        return envelope.salt if envelope else PBKDF2_SALT
+
+    def has_cached_key(self, passphrase: str) -> bool:
+        """True if `passphrase` matches the key cached for this session (so unlocking is instant)."""
+        return self.has_data() and self.key_session.lookup(passphrase, self._passphrase_salt()) is not None
+
+    def has_data(self) -> bool:
+        """True if the data file exists and has content (i.e. a master passphrase has been set)."""
+        return os.path.exists(self.data_file) and os.path.getsize(self.data_file) > 0
+
+    def load(self, passphrase: str, progress=None):
+        """
+        Decrypts the data file with `passphrase` and returns (users, data key),
+        without changing the unlocked state.
+        Raises InvalidToken if the passphrase is wrong or the data is corrupted.
+
+        The passphrase key comes from the session cache when possible; otherwise it is
+        derived (the slow part) and cached once it has proven able to unwrap the data key.
+        Files from older versions are upgraded to a random data key and a salt of their own.
+        `progress(message, fraction)` is called as each stage starts, if given.
+        """
+        if progress:
+            progress("Stretching master passphrase...", 0.0)
+        # If it's a fresh start, the file might not exist or be empty.
+        if not self.has_data():
+            # No data yet: the passphrase is valid for creating *new* data.
+            return {}, None
+
+        if is_record_store(self.data_file):
+            envelope = read_key_envelope(self.data_file)
+            if envelope is None:
+                raise ValueError(f"{self.data_file} has no readable key slot; it may be corrupted.")
+            key_encryption_key = self.key_session.get_key(passphrase, envelope.salt, envelope.iterations)
+            # If the passphrase is wrong, InvalidToken will be raised here.
+            data_key = unwrap_data_key(key_encryption_key, envelope)
+            if progress:
+                progress("Decrypting account data...", 0.8)
+            users = RecordStore(self.data_file, Fernet(data_key))
+        else:
+            # Files from before the record store are one blob encrypted with the passphrase key, stretched with the fixed salt.
+            legacy_fernet = Fernet(self.key_session.get_key(passphrase, PBKDF2_SALT))
+            old_users = open_legacy(self.data_file, legacy_fernet)
+            if progress:
+                progress("Upgrading data file to the current format...", 0.5)
+            envelope_salt = os.urandom(SALT_SIZE)
+            key_encryption_key = derive_key(passphrase, envelope_salt)
+            data_key = Fernet.generate_key()
+            envelope = wrap_data_key(key_encryption_key, data_key, envelope_salt, PBKDF2_ITERATIONS)
+            users = RecordStore.create(self.data_file, Fernet(data_key), old_users.items(), envelope)
+
+        # The key is now verified, so it's safe to keep it for the session.
+        self.key_session.remember(passphrase, envelope.salt, key_encryption_key)
+        if progress:
+            progress("Done.", 1.0)
+        return users, data_key
+
+    def check_passphrase(self, passphrase: str, progress=None):
+        """
+        Raises InvalidToken unless `passphrase` is the master passphrase of the
+        unlocked data. Unlike `load`, the data file isn't opened again; the key
+        is derived (the slow part) unless cached, and cached once verified.
+        """
+        if progress:
+            progress("Stretching master passphrase...", 0.0)
+        envelope = self.users.envelope
+        key_encryption_key = self.key_session.get_key(passphrase, envelope.salt, envelope.iterations)
+        unwrap_data_key(key_encryption_key, envelope)
+        self.key_session.remember(passphrase, envelope.salt, key_encryption_key)
+        if progress:
+            progress("Done.", 1.0)
+
+    def adopt(self, users, data_key: bytes):
+        """Makes previously loaded data the unlocked data for this session."""
+        self.users = users
+        self.data_key = data_key
+        self.fernet = Fernet(data_key) if data_key else None
+        self.is_data_unlocked = True
+
+    def unlock(self, passphrase: str, progress=None):
+        """Loads the data with `passphrase` and keeps it unlocked for this session."""
+        self.adopt(*self.load(passphrase, progress))
+
+    def set_master_key(self, passphrase: str, new_key):
+        """
+        Makes `passphrase` the master passphrase, given `new_key`, the (salt, key)
+        pair `derive_key` returned for it, and leaves the data unlocked with it.
+        Raises on failure, in which case the caller should `lock()`.
+
+        For unlocked data, only the wrapped copy of the data key is rewritten, so
+        this takes the same time however many accounts there are. Otherwise (the
+        first-time setup) a new data file is created with a random data key.
+        """
+        salt, key_encryption_key = new_key
+        if isinstance(self.users, RecordStore):
+            # An interrupted key rotation has the old passphrase in its header; start it afresh later.
+            self.rollback_rekey()
+            self.users.set_key_envelope(wrap_data_key(key_encryption_key, self.data_key, salt, PBKDF2_ITERATIONS))
+        else:
+            data_key = Fernet.generate_key()
+            envelope = wrap_data_key(key_encryption_key, data_key, salt, PBKDF2_ITERATIONS)
+            self.users = RecordStore.create(self.data_file, Fernet(data_key), self.users.items(), envelope)
+            self.data_key = data_key
+            self.fernet = Fernet(data_key)
+        self.is_data_unlocked = True
+        # The new key is verified now, so cache it in place of the old one.
+        self.key_session.remember(passphrase, salt, key_encryption_key)
+
+    def rotate_data_key(self, passphrase: str, progress=None):
+        """
+        Re-encrypts every record with a new random data key, e.g. if the old one may
+        have leaked. The master passphrase stays the same and must be given again.
+
+        This is done by a streaming `RekeyJob`, so memory use stays flat however many
+        accounts there are. If it is interrupted, the data file keeps the old data key;
+        `pending_rekey` finds the job again and calling this again resumes it.
+        `progress(message, fraction)` is called after each chunk.
+        """
+        envelope = self.users.envelope
+        key_encryption_key = self.key_session.get_key(passphrase, envelope.salt, envelope.iterations)
+        if unwrap_data_key(key_encryption_key, envelope) != self.data_key:
+            raise InvalidToken
+        # The job copies the data file, so journaled changes must be folded in first.
+        self.users.checkpoint()
+        job = RekeyJob.find(self.data_file)
+        new_data_key = None
+        if job is not None:
+            try:
+                new_data_key = unwrap_data_key(key_encryption_key, job.target_envelope())
+            except InvalidToken:
+                # Started under a different passphrase; start over.
+                job.rollback()
+                job = None
+        if job is None:
+            new_data_key = Fernet.generate_key()
+            new_envelope = wrap_data_key(key_encryption_key, new_data_key, envelope.salt, envelope.iterations)
+            job = RekeyJob.start(self.data_file, self.fernet, Fernet(new_data_key), new_envelope)
+        self.users = job.run(self.fernet, Fernet(new_data_key), progress)
+        self.data_key = new_data_key
+        self.fernet = Fernet(new_data_key)
+        self.key_session.remember(passphrase, envelope.salt, key_encryption_key)
+
+    def pending_rekey(self):
+        """Returns the interrupted data key rotation (a RekeyJob) for the data file, or None."""
+        return RekeyJob.find(self.data_file) if self.has_data() else None
+
+    def rollback_rekey(self):
+        """Abandons an interrupted data key rotation; the data keeps its current data key."""
+        job = self.pending_rekey()
+        if job is not None:
+            job.rollback()
+
+    def lock(self):
+        """Returns to a locked state, clearing decrypted data and the cached key from memory."""
+        self.is_data_unlocked = False
+        self.data_key = None
+        self.fernet = None
+        self.users = {}
+        self.key_session.wipe()
+
+    def save_account(self, username: str, account: dict):
+        """
+        Encrypts and saves a single account into the unlocked store.
+        Only that account's record is written (to the write-ahead journal, which is
+        flushed to disk before this returns), however many accounts exist.
+        """
+        self.users[username] = account
+
+    def close(self):
+        """Folds journaled changes into the data file and stops the hashing workers."""
+        try:
+            if isinstance(self.users, RecordStore):
+                self.users.close()
+        finally:
+            self.key_session.wipe()
+            self.hashing.shutdown(wait=False)
+
+    def import_accounts(self, records, chunk_size: int = 1000, progress=None) -> dict:
+        """
+        Adds many accounts in one go. `records` is an iterable of dictionaries with a
+        "username", either a plain "password" or an existing bcrypt "password_hash",
+        and the profile fields (flat, or nested under "profile").
+
+        Records are consumed in chunks, so the input can be streamed. Each chunk is
+        checked against the password policy, its passwords are hashed in parallel on
+        the hashing pool, and everything is committed as a single journal write at
+        the end. Invalid or duplicate records are skipped and reported.
+
+        Returns {"imported": count, "rejected": [(record number, username, reason), ...],
+        "seconds": elapsed}. `progress(imported, rejected)` is called after each chunk.
+        """
+        if not self.is_data_unlocked:
+            raise ValueError("Data is not unlocked. Cannot import accounts.")
+        start = time.perf_counter()
+        imported = 0
+        rejected = []
+        numbered = enumerate(records, 1)
+        with self.users.batch():
+            while True:
+                chunk = list(islice(numbered, chunk_size))
+                if not chunk:
+                    break
+                # Validate the whole chunk first, then hash the survivors in parallel.
+                accepted = []
+                seen = set()
+                for number, raw in chunk:
+                    username = str(raw.get("username") or "").strip()
+                    password = raw.get("password") or ""
+                    password_hash = raw.get("password_hash") or None
+                    try:
+                        if not username:
+                            raise ValueError("Username is required.")
+                        if username in seen or username in self.users:
+                            raise ValueError("Username already exists.")
+                        if password_hash is not None:
+                            if not str(password_hash).startswith("$2"):
+                                raise ValueError("password_hash is not a bcrypt hash.")
+                        else:
+                            if not password:
+                                raise ValueError("Password is required.")
+                            policy_error = password_policy_error(password)
+                            if policy_error:
+                                raise ValueError(policy_error)
+                        profile = parse_profile(raw.get("profile") or raw)
+                    except ValueError as e:
+                        rejected.append((number, username, str(e)))
+                        continue
+                    seen.add(username)
+                    accepted.append((username, password, password_hash, profile))
+
+                to_hash = [password for _, password, password_hash, _ in accepted if password_hash is None]
+                new_hashes = iter(self.hashing.hash_many(to_hash))
+                for username, _, password_hash, profile in accepted:
+                    if password_hash is None:
+                        password_hash = next(new_hashes)
+                    self.users[username] = {"password_hash": password_hash, "profile": profile}
+                imported += len(accepted)
+                if progress:
+                    progress(imported, rejected)
+        return {"imported": imported, "rejected": rejected, "seconds": time.perf_counter() - start}
+
+    def export_accounts(self):
+        """Yields every account as {"username": ..., "password_hash": ..., "profile": {...}}."""
+        for username, account in self.users.items():
+            yield {"username": username, **account}
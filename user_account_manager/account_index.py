@@ -0,0 +1,48 @@
+from bisect import bisect_left
+
+# Highest code point, used as an upper bound when searching for a prefix:
+# every string that starts with `prefix` sorts before `prefix + _MAX_CHAR`.
+_MAX_CHAR = chr(0x10FFFF)
+
+
+class AccountIndex:
+    """
+    A sorted list of usernames for browsing large account stores page by page.
+
+    Only usernames are kept here (never account bodies), so the account list
+    can show any page of a store with tens of thousands of accounts without
+    decrypting a single profile. A prefix filter narrows the list to the
+    usernames that start with it using two binary searches, and refining the
+    filter by typing more characters only searches inside the current match.
+    """
+    def __init__(self, usernames=()):
+        self._names = sorted(usernames)
+        self.prefix = ""
+        # The current filter's matches are self._names[self._start:self._stop].
+        self._start = 0
+        self._stop = len(self._names)
+
+    def __len__(self) -> int:
+        """Number of usernames matching the current filter."""
+        return self._stop - self._start
+
+    @property
+    def total(self) -> int:
+        """Number of usernames in the index, ignoring the filter."""
+        return len(self._names)
+
+    def set_prefix(self, prefix: str):
+        """Filters the index to usernames starting with `prefix` ("" shows all)."""
+        if prefix.startswith(self.prefix):
+            # The new matches are a subset of the current ones.
+            lo, hi = self._start, self._stop
+        else:
+            lo, hi = 0, len(self._names)
+        self._start = bisect_left(self._names, prefix, lo, hi)
+        self._stop = bisect_left(self._names, prefix + _MAX_CHAR, self._start, hi) if prefix else hi
+        self.prefix = prefix
+
+    def page(self, first: int, count: int) -> list:
+        """Returns up to `count` matching usernames, starting at position `first` of the matches."""
+        first = max(0, min(first, len(self)))
+        return self._names[self._start + first:min(self._start + first + count, self._stop)]
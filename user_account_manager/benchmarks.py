@@ -0,0 +1,448 @@
+"""
+Benchmarks for the user account manager's storage and crypto paths.
+
+Run from this directory, for example:
+
+    python benchmarks.py key-session --views 5
+
+None of these need a display; they exercise the same helpers the GUI uses.
+"""
+import argparse
+import json
+import os
+import random
+import secrets
+import string
+import tempfile
+import time
+import tracemalloc
+
+import bcrypt
+from cryptography.fernet import Fernet
+
+from account_core import password_policy_error
+from account_index import AccountIndex
+from hashing_service import HashingService
+from key_session import PBKDF2_ITERATIONS, KeySession, derive_key
+from password_generator import DEFAULT_LENGTH, PasswordGenerator
+from record_codec import decode_record, encode_record
+from record_store import RecordStore, open_legacy, wrap_data_key
+from rekey import RekeyJob
+
+
+def _timed(func, *args):
+    """Runs `func(*args)` and returns (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_key_session(views: int, accounts: int):
+    """
+    Compares unlock and repeat-view latency with and without the session key cache.
+    "Before" re-derives the key on every view (the old behaviour); "after" derives
+    it once at unlock and then serves every repeat view from the cache.
+    """
+    salt = os.urandom(16)
+    passphrase = "correct horse battery staple"
+    users = {f"user{i}": {"password_hash": "$2b$12$" + "x" * 53, "profile": {"age": 30}} for i in range(accounts)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "user_data.encrypted")
+        with open(data_file, "wb") as f:
+            f.write(Fernet(derive_key(passphrase, salt)).encrypt(json.dumps(users, indent=4).encode('utf-8')))
+
+        def load(key):
+            with open(data_file, "rb") as f:
+                return json.loads(Fernet(key).decrypt(f.read()))
+
+        # Before: every view stretches the passphrase from scratch.
+        before = []
+        for _ in range(views + 1):
+            _, elapsed = _timed(lambda: load(derive_key(passphrase, salt)))
+            before.append(elapsed)
+
+        # After: the first unlock pays for PBKDF2, later views hit the cache.
+        session = KeySession()
+        after = []
+        for _ in range(views + 1):
+            def view():
+                key = session.get_key(passphrase, salt)
+                data = load(key)
+                session.remember(passphrase, salt, key)
+                return data
+            _, elapsed = _timed(view)
+            after.append(elapsed)
+        session.wipe()
+
+    print(f"Key session benchmark ({accounts} accounts, {views} repeat views)")
+    print(f"  {'':<8}{'unlock (ms)':>14}{'repeat view avg (ms)':>24}")
+    for label, samples in (("before", before), ("after", after)):
+        repeat = samples[1:]
+        print(f"  {label:<8}{samples[0] * 1000:>14.1f}{sum(repeat) / len(repeat) * 1000:>24.2f}")
+
+
+def _fake_users(count: int) -> dict:
+    """Builds `count` plausible account records without paying for real bcrypt hashes."""
+    return {
+        f"user{i:07d}": {
+            "password_hash": "$2b$12$" + os.urandom(40).hex()[:53],
+            "profile": {"age": 20 + i % 50, "gender": "F" if i % 2 else "M", "weight": 70,
+                        "height": 175, "occupation": "Engineer"},
+        }
+        for i in range(count)
+    }
+
+
+def bench_record_store(accounts: int, registrations: int):
+    """
+    Compares the cost of registering accounts into a store of `accounts` accounts:
+    the old single-blob file (whole dict re-serialized and re-encrypted on every
+    save) against the record store (one record journaled per registration).
+    Also times migrating the old file and re-opening the new one.
+    """
+    fernet = Fernet(Fernet.generate_key())
+    users = _fake_users(accounts)
+    new_users = _fake_users(accounts + registrations)
+    new_names = list(new_users)[accounts:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blob_file = os.path.join(tmp, "blob.encrypted")
+
+        def save_blob():
+            with open(blob_file, "wb") as f:
+                f.write(fernet.encrypt(json.dumps(users, indent=4).encode('utf-8')))
+
+        _, blob_initial = _timed(save_blob)
+        blob_size = os.path.getsize(blob_file)
+        blob_times = []
+        for name in new_names:
+            users[name] = new_users[name]
+            blob_times.append(_timed(save_blob)[1])
+
+        store_file = os.path.join(tmp, "store.encrypted")
+        os.replace(blob_file, store_file)
+        store, migrate_time = _timed(lambda: RecordStore.create(store_file, fernet, open_legacy(store_file, fernet).items()))
+        store_size = os.path.getsize(store_file)
+        _, open_time = _timed(RecordStore, store_file, fernet)
+
+        store_times = []
+        for i, name in enumerate(new_names):
+            record = dict(new_users[name], profile=dict(new_users[name]["profile"], age=99))
+            store_times.append(_timed(store.__setitem__, f"new{i}", record)[1])
+        _, lookup_time = _timed(store.__getitem__, new_names[0])
+
+    print(f"Record store benchmark ({accounts} accounts, {registrations} registrations)")
+    print(f"  single blob:  initial save {blob_initial * 1000:.0f} ms, {blob_size / 1e6:.1f} MB, "
+          f"per registration {sum(blob_times) / len(blob_times) * 1000:.1f} ms")
+    print(f"  record store: migration {migrate_time * 1000:.0f} ms, open {open_time * 1000:.0f} ms, "
+          f"{store_size / 1e6:.1f} MB, per registration {sum(store_times) / len(store_times) * 1000:.2f} ms, "
+          f"single lookup {lookup_time * 1000:.2f} ms")
+
+
+def bench_journal(accounts: int, changes: int):
+    """
+    Compares making `changes` registrations durable one at a time (one journal
+    fsync each) against a single group commit, then times the checkpoint that
+    folds them into a main file of `accounts` accounts.
+    """
+    fernet = Fernet(Fernet.generate_key())
+    users = _fake_users(accounts + 2 * changes)
+    names = list(users)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordStore.create(os.path.join(tmp, "store.encrypted"), fernet,
+                                   ((name, users[name]) for name in names[:accounts]))
+
+        def one_by_one():
+            for name in names[accounts:accounts + changes]:
+                store[name] = users[name]
+
+        def group_commit():
+            with store.batch():
+                for name in names[accounts + changes:]:
+                    store[name] = users[name]
+
+        _, single_time = _timed(one_by_one)
+        _, batch_time = _timed(group_commit)
+        _, checkpoint_time = _timed(store.checkpoint)
+
+    print(f"Journal benchmark ({accounts} accounts, {changes} changes)")
+    print(f"  one fsync per change: {single_time * 1000:.0f} ms ({changes / single_time:.0f} changes/sec)")
+    print(f"  group commit:         {batch_time * 1000:.0f} ms ({changes / batch_time:.0f} changes/sec)")
+    print(f"  checkpoint:           {checkpoint_time * 1000:.0f} ms")
+
+
+def bench_hashing(logins: int, work_factor: int, max_workers: int, use_processes: bool):
+    """
+    Measures bcrypt login verification throughput (logins/sec) as the number
+    of hashing workers grows, against checking each login one after another.
+    """
+    with HashingService(workers=1, work_factor=work_factor) as service:
+        stored_hash = service.hash_password("Correct#Horse1").result()
+
+    pairs = [("Correct#Horse1" if i % 2 else "Wrong#Guess1", stored_hash) for i in range(logins)]
+    pool_kind = "processes" if use_processes else "threads"
+    print(f"Hashing benchmark ({logins} logins, work factor {work_factor}, {pool_kind})")
+
+    _, sequential = _timed(lambda: [bcrypt.checkpw(password.encode('utf-8'), h.encode('utf-8')) for password, h in pairs])
+    print(f"  {'sequential':<12}{logins / sequential:>10.1f} logins/sec")
+
+    workers = 1
+    while workers <= max_workers:
+        with HashingService(workers=workers, work_factor=work_factor, use_processes=use_processes) as service:
+            _, elapsed = _timed(lambda: list(service.check_many(pairs)))
+        print(f"  {f'{workers} workers':<12}{logins / elapsed:>10.1f} logins/sec  ({sequential / elapsed:.2f}x)")
+        workers *= 2
+
+
+def bench_account_list(accounts: int, searches: int):
+    """
+    Compares opening the account list the old way (every account decrypted into
+    a dict) with the paged view (sorted username index plus one page), and
+    times prefix searches on the index against scanning every username.
+
+    The paged view is timed both ways the GUI opens it: with the data locked,
+    where the store has to be opened first (every username decrypted), and with
+    it unlocked, where the index is built from the open store's usernames.
+    """
+    fernet = Fernet(Fernet.generate_key())
+    users = _fake_users(accounts)
+    prefixes = [f"user{i % 1000:04d}"[:6 + i % 3] for i in range(searches)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store.encrypted")
+        RecordStore.create(path, fernet, users.items()).close()
+        del users
+
+        def decrypt_all():
+            store = RecordStore(path, fernet)
+            users = dict(store.items())
+            store.close()
+            return users
+
+        def open_list():
+            store = RecordStore(path, fernet)
+            return store, AccountIndex(store.keys())
+
+        _, full_time = _timed(decrypt_all)
+        (store, _), locked_time = _timed(open_list)
+        index, index_time = _timed(lambda: AccountIndex(store.keys()))
+        _, page_time = _timed(index.page, accounts // 2, 15)
+
+        names = list(store)
+        _, scan_time = _timed(lambda: [[name for name in names if name.startswith(p)] for p in prefixes])
+
+        def search():
+            for prefix in prefixes:
+                index.set_prefix(prefix)
+                index.page(0, 15)
+        _, search_time = _timed(search)
+        store.close()
+
+    print(f"Account list benchmark ({accounts} accounts, {searches} prefix searches)")
+    print(f"  decrypt every account: {full_time * 1000:.0f} ms")
+    print(f"  open store and index:  {locked_time * 1000:.0f} ms (data locked)")
+    print(f"  sorted index:          {index_time * 1000:.0f} ms (data unlocked), one page {page_time * 1e6:.0f} us")
+    print(f"  prefix search:         scan {scan_time / searches * 1000:.2f} ms, "
+          f"index {search_time / searches * 1e6:.1f} us per search")
+
+
+def _peak_memory(func, *args):
+    """Runs `func(*args)` and returns (result, elapsed seconds, peak traced memory in bytes)."""
+    tracemalloc.start()
+    try:
+        result, elapsed = _timed(func, *args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_rekey(accounts: int):
+    """
+    Compares re-encrypting a store by decrypting every account into memory and
+    writing them all back out with a new key, against the streaming
+    re-encryption job used to rotate the data key. Reports time and peak Python
+    memory; the streaming figure includes opening the finished store (its
+    username index), while the job itself only ever holds one chunk of records.
+    Also times a master passphrase change, which only rewraps the data key.
+    """
+    keys = [Fernet(Fernet.generate_key()) for _ in range(3)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store.encrypted")
+        store = RecordStore.create(path, keys[0], _fake_users(accounts).items())
+
+        def in_memory():
+            users = dict(store.items())
+            return RecordStore.create(path, keys[1], users.items())
+
+        store, memory_time, memory_peak = _peak_memory(in_memory)
+
+        def streaming():
+            return RekeyJob.start(path, keys[1], keys[2]).run(keys[1], keys[2])
+
+        store, stream_time, stream_peak = _peak_memory(streaming)
+
+        data_key = Fernet.generate_key()
+        salt = os.urandom(16)
+        kek = derive_key("new passphrase", salt)
+        _, rewrap_time = _timed(lambda: store.set_key_envelope(
+            wrap_data_key(kek, data_key, salt, PBKDF2_ITERATIONS)))
+        store.close()
+
+    print(f"Re-encryption benchmark ({accounts} accounts)")
+    print(f"  in memory: {memory_time:.2f} s, peak {memory_peak / 1e6:.1f} MB")
+    print(f"  streaming: {stream_time:.2f} s, peak {stream_peak / 1e6:.1f} MB")
+    print(f"  passphrase change (rewrap the data key, after PBKDF2): {rewrap_time * 1000:.2f} ms")
+
+
+def _fernet_size(plaintext_len: int, raw: bool) -> int:
+    """Length of the Fernet token for `plaintext_len` bytes, as raw bytes or as base64 text."""
+    size = 57 + 16 * (plaintext_len // 16 + 1)
+    return size if raw else 4 * ((size + 2) // 3)
+
+
+def bench_codec(counts, store_limit: int):
+    """
+    Compares the old JSON serialization (the whole dict as indented JSON, or
+    one compact JSON body per record) with the binary record format: bytes
+    on disk and time to decode every record. For stores of up to
+    `store_limit` accounts, also times a full load with real encryption:
+    the old single encrypted blob against the record store.
+    """
+    print("Record format benchmark")
+    for count in counts:
+        users = _fake_users(count)
+        names = list(users)
+
+        blob = json.dumps(users, indent=4).encode('utf-8')
+        blob_size = _fernet_size(len(blob), raw=False)
+        _, blob_parse = _timed(json.loads, blob)
+        del blob
+
+        json_bodies = [json.dumps(record, separators=(",", ":")).encode('utf-8') for record in users.values()]
+        binary_bodies = [encode_record(record) for record in users.values()]
+        name_bytes = [len(name.encode('utf-8')) for name in names]
+        # Per-slot overhead: the 11-byte slot header, with both tokens stored base64 (old) or raw (new).
+        json_size = sum(11 + _fernet_size(n, raw=False) + _fernet_size(len(b), raw=False) for n, b in zip(name_bytes, json_bodies))
+        binary_size = sum(11 + _fernet_size(n, raw=True) + _fernet_size(len(b), raw=True) for n, b in zip(name_bytes, binary_bodies))
+        _, json_parse = _timed(lambda: [json.loads(body) for body in json_bodies])
+        _, binary_parse = _timed(lambda: [decode_record(body) for body in binary_bodies])
+
+        print(f"  {count} accounts")
+        print(f"    indented JSON blob: {blob_size / 1e6:8.1f} MB, parse {blob_parse * 1000:7.0f} ms")
+        print(f"    JSON records:       {json_size / 1e6:8.1f} MB, parse {json_parse * 1000:7.0f} ms "
+              f"({sum(map(len, json_bodies)) / count:.0f} bytes/record)")
+        print(f"    binary records:     {binary_size / 1e6:8.1f} MB, parse {binary_parse * 1000:7.0f} ms "
+              f"({sum(map(len, binary_bodies)) / count:.0f} bytes/record)")
+        del json_bodies, binary_bodies
+
+        if count > store_limit:
+            continue
+        fernet = Fernet(Fernet.generate_key())
+        with tempfile.TemporaryDirectory() as tmp:
+            blob_file = os.path.join(tmp, "blob.encrypted")
+            with open(blob_file, "wb") as f:
+                f.write(fernet.encrypt(json.dumps(users, indent=4).encode('utf-8')))
+
+            def load_blob():
+                with open(blob_file, "rb") as f:
+                    return json.loads(fernet.decrypt(f.read()))
+
+            store_file = os.path.join(tmp, "store.encrypted")
+            RecordStore.create(store_file, fernet, users.items())
+            del users
+            _, blob_load = _timed(load_blob)
+            _, store_load = _timed(lambda: dict(RecordStore(store_file, fernet).items()))
+            print(f"    full load with decryption: blob {blob_load * 1000:.0f} ms ({os.path.getsize(blob_file) / 1e6:.1f} MB), "
+                  f"record store {store_load * 1000:.0f} ms ({os.path.getsize(store_file) / 1e6:.1f} MB)")
+
+
+def _per_character_password(length: int, choice) -> str:
+    """The old approach: one of each class, then single characters from the full pool, then a shuffle."""
+    classes = (string.ascii_lowercase, string.ascii_uppercase, string.digits, string.punctuation)
+    chars = [choice(members) for members in classes]
+    chars.extend(choice("".join(classes)) for _ in range(length - len(classes)))
+    random.shuffle(chars)
+    return "".join(chars)
+
+
+def bench_passwords(count: int, length: int, baseline_count: int):
+    """
+    Compares building passwords one character at a time (with random.choice,
+    as before, and with secrets.choice, its secure drop-in) against the batch
+    generator. The per-character approaches are timed on `baseline_count`
+    passwords and reported as a rate.
+    """
+    generator = PasswordGenerator(length)
+    print(f"Password generation benchmark ({length} characters, all four classes)")
+    for name, choice in (("random.choice", random.choice), ("secrets.choice", secrets.choice)):
+        _, elapsed = _timed(lambda: [_per_character_password(length, choice) for _ in range(baseline_count)])
+        print(f"  per character ({name}): {baseline_count / elapsed:,.0f} passwords/sec ({baseline_count} generated)")
+    passwords, elapsed = _timed(generator.generate, count)
+    print(f"  batch (secrets.token_bytes): {count / elapsed:,.0f} passwords/sec, {count} in {elapsed:.2f} s")
+    failures = sum(password_policy_error(password) is not None for password in passwords)
+    print(f"  batch passwords failing the account password policy: {failures}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="User account manager benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    key_session_parser = subparsers.add_parser("key-session", help="Unlock and repeat-view latency with the session key cache.")
+    key_session_parser.add_argument("--views", type=int, default=5, help="Number of repeat views after the first unlock.")
+    key_session_parser.add_argument("--accounts", type=int, default=1000, help="Number of accounts in the data file.")
+
+    record_store_parser = subparsers.add_parser("record-store", help="Per-registration cost: single blob vs record store.")
+    record_store_parser.add_argument("--accounts", type=int, default=100000, help="Number of existing accounts.")
+    record_store_parser.add_argument("--registrations", type=int, default=5, help="Number of accounts to register.")
+
+    journal_parser = subparsers.add_parser("journal", help="Write-ahead journal: per-change fsync vs group commit.")
+    journal_parser.add_argument("--accounts", type=int, default=10000, help="Number of accounts in the main file.")
+    journal_parser.add_argument("--changes", type=int, default=1000, help="Number of registrations to make durable.")
+
+    hashing_parser = subparsers.add_parser("hashing", help="bcrypt login throughput versus worker count.")
+    hashing_parser.add_argument("--logins", type=int, default=64, help="Number of logins to verify.")
+    hashing_parser.add_argument("--work-factor", type=int, default=10, help="bcrypt cost factor.")
+    hashing_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest pool size to try.")
+    hashing_parser.add_argument("--processes", action="store_true", help="Use a process pool instead of threads.")
+
+    account_list_parser = subparsers.add_parser("account-list", help="Opening and searching the paged account list.")
+    account_list_parser.add_argument("--accounts", type=int, default=50000, help="Number of accounts in the store.")
+    account_list_parser.add_argument("--searches", type=int, default=100, help="Number of prefix searches to time.")
+
+    rekey_parser = subparsers.add_parser("rekey", help="Re-encrypting the store (in memory vs streaming) and changing the passphrase.")
+    rekey_parser.add_argument("--accounts", type=int, default=50000, help="Number of accounts in the store.")
+
+    codec_parser = subparsers.add_parser("codec", help="Size and load time: JSON vs the binary record format.")
+    codec_parser.add_argument("--accounts", type=int, nargs="+", default=[10000, 100000, 1000000], help="Store sizes to measure.")
+    codec_parser.add_argument("--store-limit", type=int, default=100000, help="Largest store to also encrypt and load for real.")
+
+    passwords_parser = subparsers.add_parser("passwords", help="Password generation: per character vs batch.")
+    passwords_parser.add_argument("--count", type=int, default=1000000, help="Number of passwords to generate in a batch.")
+    passwords_parser.add_argument("--length", type=int, default=DEFAULT_LENGTH, help="Password length.")
+    passwords_parser.add_argument("--baseline-count", type=int, default=100000, help="Number of passwords for the per-character timings.")
+
+    args = parser.parse_args()
+    if args.benchmark == "key-session":
+        bench_key_session(args.views, args.accounts)
+    elif args.benchmark == "record-store":
+        bench_record_store(args.accounts, args.registrations)
+    elif args.benchmark == "journal":
+        bench_journal(args.accounts, args.changes)
+    elif args.benchmark == "hashing":
+        bench_hashing(args.logins, args.work_factor, args.max_workers, args.processes)
+    elif args.benchmark == "account-list":
+        bench_account_list(args.accounts, args.searches)
+    elif args.benchmark == "rekey":
+        bench_rekey(args.accounts)
+    elif args.benchmark == "codec":
+        bench_codec(args.accounts, args.store_limit)
+    elif args.benchmark == "passwords":
+        bench_passwords(args.count, args.length, args.baseline_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Bulk account import and export without the GUI.
+
+Run from this directory, for example:
+
+    python bulk_accounts.py import accounts.csv
+    python bulk_accounts.py export backup.jsonl
+    python bulk_accounts.py rotate-key
+
+Import files are CSV (with a header row) or JSON Lines, one account per
+record, with a "username", a "password" (or an existing bcrypt
+"password_hash") and any of the profile fields. Records are streamed, so the
+input can be larger than memory. The master passphrase is prompted for, or
+read from the environment variable named by --passphrase-env.
+
+rotate-key re-encrypts every account with a new random data key (the master
+passphrase stays the same). It can be interrupted and run again to resume.
+"""
+import argparse
+import csv
+import getpass
+import json
+import os
+import sys
+import time
+
+from cryptography.fernet import InvalidToken
+
+from account_core import AccountCore, PROFILE_FIELDS, USER_DATA_FILE
+from hashing_service import DEFAULT_WORK_FACTOR, HashingService
+
+# How many rejected records to list before summarizing the rest.
+MAX_REJECTIONS_SHOWN = 20
+
+
+def _detect_format(path: str, requested: str) -> str:
+    if requested:
+        return requested
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def read_records(f, file_format: str):
+    """Yields account dictionaries from an open CSV or JSON Lines file."""
+    if file_format == "csv":
+        yield from csv.DictReader(f)
+        return
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number} is not valid JSON: {e}")
+
+
+def write_records(f, file_format: str, records):
+    """Writes exported accounts to an open file; returns how many were written."""
+    count = 0
+    if file_format == "csv":
+        writer = csv.DictWriter(f, fieldnames=["username", "password_hash", *PROFILE_FIELDS])
+        writer.writeheader()
+        for record in records:
+            profile = record.get("profile") or {}
+            writer.writerow({"username": record["username"], "password_hash": record["password_hash"],
+                             **{key: "" if profile.get(key) is None else profile[key] for key in PROFILE_FIELDS}})
+            count += 1
+    else:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def _get_passphrase(args, confirm: bool) -> str:
+    if args.passphrase_env:
+        passphrase = os.environ.get(args.passphrase_env)
+        if not passphrase:
+            sys.exit(f"Environment variable {args.passphrase_env} is not set.")
+        return passphrase
+    passphrase = getpass.getpass("Master passphrase: ")
+    if confirm and getpass.getpass("Confirm master passphrase: ") != passphrase:
+        sys.exit("Passphrases do not match.")
+    if not passphrase:
+        sys.exit("A master passphrase is required.")
+    return passphrase
+
+
+def _unlock(core: AccountCore, args, allow_setup: bool):
+    """
+    Unlocks the data file, or sets up a new one on first use if allowed.
+    Returns the passphrase used.
+    """
+    if not core.has_data():
+        if not allow_setup:
+            sys.exit(f"No data found in {core.data_file}.")
+        print(f"No data found in {core.data_file}; setting a new master passphrase.")
+        passphrase = _get_passphrase(args, confirm=True)
+        core.set_master_key(passphrase, core.derive_key(passphrase))
+        return passphrase
+    passphrase = _get_passphrase(args, confirm=False)
+    try:
+        core.unlock(passphrase)
+    except InvalidToken:
+        sys.exit("Incorrect master passphrase or corrupted data file.")
+    return passphrase
+
+
+def run_import(core: AccountCore, args):
+    _unlock(core, args, allow_setup=True)
+    file_format = _detect_format(args.path, args.format)
+
+    def report(imported, rejected):
+        print(f"  {imported} imported, {len(rejected)} rejected...", end="\r", flush=True)
+
+    with open(args.path, newline="", encoding="utf-8") as f:
+        result = core.import_accounts(read_records(f, file_format), chunk_size=args.chunk_size, progress=report)
+
+    imported, rejected, seconds = result["imported"], result["rejected"], result["seconds"]
+    total = imported + len(rejected)
+    rate = total / seconds if seconds else 0.0
+    print(f"Imported {imported} accounts, rejected {len(rejected)}, in {seconds:.2f} s ({rate:.1f} records/sec).")
+    for number, username, reason in rejected[:MAX_REJECTIONS_SHOWN]:
+        print(f"  record {number} ({username or 'no username'}): {reason}")
+    if len(rejected) > MAX_REJECTIONS_SHOWN:
+        print(f"  ... and {len(rejected) - MAX_REJECTIONS_SHOWN} more.")
+
+
+def run_export(core: AccountCore, args):
+    _unlock(core, args, allow_setup=False)
+    file_format = _detect_format(args.path, args.format)
+    with open(args.path, "w", newline="", encoding="utf-8") as f:
+        count = write_records(f, file_format, core.export_accounts())
+    print(f"Exported {count} accounts to {args.path}.")
+
+
+def run_rotate_key(core: AccountCore, args):
+    passphrase = _unlock(core, args, allow_setup=False)
+    job = core.pending_rekey()
+    if job is not None:
+        print(f"Resuming an interrupted rotation ({job.state['records_done']} accounts already done).")
+
+    def report(message, fraction):
+        print(f"  {message} ({int(fraction * 100)}%)", end="\r", flush=True)
+
+    start = time.perf_counter()
+    core.rotate_data_key(passphrase, progress=report)
+    print(f"Re-encrypted {len(core.users)} accounts with a new data key in {time.perf_counter() - start:.2f} s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export user accounts without the GUI.")
+    parser.add_argument("--data-file", default=USER_DATA_FILE, help="Encrypted data file to use.")
+    parser.add_argument("--passphrase-env", help="Read the master passphrase from this environment variable instead of prompting.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of hashing workers (default: one per CPU).")
+    parser.add_argument("--work-factor", type=int, default=DEFAULT_WORK_FACTOR, help="bcrypt cost factor for new hashes.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Add accounts from a CSV or JSON Lines file.")
+    import_parser.add_argument("path", help="File to read accounts from.")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from the file extension).")
+    import_parser.add_argument("--chunk-size", type=int, default=1000, help="Records validated and hashed per chunk.")
+
+    export_parser = subparsers.add_parser("export", help="Write all accounts (with password hashes) to a file.")
+    export_parser.add_argument("path", help="File to write accounts to.")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from the file extension).")
+
+    subparsers.add_parser("rotate-key", help="Re-encrypt every account with a new data key.")
+
+    args = parser.parse_args()
+    core = AccountCore(args.data_file, HashingService(workers=args.workers, work_factor=args.work_factor))
+    try:
+        if args.command == "import":
+            run_import(core, args)
+        elif args.command == "export":
+            run_export(core, args)
+        else:
+            run_rotate_key(core, args)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+    finally:
+        core.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+
+# bcrypt cost factor: each step doubles the time a hash takes. 12 is bcrypt's default.
+DEFAULT_WORK_FACTOR = 12
+
+
+def _hash_password(password: str, work_factor: int) -> str:
+    """Hashes `password` with a fresh random salt. Module level so process pools can pickle it."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=work_factor)).decode('utf-8')
+
+
+def _check_password(password: str, stored_hash: str) -> bool:
+    """Checks `password` against a stored bcrypt hash. Module level so process pools can pickle it."""
+    return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+
+
+class HashingService:
+    """
+    Runs bcrypt hashing and verification on a pool of workers and returns
+    futures, so neither the Tk event loop nor a batch job has to wait on each
+    hash in turn.
+
+    bcrypt releases the GIL while it works, so the default thread pool already
+    spreads hashes across CPU cores. Pass `use_processes=True` to use a process
+    pool instead (useful if a bcrypt build ever holds the GIL).
+    To deliver results to Tk widgets, hand the futures to `TkTaskRunner.watch`.
+    """
+    def __init__(self, workers: int = None, work_factor: int = DEFAULT_WORK_FACTOR, use_processes: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.work_factor = work_factor
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=self.workers)
+
+    def hash_password(self, password: str):
+        """Starts hashing `password`; the returned future resolves to the hash string."""
+        return self._executor.submit(_hash_password, password, self.work_factor)
+
+    def check_password(self, password: str, stored_hash: str):
+        """Starts verifying `password`; the returned future resolves to True or False."""
+        return self._executor.submit(_check_password, password, stored_hash)
+
+    def hash_many(self, passwords):
+        """Hashes many passwords in parallel, yielding the hashes in input order."""
+        return self._executor.map(_hash_password, passwords, repeat(self.work_factor))
+
+    def check_many(self, pairs):
+        """Verifies many (password, stored_hash) pairs in parallel, yielding results in input order."""
+        pairs = list(pairs)
+        passwords = [password for password, _ in pairs]
+        hashes = [stored_hash for _, stored_hash in pairs]
+        return self._executor.map(_check_password, passwords, hashes)
+
+    def shutdown(self, wait: bool = True):
+        """Stops the worker pool. Pending work is cancelled when `wait` is False."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,125 @@
+import os
+import struct
+import threading
+import zlib
+
+# --- Write-Ahead Log Format ---
+#
+#   file header: WAL_MAGIC | generation (8 bytes)
+#   entry:       payload_len (4) | crc32 (4) | payload
+#   payload:     op (1) | name_len (2) | body_len (4) | name token | body token
+#
+# Tokens are already Fernet-encrypted by the store, so the journal never holds
+# plaintext. The generation must match the one in the main data file's header;
+# a journal left over from an older generation of the file (for example after a
+# checkpoint that crashed before the journal was cleared) is discarded.
+WAL_MAGIC = b"UAMWAL\x01"
+WAL_HEADER_SIZE = len(WAL_MAGIC) + 8
+ENTRY_HEADER = struct.Struct(">II")
+PAYLOAD_HEADER = struct.Struct(">BHI")
+
+OP_PUT = 1
+OP_DELETE = 2
+
+
+def fsync_directory(path: str):
+    """
+    Flushes the directory entry of `path` so a rename into it survives a crash.
+    Directories can't be opened for fsync on Windows, where this is a no-op.
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def encode_entry(op: int, name_token: bytes, body_token: bytes = b"") -> bytes:
+    """Builds one journal entry, checksummed so a torn write can be detected."""
+    payload = PAYLOAD_HEADER.pack(op, len(name_token), len(body_token)) + name_token + body_token
+    return ENTRY_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class Journal:
+    """
+    An append-only, fsync'd log of encrypted record changes.
+
+    Every call to `append` writes a group of entries and makes them durable
+    with a single fsync (group commit), so a batch of a thousand changes costs
+    one disk flush rather than a thousand.
+    """
+    def __init__(self, path: str, generation: bytes):
+        self.path = path
+        self.generation = generation
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Current size of the journal file in bytes (0 if it doesn't exist)."""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def replay(self):
+        """
+        Returns the list of (op, name_token, body_token) entries recorded for
+        this generation, in the order they were written. A torn or corrupt
+        tail (from a crash mid-append) is cut off, and a journal from another
+        generation is discarded.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        if data[:len(WAL_MAGIC)] != WAL_MAGIC or data[len(WAL_MAGIC):WAL_HEADER_SIZE] != self.generation:
+            self.reset(self.generation)
+            return []
+
+        entries = []
+        offset = WAL_HEADER_SIZE
+        while offset + ENTRY_HEADER.size <= len(data):
+            payload_len, checksum = ENTRY_HEADER.unpack_from(data, offset)
+            payload = data[offset + ENTRY_HEADER.size:offset + ENTRY_HEADER.size + payload_len]
+            if len(payload) < payload_len or zlib.crc32(payload) != checksum:
+                break
+            op, name_len, body_len = PAYLOAD_HEADER.unpack_from(payload)
+            name_start = PAYLOAD_HEADER.size
+            body_start = name_start + name_len
+            entries.append((op, payload[name_start:body_start], payload[body_start:body_start + body_len]))
+            offset += ENTRY_HEADER.size + payload_len
+
+        if offset < len(data):
+            # Drop the incomplete tail so new entries follow the last good one.
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+        return entries
+
+    def append(self, entries):
+        """Appends already-encoded entries and makes them durable with one fsync."""
+        if not entries:
+            return
+        with self._lock:
+            new_file = self.size == 0
+            with open(self.path, "ab") as f:
+                if new_file:
+                    f.write(WAL_MAGIC + self.generation)
+                f.write(b"".join(entries))
+                f.flush()
+                os.fsync(f.fileno())
+            if new_file:
+                fsync_directory(self.path)
+
+    def reset(self, generation: bytes):
+        """Empties the journal and ties it to a new generation of the data file."""
+        with self._lock:
+            self.generation = generation
+            with open(self.path, "wb") as f:
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.backends import default_backend
+
+# Iteration count used when stretching the master passphrase with PBKDF2HMAC.
+# This is deliberately expensive (roughly half a second on a typical machine),
+# which is exactly why the derived key is cached for the session below.
+PBKDF2_ITERATIONS = 480000
+
+# Default time-to-live for a cached key, in seconds. After this, the key is
+# wiped from memory (by a timer, so an idle session doesn't keep it) and the
+# passphrase has to be stretched again.
+DEFAULT_SESSION_TTL = 300
+
+
+def derive_key(passphrase: str, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+    """
+    Derives a Fernet key (32 bytes, base64 URL-safe encoded) from a passphrase
+    using PBKDF2HMAC. This is the slow step the session cache exists to avoid.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(), # Hashing algorithm to use
+        length=32,                 # Fernet requires a 32 byte key
+        salt=salt,                 # Salt for key derivation
+        iterations=iterations,     # High iteration count for strong key stretching
+        backend=default_backend()  # Cryptographic backend
+    )
+    return base64.urlsafe_b64encode(kdf.derive(passphrase.encode('utf-8')))
+
+
+class KeySession:
+    """
+    Keeps the most recently verified master key in memory so repeated unlocks
+    with the same passphrase (e.g. "View All Accounts") skip PBKDF2 entirely.
+
+    The passphrase itself is never stored. Instead, a keyed fingerprint
+    (HMAC-SHA256 with a random per-session pepper) is kept next to the key,
+    so a freshly typed passphrase can be matched against the cache in
+    microseconds. The cached key expires after `ttl` seconds without use,
+    when a timer wipes it, and can be wiped explicitly at any time with `wipe()`.
+    """
+    def __init__(self, ttl: float = DEFAULT_SESSION_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Random pepper for fingerprints; it never leaves this object.
+        self._pepper = secrets.token_bytes(32)
+        self._fingerprint = None
+        self._key = None # bytearray, so it can be zeroed on wipe
+        self._expires_at = 0.0
+        self._timer = None
+
+    def _fingerprint_for(self, passphrase: str, salt: bytes) -> bytes:
+        """Computes the keyed fingerprint used to match passphrases against the cache."""
+        return hmac.new(self._pepper, salt + b'\x00' + passphrase.encode('utf-8'), hashlib.sha256).digest()
+
+    def _wipe_locked(self):
+        """Zeroes and drops the cached key. The caller must hold `self._lock`."""
+        if self._key is not None:
+            for i in range(len(self._key)):
+                self._key[i] = 0
+        self._key = None
+        self._fingerprint = None
+        self._expires_at = 0.0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule_expiry_locked(self, delay: float):
+        """Starts a timer to wipe the key once it expires. The caller must hold `self._lock`."""
+        self._timer = threading.Timer(delay, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self):
+        """Runs on the timer thread: wipes the key, unless a lookup has extended its time since."""
+        with self._lock:
+            if self._key is None or threading.current_thread() is not self._timer:
+                return
+            remaining = self._expires_at - self._clock()
+            if remaining > 0:
+                self._schedule_expiry_locked(remaining)
+            else:
+                self._wipe_locked()
+
+    def lookup(self, passphrase: str, salt: bytes):
+        """
+        Returns the cached key if `passphrase` matches the cached one and the
+        session hasn't expired, otherwise None. A hit refreshes the time-to-live.
+        """
+        fingerprint = self._fingerprint_for(passphrase, salt)
+        with self._lock:
+            if self._key is None:
+                return None
+            if self._clock() >= self._expires_at:
+                # The session timed out; make sure the stale key doesn't linger.
+                self._wipe_locked()
+                return None
+            if not hmac.compare_digest(fingerprint, self._fingerprint):
+                return None
+            self._expires_at = self._clock() + self.ttl
+            return bytes(self._key)
+
+    def remember(self, passphrase: str, salt: bytes, key: bytes):
+        """
+        Caches `key` as the key for `passphrase`. Only call this once the key
+        has been verified (i.e. it successfully decrypted the data), so a
+        mistyped passphrase never ends up in the cache.
+        """
+        fingerprint = self._fingerprint_for(passphrase, salt)
+        with self._lock:
+            self._wipe_locked()
+            self._fingerprint = fingerprint
+            self._key = bytearray(key)
+            self._expires_at = self._clock() + self.ttl
+            self._schedule_expiry_locked(self.ttl)
+
+    def get_key(self, passphrase: str, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+        """Returns the cached key for `passphrase`, deriving it (uncached) on a miss."""
+        key = self.lookup(passphrase, salt)
+        if key is None:
+            key = derive_key(passphrase, salt, iterations)
+        return key
+
+    def wipe(self):
+        """Explicitly forgets the cached key, e.g. when locking or closing the app."""
+        with self._lock:
+            self._wipe_locked()
+
+    @property
+    def is_active(self) -> bool:
+        """True while a non-expired key is cached."""
+        with self._lock:
+            return self._key is not None and self._clock() < self._expires_at
@@ -0,0 +1,121 @@
+"""
+Batch password generation from the operating system's CSPRNG.
+
+Run from this directory to print passwords, one per line, for example:
+
+    python password_generator.py --count 1000 --length 16 > passwords.txt
+    python password_generator.py --count 50 --no-special
+"""
+import argparse
+import secrets
+import string
+import sys
+from itertools import combinations
+
+# Character classes a password can be built from. Every selected class
+# appears at least once in each generated password.
+CHARACTER_CLASSES = {
+    "lower": string.ascii_lowercase,
+    "upper": string.ascii_uppercase,
+    "digits": string.digits,
+    "special": string.punctuation,
+}
+DEFAULT_LENGTH = 16
+
+# Passwords generated per block of random bytes; bounds memory for large batches.
+BLOCK_PASSWORDS = 8192
+
+
+class PasswordGenerator:
+    """
+    Turns large blocks of `secrets.token_bytes` into many passwords at once.
+
+    Each random byte is mapped to a character with one `bytes.translate`
+    call per block: bytes below the largest multiple of the alphabet size
+    are mapped to `alphabet[byte % size]`, and the rest are deleted
+    (rejection sampling), so every character is equally likely. The
+    resulting stream is cut into passwords, and any password missing one of
+    the selected classes is discarded whole, which keeps the accepted
+    passwords uniformly distributed over all passwords that meet the policy
+    (rather than forcing one character of each class into fixed positions).
+    """
+    def __init__(self, length: int = DEFAULT_LENGTH, classes=tuple(CHARACTER_CLASSES)):
+        classes = tuple(classes)
+        if not classes:
+            raise ValueError("Select at least one character type.")
+        unknown = [name for name in classes if name not in CHARACTER_CLASSES]
+        if unknown:
+            raise ValueError(f"Unknown character type: {', '.join(unknown)}.")
+        if length < len(classes):
+            raise ValueError(f"A password with {len(classes)} character types must be at least {len(classes)} characters long.")
+        self.length = length
+        self.classes = classes
+
+        alphabet = "".join(CHARACTER_CLASSES[name] for name in classes).encode('ascii')
+        size = len(alphabet)
+        limit = 256 - 256 % size
+        self._char_table = bytes(alphabet[byte % size] for byte in range(limit)) + bytes(256 - limit)
+        self._rejected_bytes = bytes(range(limit, 256))
+        # Maps each character to the index of its class, for the policy check.
+        class_table = bytearray(256)
+        for index, name in enumerate(classes):
+            for char in CHARACTER_CLASSES[name].encode('ascii'):
+                class_table[char] = index
+        self._class_table = bytes(class_table)
+
+        # Expected fraction of random bytes kept, and of passwords that contain
+        # every class (by inclusion-exclusion), used to size each block.
+        sizes = [len(CHARACTER_CLASSES[name]) for name in classes]
+        policy_rate = sum((-1) ** r * ((size - sum(missing)) / size) ** length
+                          for r in range(len(sizes) + 1) for missing in combinations(sizes, r))
+        self._bytes_per_password = length / (limit / 256) / policy_rate
+
+    def _generate_block(self, count: int) -> list:
+        """Returns up to `count` passwords from a single block of random bytes (usually exactly `count`)."""
+        length, class_count = self.length, len(self.classes)
+        chars = secrets.token_bytes(int(count * self._bytes_per_password * 1.05) + 64).translate(
+            self._char_table, self._rejected_bytes)
+        classes = chars.translate(self._class_table)
+        text = chars.decode('ascii')
+        passwords = [text[start:start + length] for start in range(0, len(chars) - length + 1, length)
+                     if len(set(classes[start:start + length])) == class_count]
+        return passwords[:count]
+
+    def iter_blocks(self, count: int):
+        """Yields lists of passwords, `count` in total, without holding them all in memory."""
+        while count > 0:
+            block = self._generate_block(min(count, BLOCK_PASSWORDS))
+            count -= len(block)
+            yield block
+
+    def generate(self, count: int) -> list:
+        """Returns a list of `count` passwords."""
+        passwords = []
+        for block in self.iter_blocks(count):
+            passwords.extend(block)
+        return passwords
+
+
+def generate_password(length: int = DEFAULT_LENGTH, classes=tuple(CHARACTER_CLASSES)) -> str:
+    """Returns one password of `length` characters with at least one of each of `classes`."""
+    return PasswordGenerator(length, classes).generate(1)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate random passwords, one per line.")
+    parser.add_argument("--count", type=int, default=1, help="Number of passwords to generate.")
+    parser.add_argument("--length", type=int, default=DEFAULT_LENGTH, help="Length of each password.")
+    for name in CHARACTER_CLASSES:
+        parser.add_argument(f"--no-{name}", dest=name, action="store_false", help=f"Leave out {name} characters.")
+    args = parser.parse_args()
+
+    try:
+        generator = PasswordGenerator(args.length, [name for name in CHARACTER_CLASSES if getattr(args, name)])
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+    for block in generator.iter_blocks(args.count):
+        sys.stdout.write("\n".join(block) + "\n")
+
+
+if __name__ == "__main__":
+    main()
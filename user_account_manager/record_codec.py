@@ -0,0 +1,156 @@
+import json
+import struct
+
+# --- Binary Record Format ---
+# An account body ({"password_hash": ..., "profile": {...}}) is encoded as:
+#
+#   record: RECORD_VERSION (1) | hash_len (1) | password_hash | field_count (1) | field...
+#   field:  key | type (1) | value
+#   key:    index into KNOWN_FIELDS (1), or FIELD_BY_NAME (1) | name_len (1) | name
+#
+# Values are typed: None takes no bytes, integers are zigzag varints, strings
+# are length-prefixed UTF-8, and anything else falls back to length-prefixed
+# JSON. A typical profile is well under half the size of the same record as
+# JSON, and decoding it is a handful of slices rather than a JSON parse.
+#
+# Bodies written by older versions are JSON objects, which always start with
+# "{", so `decode_record` tells the two apart by the first byte.
+RECORD_VERSION = 1
+
+# Profile fields that are encoded as a one-byte index instead of their name.
+# This is part of the file format: only ever append to it.
+KNOWN_FIELDS = ("age", "gender", "weight", "height", "occupation")
+_FIELD_INDEX = {name: index for index, name in enumerate(KNOWN_FIELDS)}
+FIELD_BY_NAME = 0xFF
+
+TYPE_NONE = 0
+TYPE_INT = 1
+TYPE_STR = 2
+TYPE_JSON = 3
+
+_LENGTH = struct.Struct(">H")
+
+
+def _encode_varint(value: int, out: bytearray):
+    """Appends `value` as a zigzag LEB128 varint (small numbers of either sign take one byte)."""
+    value = (value << 1) if value >= 0 else ((-value << 1) - 1)
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(data: bytes, pos: int):
+    """Reads a zigzag varint at `pos`; returns (value, next position)."""
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (result >> 1) if not result & 1 else -((result + 1) >> 1), pos
+
+
+def _encode_value(value, out: bytearray):
+    if value is None:
+        out.append(TYPE_NONE)
+    elif type(value) is int:
+        out.append(TYPE_INT)
+        _encode_varint(value, out)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out.append(TYPE_STR)
+        out += _LENGTH.pack(len(data))
+        out += data
+    else:
+        data = json.dumps(value, separators=(",", ":")).encode('utf-8')
+        out.append(TYPE_JSON)
+        out += _LENGTH.pack(len(data))
+        out += data
+
+
+def _value_fits(value) -> bool:
+    """True if `value` is short enough for a length-prefixed string or JSON value."""
+    if value is None or type(value) is int:
+        return True
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) <= 0xFFFF
+    return len(json.dumps(value, separators=(",", ":")).encode('utf-8')) <= 0xFFFF
+
+
+def _can_encode(record: dict) -> bool:
+    """True if `record` has the shape the binary format covers (otherwise it is stored as JSON)."""
+    if set(record) != {"password_hash", "profile"} or not isinstance(record["profile"], dict):
+        return False
+    password_hash = record["password_hash"]
+    return (isinstance(password_hash, str) and len(password_hash.encode('utf-8')) <= 0xFF
+            and len(record["profile"]) <= 0xFF
+            and all(isinstance(key, str) and len(key.encode('utf-8')) <= 0xFF for key in record["profile"])
+            and all(_value_fits(value) for value in record["profile"].values()))
+
+
+def encode_record(record: dict) -> bytes:
+    """Serializes an account record (without the username) for encryption."""
+    if not _can_encode(record):
+        return json.dumps(record, separators=(",", ":")).encode('utf-8')
+    out = bytearray((RECORD_VERSION,))
+    password_hash = record["password_hash"].encode('utf-8')
+    out.append(len(password_hash))
+    out += password_hash
+    profile = record["profile"]
+    out.append(len(profile))
+    for key, value in profile.items():
+        index = _FIELD_INDEX.get(key)
+        if index is None:
+            name = key.encode('utf-8')
+            out.append(FIELD_BY_NAME)
+            out.append(len(name))
+            out += name
+        else:
+            out.append(index)
+        _encode_value(value, out)
+    return bytes(out)
+
+
+def decode_record(data: bytes) -> dict:
+    """Decodes a record written by `encode_record` (or an older JSON body)."""
+    if data[0] != RECORD_VERSION:
+        if data[:1] == b"{":
+            return json.loads(data)
+        raise ValueError(f"Unsupported account record version {data[0]}.")
+    pos = 2 + data[1]
+    password_hash = data[2:pos].decode('utf-8')
+    field_count = data[pos]
+    pos += 1
+    profile = {}
+    for _ in range(field_count):
+        index = data[pos]
+        if index == FIELD_BY_NAME:
+            end = pos + 2 + data[pos + 1]
+            key = data[pos + 2:end].decode('utf-8')
+            pos = end
+        else:
+            key = KNOWN_FIELDS[index]
+            pos += 1
+        value_type = data[pos]
+        if value_type == TYPE_NONE:
+            value = None
+            pos += 1
+        elif value_type == TYPE_INT:
+            byte = data[pos + 1]
+            if byte < 0x80:
+                # Single-byte varint, the common case for ages, weights and heights.
+                value = (byte >> 1) if not byte & 1 else -((byte + 1) >> 1)
+                pos += 2
+            else:
+                value, pos = _decode_varint(data, pos + 1)
+        else:
+            end = pos + 3 + ((data[pos + 1] << 8) | data[pos + 2])
+            value = data[pos + 3:end].decode('utf-8')
+            pos = end
+            if value_type == TYPE_JSON:
+                value = json.loads(value)
+        profile[key] = value
+    return {"password_hash": password_hash, "profile": profile}
@@ -0,0 +1,454 @@
+import base64
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import namedtuple
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from journal import Journal, OP_DELETE, OP_PUT, encode_entry, fsync_directory
+from record_codec import decode_record, encode_record
+
+# --- File Format ---
+# A record store file starts with a small header, followed by one slot per account:
+#
+#   header:   MAGIC | generation (8 bytes) | check_len (2 bytes) | check token | key slot | key slot
+#   key slot: sequence (4) | salt (16) | iterations (4) | wrapped_len (2) | wrapped key | padding | crc32 (4)
+#   slot:     flags (1) | capacity (4) | name_len (2) | body_len (4) | name token | body token | padding
+#
+# Records are encrypted with a random data key. The master passphrase never
+# encrypts records itself: it is stretched (with the salt and iteration count
+# in the key slot) into a key-encryption key, which only wraps the data key.
+# Changing the passphrase rewrites one fixed-size key slot, whatever the size
+# of the store. There are two key slots; a change goes to the one not in use
+# and the valid slot with the higher sequence number wins, so a crash while
+# writing a slot leaves the previous one (and the old passphrase) working.
+# A newly written file has the same envelope in both slots.
+# The username and the account body (password hash + profile, in the binary
+# format of record_codec.py) are encrypted as separate Fernet tokens, so
+# listing usernames never has to decrypt profiles. Tokens are stored as raw
+# bytes rather than Fernet's usual base64 text, which is a third larger.
+# Apart from the key slots, the main file is never modified in place: changes go to a write-ahead journal
+# next to it (see journal.py) and are folded in by `checkpoint`, which writes a
+# new file and renames it over the old one. Each rewrite gets a fresh random
+# generation, which ties the journal to the file it belongs to.
+# The last byte of the magic is the format version. Data files from before the
+# record store are a single encrypted JSON blob; see `open_legacy`.
+MAGIC_PREFIX = b"UAMSTORE"
+STORE_VERSION = 3
+MAGIC = MAGIC_PREFIX + bytes((STORE_VERSION,))
+GENERATION_SIZE = 8
+SLOT_HEADER = struct.Struct(">BIHI")
+CHECK_HEADER = struct.Struct(">H")
+KEY_SLOT_HEADER = struct.Struct(">I16sIH")
+KEY_SLOT_CRC = struct.Struct(">I")
+KEY_SLOT_SIZE = 192
+SALT_SIZE = 16
+
+# Known plaintext encrypted into the file header. Decrypting it proves the key
+# is right even when the store has no accounts yet.
+CHECK_PLAINTEXT = b"user-account-manager"
+
+FLAG_LIVE = 0
+FLAG_DELETED = 1
+
+# Suffix of the write-ahead journal that sits next to the data file.
+JOURNAL_SUFFIX = ".wal"
+
+# Once the journal grows past this many bytes, it is checkpointed into the main file.
+CHECKPOINT_BYTES = 1024 * 1024
+
+
+def store_version(path: str):
+    """
+    Returns the record store format version of the file at `path`, or None if
+    it doesn't exist or isn't a record store (e.g. a legacy blob).
+    """
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+    except FileNotFoundError:
+        return None
+    if len(magic) != len(MAGIC) or not magic.startswith(MAGIC_PREFIX):
+        return None
+    return magic[-1]
+
+
+def is_record_store(path: str) -> bool:
+    """True if `path` exists and is in the record store format (rather than a legacy blob)."""
+    return store_version(path) is not None
+
+
+def seal(fernet: Fernet, data: bytes) -> bytes:
+    """Encrypts `data` into a raw (not base64-encoded) Fernet token."""
+    return base64.urlsafe_b64decode(fernet.encrypt(data))
+
+
+def unseal(fernet: Fernet, token: bytes) -> bytes:
+    """Decrypts a raw Fernet token made by `seal`. Raises InvalidToken if it fails."""
+    return fernet.decrypt(base64.urlsafe_b64encode(token))
+
+
+def _pack_slot(name_token: bytes, body_token: bytes) -> bytes:
+    """Builds a complete slot (header and tokens) around two tokens."""
+    capacity = len(name_token) + len(body_token)
+    return SLOT_HEADER.pack(FLAG_LIVE, capacity, len(name_token), len(body_token)) + name_token + body_token
+
+
+# The data key wrapped with a key derived from the master passphrase, plus what
+# is needed to derive that key again: the passphrase's salt and PBKDF2 iterations.
+KeyEnvelope = namedtuple("KeyEnvelope", "salt iterations wrapped_key")
+
+# A parsed file header. `envelope` is the key envelope in the active key slot (index
+# `key_slot`, with sequence number `key_sequence`), or None if the store has none.
+StoreHeader = namedtuple("StoreHeader", "generation key_slots_offset key_slot key_sequence envelope")
+
+
+def wrap_data_key(key_encryption_key: bytes, data_key: bytes, salt: bytes, iterations: int) -> KeyEnvelope:
+    """Encrypts `data_key` with the key derived from the master passphrase."""
+    return KeyEnvelope(salt, iterations, seal(Fernet(key_encryption_key), data_key))
+
+
+def unwrap_data_key(key_encryption_key: bytes, envelope: KeyEnvelope) -> bytes:
+    """Recovers the data key from `envelope`. Raises InvalidToken if the passphrase was wrong."""
+    return unseal(Fernet(key_encryption_key), envelope.wrapped_key)
+
+
+def _pack_key_slot(sequence: int, envelope: KeyEnvelope) -> bytes:
+    body = KEY_SLOT_HEADER.pack(sequence, envelope.salt, envelope.iterations, len(envelope.wrapped_key))
+    body = (body + envelope.wrapped_key).ljust(KEY_SLOT_SIZE - KEY_SLOT_CRC.size, b"\0")
+    return body + KEY_SLOT_CRC.pack(zlib.crc32(body))
+
+
+def _unpack_key_slot(data: bytes):
+    """Returns (sequence, envelope) for a key slot, or None if it is empty or torn."""
+    if len(data) != KEY_SLOT_SIZE:
+        return None
+    body, crc = data[:-KEY_SLOT_CRC.size], data[-KEY_SLOT_CRC.size:]
+    if KEY_SLOT_CRC.pack(zlib.crc32(body)) != crc:
+        return None
+    sequence, salt, iterations, wrapped_len = KEY_SLOT_HEADER.unpack_from(body)
+    wrapped_key = body[KEY_SLOT_HEADER.size:KEY_SLOT_HEADER.size + wrapped_len]
+    return sequence, KeyEnvelope(salt, iterations, wrapped_key)
+
+
+def _file_header(fernet: Fernet, generation: bytes, envelope: KeyEnvelope = None, sequence: int = 0) -> bytes:
+    check_token = seal(fernet, CHECK_PLAINTEXT)
+    key_slots = 2 * (_pack_key_slot(sequence, envelope) if envelope else bytes(KEY_SLOT_SIZE))
+    return MAGIC + generation + CHECK_HEADER.pack(len(check_token)) + check_token + key_slots
+
+
+def read_key_envelope(path: str) -> KeyEnvelope:
+    """Returns the key envelope of the store at `path` (None if it has none)."""
+    with open(path, "rb") as f:
+        return read_header(f).envelope
+
+
+def read_header(f, fernet: Fernet = None) -> StoreHeader:
+    """
+    Reads the header from the start of the open store file `f`, leaving `f`
+    positioned at the first slot. If `fernet` is given, also checks that it is
+    the file's data key, raising InvalidToken if it isn't.
+    """
+    magic = f.read(len(MAGIC))
+    if len(magic) != len(MAGIC) or not magic.startswith(MAGIC_PREFIX):
+        raise ValueError(f"{f.name} is not a record store file.")
+    if magic != MAGIC:
+        raise ValueError(f"{f.name} is in an unsupported record store format (version {magic[-1]}).")
+    generation = f.read(GENERATION_SIZE)
+    (check_len,) = CHECK_HEADER.unpack(f.read(CHECK_HEADER.size))
+    check_token = f.read(check_len)
+    if fernet is not None:
+        if unseal(fernet, check_token) != CHECK_PLAINTEXT:
+            raise InvalidToken
+    key_slots_offset = f.tell()
+    key_slot = key_sequence = envelope = None
+    for index in range(2):
+        unpacked = _unpack_key_slot(f.read(KEY_SLOT_SIZE))
+        if unpacked is not None and (key_sequence is None or unpacked[0] > key_sequence):
+            key_slot = index
+            key_sequence, envelope = unpacked
+    return StoreHeader(generation, key_slots_offset, key_slot, key_sequence, envelope)
+
+
+# Marker for "no pending change" when undoing a failed batch.
+_MISSING = object()
+
+
+class RecordStore(MutableMapping):
+    """
+    An encrypted, record-level account store that behaves like a dict of
+    {username: {"password_hash": ..., "profile": {...}}}.
+
+    Only usernames are decrypted when the store is opened; each account body
+    is decrypted on access. Adding or changing an account encrypts just that
+    record and appends it to the write-ahead journal, so the cost of a
+    registration doesn't grow with the number of accounts and a crash can
+    never leave the main file half-written. Wrap many changes in `batch()`
+    to make them durable together with a single flush.
+
+    `fernet` holds the data key; see `wrap_data_key` and `set_key_envelope`
+    for how that key is tied to the master passphrase.
+    """
+    def __init__(self, path: str, fernet: Fernet):
+        self.path = path
+        self.fernet = fernet
+        self._lock = threading.RLock()
+        # username -> (slot offset, slot capacity) in the main file, in file order.
+        self._index = {}
+        self._generation = b""
+        self._header = None
+        self._load_index()
+        # Changes not yet checkpointed into the main file:
+        # username -> (name token, body token), or None for a deleted account.
+        self._pending = {}
+        # While a batch is open: encoded journal entries waiting for the group
+        # commit, and the previous `_pending` values to restore if it fails.
+        self._batch_entries = None
+        self._batch_undo = None
+        self._journal = Journal(path + JOURNAL_SUFFIX, self._generation)
+        for op, name_token, body_token in self._journal.replay():
+            username = self._decrypt(name_token).decode('utf-8')
+            self._pending[username] = (name_token, body_token) if op == OP_PUT else None
+
+    @classmethod
+    def create(cls, path: str, fernet: Fernet, records=(), envelope: KeyEnvelope = None):
+        """
+        Writes a brand-new store at `path` containing `records`, an iterable of
+        (username, record) pairs, and returns it opened. `envelope` should wrap
+        the key in `fernet`; without one, the store can only be opened with that
+        key directly rather than with a passphrase.
+        The file is built under a temporary name and then renamed over `path`,
+        so an existing file is never left half-written. Any journal belonging
+        to the old file is discarded, since the new file has a new generation.
+        """
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_file_header(fernet, os.urandom(GENERATION_SIZE), envelope))
+            for username, record in records:
+                f.write(_pack_slot(*cls._encrypt(fernet, username, record)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        fsync_directory(path)
+        return cls(path, fernet)
+
+    @staticmethod
+    def _encrypt(fernet: Fernet, username: str, record: dict):
+        """Encrypts one account into its (name token, body token) pair."""
+        return seal(fernet, username.encode('utf-8')), seal(fernet, encode_record(record))
+
+    def _decrypt(self, token: bytes) -> bytes:
+        return unseal(self.fernet, token)
+
+    def _load_index(self):
+        """
+        Verifies the key against the header and scans the slots, decrypting
+        only the usernames. Raises InvalidToken if the key is wrong.
+        """
+        with open(self.path, "rb") as f:
+            self._header = read_header(f, self.fernet)
+            self._generation = self._header.generation
+            offset = f.tell()
+            while True:
+                header = f.read(SLOT_HEADER.size)
+                if len(header) < SLOT_HEADER.size:
+                    break
+                flags, capacity, name_len, _ = SLOT_HEADER.unpack(header)
+                if flags == FLAG_LIVE:
+                    username = self._decrypt(f.read(name_len)).decode('utf-8')
+                    self._index[username] = (offset, capacity)
+                offset += SLOT_HEADER.size + capacity
+                f.seek(offset)
+
+    @property
+    def envelope(self) -> KeyEnvelope:
+        """The key envelope currently in use (None if the store has none)."""
+        return self._header.envelope
+
+    def set_key_envelope(self, envelope: KeyEnvelope):
+        """
+        Replaces the wrapped data key, e.g. after the master passphrase changes.
+        Only the inactive key slot is written (and flushed); the records aren't
+        touched, and if this is interrupted the previous envelope still applies.
+        """
+        with self._lock:
+            header = self._header
+            slot = 1 - header.key_slot if header.key_slot is not None else 0
+            sequence = header.key_sequence + 1 if header.key_sequence is not None else 0
+            with open(self.path, "r+b") as f:
+                f.seek(header.key_slots_offset + slot * KEY_SLOT_SIZE)
+                f.write(_pack_key_slot(sequence, envelope))
+                f.flush()
+                os.fsync(f.fileno())
+            self._header = header._replace(key_slot=slot, key_sequence=sequence, envelope=envelope)
+
+    def _read_body_token(self, f, offset: int) -> bytes:
+        """Reads the encrypted body of the slot at `offset` from the open main file `f`."""
+        f.seek(offset)
+        _, _, name_len, body_len = SLOT_HEADER.unpack(f.read(SLOT_HEADER.size))
+        f.seek(name_len, os.SEEK_CUR)
+        return f.read(body_len)
+
+    # --- Journaled writes ---
+
+    def _log(self, username: str, entry: bytes, pending_value):
+        """Records one change: journals it (or stages it in the open batch) and applies it."""
+        with self._lock:
+            if self._batch_entries is not None:
+                self._batch_undo.setdefault(username, self._pending.get(username, _MISSING))
+                self._batch_entries.append(entry)
+                self._pending[username] = pending_value
+                return
+            self._journal.append([entry])
+            self._pending[username] = pending_value
+            self._maybe_checkpoint()
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups every change made inside the `with` block into one durable write
+        (one journal append and one fsync). If the block raises, none of its
+        changes are kept. Nested batches join the outermost one.
+        """
+        with self._lock:
+            if self._batch_entries is not None:
+                yield self
+                return
+            self._batch_entries, self._batch_undo = [], {}
+            try:
+                yield self
+                self._journal.append(self._batch_entries)
+            except BaseException:
+                for username, previous in self._batch_undo.items():
+                    if previous is _MISSING:
+                        self._pending.pop(username, None)
+                    else:
+                        self._pending[username] = previous
+                raise
+            finally:
+                self._batch_entries = self._batch_undo = None
+            self._maybe_checkpoint()
+
+    def _maybe_checkpoint(self):
+        if self._journal.size >= CHECKPOINT_BYTES:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """
+        Folds the journaled changes into the main file. Live slots are copied
+        across still encrypted (nothing is decrypted or re-encrypted), changed
+        accounts are written from the journal, deleted ones are dropped, and
+        the result replaces the main file through temp-file-and-rename before
+        the journal is cleared.
+        """
+        with self._lock:
+            if self._batch_entries is not None:
+                raise RuntimeError("Cannot checkpoint while a batch is open.")
+            if not self._pending:
+                return
+            generation = os.urandom(GENERATION_SIZE)
+            temp_path = self.path + ".tmp"
+            new_index = {}
+            header = _file_header(self.fernet, generation, self._header.envelope, self._header.key_sequence or 0)
+            with open(self.path, "rb") as src, open(temp_path, "wb") as dst:
+                dst.write(header)
+                for username, (offset, capacity) in self._index.items():
+                    if username in self._pending:
+                        continue
+                    src.seek(offset)
+                    new_index[username] = (dst.tell(), capacity)
+                    dst.write(src.read(SLOT_HEADER.size + capacity))
+                for username, tokens in self._pending.items():
+                    if tokens is None:
+                        continue
+                    slot = _pack_slot(*tokens)
+                    new_index[username] = (dst.tell(), len(slot) - SLOT_HEADER.size)
+                    dst.write(slot)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(temp_path, self.path)
+            fsync_directory(self.path)
+            # If we crash here, the leftover journal has the old generation and is ignored.
+            self._journal.reset(generation)
+            self._generation = generation
+            self._header = self._header._replace(
+                generation=generation, key_slots_offset=len(header) - 2 * KEY_SLOT_SIZE,
+                key_slot=0 if self._header.envelope else None)
+            self._index = new_index
+            self._pending = {}
+
+    def close(self):
+        """Checkpoints any outstanding changes. Call when the store is no longer needed."""
+        self.checkpoint()
+
+    # --- Dictionary interface ---
+
+    def __getitem__(self, username: str) -> dict:
+        with self._lock:
+            if username in self._pending:
+                tokens = self._pending[username]
+                if tokens is None:
+                    raise KeyError(username)
+                return decode_record(self._decrypt(tokens[1]))
+            offset, _ = self._index[username]
+            with open(self.path, "rb") as f:
+                body_token = self._read_body_token(f, offset)
+        return decode_record(self._decrypt(body_token))
+
+    def __setitem__(self, username: str, record: dict):
+        name_token, body_token = self._encrypt(self.fernet, username, record)
+        self._log(username, encode_entry(OP_PUT, name_token, body_token), (name_token, body_token))
+
+    def __delitem__(self, username: str):
+        if username not in self:
+            raise KeyError(username)
+        self._log(username, encode_entry(OP_DELETE, seal(self.fernet, username.encode('utf-8'))), None)
+
+    def __contains__(self, username) -> bool:
+        with self._lock:
+            if username in self._pending:
+                return self._pending[username] is not None
+            return username in self._index
+
+    def __iter__(self):
+        with self._lock:
+            names = [name for name in self._index if self._pending.get(name, True) is not None]
+            names.extend(name for name, tokens in self._pending.items()
+                         if tokens is not None and name not in self._index)
+        return iter(names)
+
+    def __len__(self) -> int:
+        with self._lock:
+            count = len(self._index)
+            for name, tokens in self._pending.items():
+                if name in self._index:
+                    count -= tokens is None
+                else:
+                    count += tokens is not None
+            return count
+
+    def items(self):
+        """Yields (username, record) pairs, reading the main file sequentially."""
+        with open(self.path, "rb") as f:
+            for username in self:
+                with self._lock:
+                    tokens = self._pending.get(username)
+                    location = self._index.get(username)
+                body_token = tokens[1] if tokens is not None else self._read_body_token(f, location[0])
+                yield username, decode_record(self._decrypt(body_token))
+
+
+def open_legacy(path: str, fernet: Fernet):
+    """
+    Reads a data file from before the record store (a single encrypted JSON
+    blob, encrypted with `fernet` directly) and returns its accounts as a dict.
+    Raises InvalidToken if `fernet` is the wrong key. Copy the accounts into a
+    new store with `RecordStore.create` to upgrade the file.
+    """
+    with open(path, "rb") as f:
+        return json.loads(fernet.decrypt(f.read()).decode('utf-8'))
@@ -0,0 +1,175 @@
+import json
+import os
+
+from cryptography.fernet import Fernet
+
+from journal import fsync_directory
+from record_store import (FLAG_LIVE, GENERATION_SIZE, SLOT_HEADER, KeyEnvelope, RecordStore,
+                          _file_header, _pack_slot, read_header, seal, unseal)
+
+# --- Re-encryption Jobs ---
+# Rotating the data key re-encrypts every record with a new one.
+# The records are streamed, a chunk at a time, from the data file into a new
+# file next to it (TARGET_SUFFIX), which replaces the data file once complete.
+# After each chunk is flushed, the job's position is saved in a small state
+# file (STATE_SUFFIX), so an interrupted job can continue where it left off
+# or be rolled back; the data file itself is untouched until the final rename.
+TARGET_SUFFIX = ".rekey"
+STATE_SUFFIX = ".rekey.json"
+
+# Number of records re-encrypted (and held in memory) per chunk.
+DEFAULT_CHUNK_RECORDS = 1000
+
+
+def _read_generation(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return read_header(f).generation
+
+
+class RekeyJob:
+    """
+    A resumable job that re-encrypts a record store with a new key.
+
+    Only one chunk of records is in memory at a time, so memory use doesn't
+    grow with the number of accounts. Records are decrypted and re-encrypted
+    as opaque bytes; they are never parsed.
+
+    The store must have no journaled changes when the job starts (checkpoint
+    it first). If the data file changes while a job is pending, the job is
+    stale and `find` discards it.
+    """
+    def __init__(self, path: str, state: dict):
+        self.path = path
+        self.target_path = path + TARGET_SUFFIX
+        self.state_path = path + STATE_SUFFIX
+        # source_generation / target_generation (hex), source_offset, target_size and records_done.
+        self.state = state
+
+    @classmethod
+    def start(cls, path: str, old_fernet: Fernet, new_fernet: Fernet, envelope: KeyEnvelope = None):
+        """
+        Begins re-encrypting the store at `path` from `old_fernet` to `new_fernet`.
+        `envelope` (the new data key wrapped for the master passphrase) goes into
+        the new file's header.
+        """
+        with open(path, "rb") as f:
+            header = read_header(f, old_fernet)
+            source_generation = header.generation
+            source_offset = f.tell()
+        target_generation = os.urandom(GENERATION_SIZE)
+        header = _file_header(new_fernet, target_generation, envelope)
+        with open(path + TARGET_SUFFIX, "wb") as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        job = cls(path, {
+            "source_generation": source_generation.hex(),
+            "target_generation": target_generation.hex(),
+            "source_offset": source_offset,
+            "target_size": len(header),
+            "records_done": 0,
+        })
+        job._save_state()
+        return job
+
+    @classmethod
+    def find(cls, path: str):
+        """
+        Returns the interrupted job for the store at `path`, or None if there isn't one.
+        Leftovers of a job that actually finished, or that no longer matches the
+        data file, are cleaned up.
+        """
+        state_path = path + STATE_SUFFIX
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                job = cls(path, json.load(f))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # A state file torn by a crash while it was first being written.
+            os.remove(state_path)
+            return None
+
+        if os.path.exists(path) and os.path.exists(job.target_path):
+            if _read_generation(path).hex() == job.state["source_generation"]:
+                return job
+        # Either the final rename happened (the data file has the target's
+        # generation) or the data file has changed since; nothing to resume.
+        job.rollback()
+        return None
+
+    @property
+    def fraction_done(self) -> float:
+        return self.state["source_offset"] / max(os.path.getsize(self.path), 1)
+
+    def check_new_key(self, new_fernet: Fernet):
+        """Raises InvalidToken unless `new_fernet` is the key this job is re-encrypting to."""
+        with open(self.target_path, "rb") as f:
+            read_header(f, new_fernet)
+
+    def target_envelope(self) -> KeyEnvelope:
+        """The key envelope written into the new file's header, wrapping the key being rotated to."""
+        with open(self.target_path, "rb") as f:
+            return read_header(f).envelope
+
+    def _save_state(self):
+        """Atomically records the job's progress."""
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
+
+    def run(self, old_fernet: Fernet, new_fernet: Fernet, progress=None,
+            chunk_records: int = DEFAULT_CHUNK_RECORDS) -> RecordStore:
+        """
+        Re-encrypts the remaining records, replaces the data file with the result
+        and returns it opened with `new_fernet`.
+        `progress(message, fraction)` is called after each chunk, if given.
+        """
+        source_size = os.path.getsize(self.path)
+        with open(self.path, "rb") as src, open(self.target_path, "r+b") as dst:
+            # Anything after the last saved position is from an interrupted chunk.
+            dst.truncate(self.state["target_size"])
+            dst.seek(self.state["target_size"])
+            src.seek(self.state["source_offset"])
+            at_end = False
+            while not at_end:
+                chunk = []
+                for _ in range(chunk_records):
+                    header = src.read(SLOT_HEADER.size)
+                    if len(header) < SLOT_HEADER.size:
+                        at_end = True
+                        break
+                    flags, capacity, name_len, body_len = SLOT_HEADER.unpack(header)
+                    slot = src.read(capacity)
+                    if flags != FLAG_LIVE:
+                        continue
+                    name = unseal(old_fernet, slot[:name_len])
+                    body = unseal(old_fernet, slot[name_len:name_len + body_len])
+                    chunk.append(_pack_slot(seal(new_fernet, name), seal(new_fernet, body)))
+                dst.write(b"".join(chunk))
+                dst.flush()
+                os.fsync(dst.fileno())
+                self.state["source_offset"] = src.tell()
+                self.state["target_size"] = dst.tell()
+                self.state["records_done"] += len(chunk)
+                self._save_state()
+                if progress:
+                    progress(f"Re-encrypted {self.state['records_done']} accounts...",
+                             self.state["source_offset"] / source_size)
+
+        os.replace(self.target_path, self.path)
+        fsync_directory(self.path)
+        # The old journal belongs to the old generation, so the new store ignores it.
+        os.remove(self.state_path)
+        return RecordStore(self.path, new_fernet)
+
+    def rollback(self):
+        """Abandons the job, leaving the data file as it was."""
+        for leftover in (self.target_path, self.state_path):
+            try:
+                os.remove(leftover)
+            except FileNotFoundError:
+                pass
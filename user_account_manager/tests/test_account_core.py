@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from cryptography.fernet import InvalidToken
+
+from account_core import AccountCore
+from hashing_service import HashingService
+
+PASSPHRASE = "Correct horse 1!"
+
+
+@pytest.fixture
+def core(tmp_path):
+    core = AccountCore(os.path.join(tmp_path, "users.encrypted"), HashingService(workers=2, work_factor=4))
+    core.set_master_key(PASSPHRASE, core.derive_key(PASSPHRASE))
+    core.save_account("alice", {"password_hash": "x", "profile": {"age": 30}})
+    yield core
+    core.close()
+
+
+def test_check_passphrase_uses_the_open_store(core, monkeypatch):
+    core.key_session.wipe()
+    # Checking the passphrase must not open the data file again
+    monkeypatch.setattr("account_core.RecordStore", None)
+    core.check_passphrase(PASSPHRASE)
+    assert core.has_cached_key(PASSPHRASE)
+    assert list(core.users.keys()) == ["alice"]
+
+
+def test_check_passphrase_rejects_a_wrong_passphrase(core):
+    core.key_session.wipe()
+    with pytest.raises(InvalidToken):
+        core.check_passphrase("Wrong horse 1!")
+    assert not core.has_cached_key("Wrong horse 1!")
+
+
+def test_interrupted_key_rotation_resumes(core):
+    def interrupt(message, fraction):
+        raise KeyboardInterrupt
+
+    old_key = core.data_key
+    with pytest.raises(KeyboardInterrupt):
+        core.rotate_data_key(PASSPHRASE, interrupt)
+    assert core.pending_rekey() is not None
+    assert core.data_key == old_key
+
+    core.rotate_data_key(PASSPHRASE)
+    assert core.pending_rekey() is None
+    assert core.data_key != old_key
+    assert dict(core.users.items()) == {"alice": {"password_hash": "x", "profile": {"age": 30}}}
+    users, data_key = core.load(PASSPHRASE)
+    assert data_key == core.data_key and list(users.keys()) == ["alice"]
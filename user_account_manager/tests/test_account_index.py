@@ -0,0 +1,25 @@
+import random
+
+from account_index import AccountIndex
+
+
+def test_prefix_filter_matches_a_linear_scan():
+    rng = random.Random(1)
+    names = {"".join(rng.choice("abcé") for _ in range(rng.randrange(1, 6))) for _ in range(2000)}
+    index = AccountIndex(names)
+    assert index.total == len(names)
+    # Typing, deleting and retyping, as in the filter box
+    for prefix in ["", "a", "ab", "abc", "ab", "b", "bé", "bée", "", "c", "cz", "c", "é"]:
+        index.set_prefix(prefix)
+        expected = sorted(name for name in names if name.startswith(prefix))
+        assert len(index) == len(expected)
+        assert index.page(0, len(names)) == expected
+
+
+def test_pages():
+    index = AccountIndex(f"user{number:03}" for number in range(250))
+    assert index.page(0, 100) == [f"user{number:03}" for number in range(100)]
+    assert index.page(200, 100) == [f"user{number:03}" for number in range(200, 250)]
+    assert index.page(300, 100) == []
+    index.set_prefix("user1")
+    assert index.page(95, 10) == ["user195", "user196", "user197", "user198", "user199"]
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+import bcrypt
+import pytest
+
+from account_core import AccountCore
+from bulk_accounts import read_records, write_records
+from hashing_service import HashingService
+
+PASSPHRASE = "Correct horse 1!"
+BULK_ACCOUNTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bulk_accounts.py")
+
+
+@pytest.fixture
+def core(tmp_path):
+    core = AccountCore(os.path.join(tmp_path, "users.encrypted"), HashingService(workers=2, work_factor=4))
+    core.set_master_key(PASSPHRASE, core.derive_key(PASSPHRASE))
+    yield core
+    core.close()
+
+
+def test_import_rejects_bad_records_and_keeps_the_rest(core):
+    existing_hash = bcrypt.hashpw(b"Old pass 1!", bcrypt.gensalt(4)).decode()
+    records = [
+        {"username": "alice", "password": "Secret 1!", "age": "30", "occupation": "dev"},
+        {"username": "bob", "password_hash": existing_hash, "profile": {"height": 180}},
+        {"username": "alice", "password": "Secret 2!"},
+        {"username": "carol", "password": "weak"},
+        {"username": "dave", "password": "Secret 1!", "age": "old"},
+        {"username": "", "password": "Secret 1!"},
+        {"username": "erin", "password_hash": "plain text"},
+    ]
+    result = core.import_accounts(records, chunk_size=3)
+    assert result["imported"] == 2
+    assert [(number, username) for number, username, _ in result["rejected"]] == [
+        (3, "alice"), (4, "carol"), (5, "dave"), (6, ""), (7, "erin")]
+    assert bcrypt.checkpw(b"Secret 1!", core.users["alice"]["password_hash"].encode())
+    assert core.users["alice"]["profile"]["age"] == 30
+    assert core.users["bob"]["password_hash"] == existing_hash
+    assert core.users["bob"]["profile"]["height"] == 180
+
+
+def test_export_round_trips_through_both_formats(core):
+    core.import_accounts([{"username": f"user{number}", "password": "Secret 1!", "age": str(number)}
+                          for number in range(5)])
+    exported = list(core.export_accounts())
+    for file_format in ("csv", "jsonl"):
+        f = io.StringIO()
+        assert write_records(f, file_format, exported) == 5
+        f.seek(0)
+        records = list(read_records(f, file_format))
+        assert [record["username"] for record in records] == [f"user{number}" for number in range(5)]
+        assert [record["password_hash"] for record in records] == [record["password_hash"] for record in exported]
+
+
+def test_bad_json_line_is_reported():
+    with pytest.raises(ValueError, match="Line 2"):
+        list(read_records(io.StringIO('{"username": "a"}\n{oops\n'), "jsonl"))
+
+
+def test_command_line_import_and_export(tmp_path):
+    data_file = os.path.join(tmp_path, "users.encrypted")
+    accounts = os.path.join(tmp_path, "accounts.csv")
+    backup = os.path.join(tmp_path, "backup.jsonl")
+    with open(accounts, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "password", "age"])
+        writer.writerows([["alice", "Secret 1!", "30"], ["bob", "weak", ""]])
+
+    def run(*args):
+        return subprocess.run([sys.executable, BULK_ACCOUNTS, "--data-file", data_file, "--passphrase-env",
+                               "TEST_PASSPHRASE", "--workers", "2", "--work-factor", "4", *args],
+                              env=dict(os.environ, TEST_PASSPHRASE=PASSPHRASE),
+                              capture_output=True, text=True, check=True).stdout
+
+    assert "Imported 1 accounts, rejected 1" in run("import", accounts)
+    assert "Exported 1 accounts" in run("export", backup)
+    with open(backup) as f:
+        [record] = [json.loads(line) for line in f]
+    assert record["username"] == "alice" and record["profile"]["age"] == 30
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from hashing_service import HashingService
+from tk_tasks import TkTaskRunner
+
+
+@pytest.fixture
+def hashing():
+    with HashingService(workers=2, work_factor=4) as service:
+        yield service
+
+
+def test_hash_and_check(hashing):
+    stored_hash = hashing.hash_password("Secret 1!").result()
+    assert stored_hash.startswith("$2b$04$")
+    assert hashing.check_password("Secret 1!", stored_hash).result()
+    assert not hashing.check_password("Secret 2!", stored_hash).result()
+
+
+def test_many_keep_their_order(hashing):
+    passwords = [f"password{number}" for number in range(20)]
+    hashes = list(hashing.hash_many(passwords))
+    assert len(set(hashes)) == 20
+    pairs = list(zip(passwords, hashes)) + [("wrong", hashes[0])]
+    assert list(hashing.check_many(pairs)) == [True] * 20 + [False]
+
+
+def test_hashes_run_concurrently():
+    # Both workers must be busy at once, so neither call waits on the other
+    started = threading.Barrier(2, timeout=5)
+    with HashingService(workers=2, work_factor=4) as service:
+        futures = [service._executor.submit(started.wait) for _ in range(2)]
+        for future in futures:
+            future.result(timeout=5)
+
+
+class FakeRoot:
+    """Stands in for a Tk root: `after` callbacks run when `run_pending` is called."""
+    def __init__(self):
+        self.pending = []
+        self.thread = threading.current_thread()
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def run_pending(self):
+        while self.pending:
+            self.pending.pop(0)()
+
+
+def test_results_are_delivered_on_the_tk_thread(hashing):
+    root = FakeRoot()
+    runner = TkTaskRunner(root)
+    delivered = []
+    future = runner.watch(hashing.hash_password("Secret 1!"),
+                          on_done=lambda result: delivered.append((result, threading.current_thread())))
+    future.result()
+    failed = runner.submit(lambda: 1 / 0, on_error=lambda error: delivered.append(error))
+    with pytest.raises(ZeroDivisionError):
+        failed.result(timeout=5)
+    root.run_pending()
+    assert delivered[0][1] is root.thread and delivered[0][0].startswith("$2b$")
+    assert isinstance(delivered[1], ZeroDivisionError)
+    assert runner._outstanding == 0
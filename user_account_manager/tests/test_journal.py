@@ -0,0 +1,91 @@
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from journal import OP_DELETE, OP_PUT, Journal, encode_entry
+from record_store import JOURNAL_SUFFIX, RecordStore
+
+ALICE = {"password_hash": "a", "profile": {"age": 30}}
+BOB = {"password_hash": "b", "profile": {"age": 40}}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return os.path.join(tmp_path, "users.encrypted")
+
+
+@pytest.fixture
+def fernet():
+    return Fernet(Fernet.generate_key())
+
+
+def test_replay_cuts_off_a_torn_tail(tmp_path):
+    journal = Journal(os.path.join(tmp_path, "users.wal"), b"12345678")
+    journal.append([encode_entry(OP_PUT, b"alice", b"body"), encode_entry(OP_DELETE, b"bob")])
+    good_size = journal.size
+    # A crash part way through the next append
+    with open(journal.path, "ab") as f:
+        f.write(encode_entry(OP_PUT, b"carol", b"body")[:-3])
+
+    assert journal.replay() == [(OP_PUT, b"alice", b"body"), (OP_DELETE, b"bob", b"")]
+    assert journal.size == good_size
+    # New entries follow the last good one
+    journal.append([encode_entry(OP_PUT, b"dave", b"body")])
+    assert [entry[1] for entry in journal.replay()] == [b"alice", b"bob", b"dave"]
+
+
+def test_replay_stops_at_a_corrupt_entry(tmp_path):
+    journal = Journal(os.path.join(tmp_path, "users.wal"), b"12345678")
+    journal.append([encode_entry(OP_PUT, b"alice", b"body"), encode_entry(OP_PUT, b"bob", b"body")])
+    with open(journal.path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"X")
+    assert journal.replay() == [(OP_PUT, b"alice", b"body")]
+
+
+def test_journal_from_another_generation_is_discarded(tmp_path):
+    path = os.path.join(tmp_path, "users.wal")
+    Journal(path, b"oldgener").append([encode_entry(OP_PUT, b"alice", b"body")])
+    journal = Journal(path, b"newgener")
+    assert journal.replay() == []
+    assert journal.size == 0
+
+
+def test_changes_survive_reopening_without_a_checkpoint(path, fernet):
+    store = RecordStore.create(path, fernet, [("alice", ALICE)])
+    store["bob"] = BOB
+    del store["alice"]
+    # No close(), as after a crash: the changes are only in the journal
+    reopened = RecordStore(path, fernet)
+    assert dict(reopened.items()) == {"bob": BOB}
+
+
+def test_torn_store_write_replays_the_rest(path, fernet):
+    store = RecordStore.create(path, fernet)
+    store["alice"] = ALICE
+    store["bob"] = BOB
+    with open(path + JOURNAL_SUFFIX, "r+b") as f:
+        f.truncate(os.path.getsize(path + JOURNAL_SUFFIX) - 10)
+    assert dict(RecordStore(path, fernet).items()) == {"alice": ALICE}
+
+
+def test_failed_batch_keeps_none_of_its_changes(path, fernet):
+    store = RecordStore.create(path, fernet, [("alice", ALICE)])
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store["bob"] = BOB
+            store["alice"] = BOB
+            raise RuntimeError
+    assert dict(store.items()) == {"alice": ALICE}
+    assert dict(RecordStore(path, fernet).items()) == {"alice": ALICE}
+
+
+def test_checkpoint_folds_in_the_journal(path, fernet):
+    store = RecordStore.create(path, fernet, [("alice", ALICE), ("bob", BOB)])
+    with store.batch():
+        store["carol"] = ALICE
+        del store["bob"]
+    store.checkpoint()
+    assert os.path.getsize(path + JOURNAL_SUFFIX) == 0
+    assert dict(RecordStore(path, fernet).items()) == {"alice": ALICE, "carol": ALICE}
@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from account_core import PBKDF2_SALT, AccountCore
+from hashing_service import HashingService
+from key_session import derive_key
+from record_store import (KEY_SLOT_SIZE, STORE_VERSION, RecordStore, read_header, read_key_envelope,
+                          store_version, unwrap_data_key, wrap_data_key)
+
+OLD_PASSPHRASE = "Correct horse 1!"
+NEW_PASSPHRASE = "Battery staple 2?"
+ALICE = {"password_hash": "x", "profile": {"age": 30}}
+
+
+@pytest.fixture
+def core(tmp_path):
+    core = AccountCore(os.path.join(tmp_path, "users.encrypted"), HashingService(workers=2, work_factor=4))
+    yield core
+    core.close()
+
+
+def _lock(core):
+    core.users.close()
+    core.lock()
+
+
+def test_changing_the_passphrase_only_rewrites_a_key_slot(core):
+    core.set_master_key(OLD_PASSPHRASE, core.derive_key(OLD_PASSPHRASE))
+    core.save_account("alice", ALICE)
+    core.users.checkpoint()
+    data_key = core.data_key
+    with open(core.data_file, "rb") as f:
+        before = f.read()
+        f.seek(0)
+        slots = read_header(f).key_slots_offset
+
+    core.set_master_key(NEW_PASSPHRASE, core.derive_key(NEW_PASSPHRASE))
+    with open(core.data_file, "rb") as f:
+        after = f.read()
+    assert len(after) == len(before)
+    assert after[:slots] == before[:slots] and after[slots + 2 * KEY_SLOT_SIZE:] == before[slots + 2 * KEY_SLOT_SIZE:]
+
+    _lock(core)
+    with pytest.raises(InvalidToken):
+        core.load(OLD_PASSPHRASE)
+    users, loaded_key = core.load(NEW_PASSPHRASE)
+    assert loaded_key == data_key
+    assert dict(users.items()) == {"alice": ALICE}
+
+
+def test_torn_key_slot_falls_back_to_the_previous_passphrase(tmp_path):
+    path = os.path.join(tmp_path, "users.encrypted")
+    data_key = Fernet.generate_key()
+    salt = os.urandom(16)
+    old_envelope = wrap_data_key(derive_key(OLD_PASSPHRASE, salt, 1000), data_key, salt, 1000)
+    store = RecordStore.create(path, Fernet(data_key), [("alice", ALICE)], old_envelope)
+    new_envelope = wrap_data_key(derive_key(NEW_PASSPHRASE, salt, 1000), data_key, salt, 1000)
+    store.set_key_envelope(new_envelope)
+    assert read_key_envelope(path) == new_envelope
+
+    # A crash part way through writing the new slot
+    with open(path, "r+b") as f:
+        header = read_header(f)
+        f.seek(header.key_slots_offset + header.key_slot * KEY_SLOT_SIZE + 40)
+        f.write(b"\xff" * 8)
+    envelope = read_key_envelope(path)
+    assert envelope == old_envelope
+    assert unwrap_data_key(derive_key(OLD_PASSPHRASE, salt, 1000), envelope) == data_key
+    with pytest.raises(InvalidToken):
+        unwrap_data_key(derive_key(NEW_PASSPHRASE, salt, 1000), envelope)
+
+
+def test_legacy_blob_is_upgraded_on_unlock(core):
+    legacy_fernet = Fernet(derive_key(OLD_PASSPHRASE, PBKDF2_SALT))
+    with open(core.data_file, "wb") as f:
+        f.write(legacy_fernet.encrypt(json.dumps({"alice": ALICE}).encode('utf-8')))
+    core.unlock(OLD_PASSPHRASE)
+    assert store_version(core.data_file) == STORE_VERSION
+    assert read_key_envelope(core.data_file).salt != PBKDF2_SALT
+    assert dict(core.users.items()) == {"alice": ALICE}
+
+    _lock(core)
+    users, _ = core.load(OLD_PASSPHRASE)
+    assert dict(users.items()) == {"alice": ALICE}
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+import key_session
+from key_session import KeySession
+
+SALT = b"0123456789abcdef"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_cached_key_skips_derivation(clock, monkeypatch):
+    session = KeySession(ttl=60, clock=clock)
+    session.remember("passphrase", SALT, b"key")
+    monkeypatch.setattr(key_session, "derive_key", None)
+    assert session.get_key("passphrase", SALT) == b"key"
+
+
+def test_other_passphrase_or_salt_misses(clock):
+    session = KeySession(ttl=60, clock=clock)
+    session.remember("passphrase", SALT, b"key")
+    assert session.lookup("Passphrase", SALT) is None
+    assert session.lookup("passphrase", b"another salt....") is None
+    assert session.get_key("other", SALT, iterations=1) != b"key"
+
+
+def test_key_expires_and_hits_extend_it(clock):
+    session = KeySession(ttl=60, clock=clock)
+    session.remember("passphrase", SALT, b"key")
+    clock.now = 50
+    assert session.lookup("passphrase", SALT) == b"key"
+    clock.now = 100
+    assert session.is_active
+    clock.now = 110
+    assert session.lookup("passphrase", SALT) is None
+    assert not session.is_active
+
+
+def test_wipe_zeroes_the_key(clock):
+    session = KeySession(ttl=60, clock=clock)
+    session.remember("passphrase", SALT, b"key")
+    cached = session._key
+    session.wipe()
+    assert cached == bytearray(3)
+    assert session.lookup("passphrase", SALT) is None
+
+
+def test_derive_key_depends_on_salt_and_iterations():
+    key = key_session.derive_key("passphrase", SALT, iterations=1000)
+    assert len(key) == 44
+    assert key == key_session.derive_key("passphrase", SALT, iterations=1000)
+    assert key != key_session.derive_key("passphrase", SALT, iterations=1001)
+    assert key != key_session.derive_key("passphrase", b"another salt....", iterations=1000)
+
+
+def test_idle_key_is_wiped_by_the_timer():
+    session = KeySession(ttl=0.05)
+    session.remember("passphrase", SALT, b"key")
+    key = session._key
+    time.sleep(0.3)
+    assert session._key is None
+    assert key == bytearray(3)
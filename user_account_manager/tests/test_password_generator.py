@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+import password_generator
+from account_core import password_policy_error
+from password_generator import CHARACTER_CLASSES, PasswordGenerator, generate_password
+
+PASSWORD_GENERATOR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "password_generator.py")
+
+
+@pytest.mark.parametrize("length, classes", [(4, tuple(CHARACTER_CLASSES)), (16, tuple(CHARACTER_CLASSES)),
+                                             (2, ("lower", "digits")), (30, ("special",))])
+def test_every_password_meets_the_policy(length, classes):
+    passwords = PasswordGenerator(length, classes).generate(3000)
+    assert len(passwords) == 3000
+    for password in passwords:
+        assert len(password) == length
+        assert all(any(char in CHARACTER_CLASSES[name] for char in password) for name in classes)
+        assert all(any(char in CHARACTER_CLASSES[name] for name in classes) for char in password)
+
+
+def test_generated_passwords_pass_the_account_policy():
+    assert all(password_policy_error(password) is None for password in PasswordGenerator(8).generate(1000))
+    assert password_policy_error(generate_password()) is None
+
+
+def test_characters_are_evenly_spread():
+    counts = Counter("".join(PasswordGenerator(20, ("lower", "upper", "digits")).generate(5000)))
+    assert len(counts) == 62
+    expected = 5000 * 20 / 62
+    assert all(abs(count - expected) < 0.1 * expected for count in counts.values())
+
+
+def test_one_draw_per_block(monkeypatch):
+    draws = []
+    token_bytes = password_generator.secrets.token_bytes
+
+    def counting_token_bytes(n):
+        draws.append(n)
+        return token_bytes(n)
+
+    monkeypatch.setattr(password_generator.secrets, "token_bytes", counting_token_bytes)
+    count = 5 * password_generator.BLOCK_PASSWORDS
+    assert len(PasswordGenerator(4).generate(count)) == count
+    assert len(draws) <= 6
+
+
+@pytest.mark.parametrize("length, classes", [(16, ()), (16, ("lower", "emoji")), (3, tuple(CHARACTER_CLASSES))])
+def test_bad_settings_rejected(length, classes):
+    with pytest.raises(ValueError):
+        PasswordGenerator(length, classes)
+
+
+def test_command_line():
+    output = subprocess.run([sys.executable, PASSWORD_GENERATOR, "--count", "10000", "--length", "6", "--no-special"],
+                            capture_output=True, text=True, check=True).stdout
+    passwords = output.splitlines()
+    assert len(passwords) == 10000
+    assert all(len(password) == 6 and password.isalnum() for password in passwords)
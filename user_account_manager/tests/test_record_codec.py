@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from record_codec import RECORD_VERSION, decode_record, encode_record
+
+HASH = "$2b$12$abcdefghijklmnopqrstuuN0Lx0x0x0x0x0x0x0x0x0x0x0x0x0x0"
+
+
+@pytest.mark.parametrize("profile", [
+    {"age": 30, "gender": "f", "weight": 60, "height": 170, "occupation": "pilot"},
+    {"age": None, "gender": None, "weight": None, "height": None, "occupation": None},
+    {"age": -1, "weight": 2 ** 70, "height": 0},
+    {"occupation": "é" * 1000, "nickname": "zoë"},
+    {"tags": ["a", 1, None], "extra": {"nested": True}, "score": 1.5, "flag": False},
+    {},
+])
+def test_binary_round_trip(profile):
+    record = {"password_hash": HASH, "profile": profile}
+    data = encode_record(record)
+    assert data[0] == RECORD_VERSION
+    assert decode_record(data) == record
+
+
+@pytest.mark.parametrize("record", [
+    # Too long for the format's length fields
+    {"password_hash": "x" * 256, "profile": {}},
+    {"password_hash": HASH, "profile": {"k" * 256: 1}},
+    {"password_hash": HASH, "profile": {f"field{i}": i for i in range(256)}},
+    {"password_hash": HASH, "profile": {"occupation": "a" * 70000}},
+    {"password_hash": HASH, "profile": {"occupation": ["a" * 70000]}},
+    {"password_hash": HASH, "profile": {"extra": {"text": "a" * 70000}}},
+    # Not the shape the format covers
+    {"password_hash": HASH, "profile": {}, "created": 1},
+    {"password_hash": HASH, "profile": None},
+    {"password_hash": 5, "profile": {}},
+])
+def test_falls_back_to_json(record):
+    data = encode_record(record)
+    assert data[:1] == b"{"
+    assert decode_record(data) == record
+
+
+def test_reads_old_json_bodies():
+    record = {"password_hash": HASH, "profile": {"age": 41}}
+    assert decode_record(json.dumps(record).encode("utf-8")) == record
+
+
+def test_rejects_unknown_versions():
+    with pytest.raises(ValueError):
+        decode_record(bytes((RECORD_VERSION + 1,)) + b"\x00\x00")
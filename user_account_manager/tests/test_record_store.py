@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from record_store import MAGIC_PREFIX, RecordStore, is_record_store, open_legacy, store_version, STORE_VERSION
+
+ACCOUNTS = {f"user{number}": {"password_hash": f"hash{number}", "profile": {"age": number, "occupation": "dev"}}
+            for number in range(10)}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return os.path.join(tmp_path, "users.encrypted")
+
+
+@pytest.fixture
+def fernet():
+    return Fernet(Fernet.generate_key())
+
+
+def test_create_and_reopen(path, fernet):
+    RecordStore.create(path, fernet, ACCOUNTS.items())
+    store = RecordStore(path, fernet)
+    assert store_version(path) == STORE_VERSION
+    assert len(store) == 10
+    assert list(store) == list(ACCOUNTS)
+    assert store["user3"] == ACCOUNTS["user3"]
+    assert dict(store.items()) == ACCOUNTS
+    assert "user3" in store and "nobody" not in store
+    with pytest.raises(KeyError):
+        store["nobody"]
+
+
+def test_wrong_key_is_rejected_even_when_empty(path, fernet):
+    RecordStore.create(path, fernet)
+    with pytest.raises(InvalidToken):
+        RecordStore(path, Fernet(Fernet.generate_key()))
+
+
+def test_changes_write_only_their_own_record(path, fernet):
+    store = RecordStore.create(path, fernet, ACCOUNTS.items())
+    with open(path, "rb") as f:
+        before = f.read()
+    store["user3"] = {"password_hash": "new", "profile": {}}
+    del store["user4"]
+    with pytest.raises(KeyError):
+        del store["user4"]
+    with open(path, "rb") as f:
+        assert f.read() == before
+    assert len(store) == 9
+    assert store["user3"] == {"password_hash": "new", "profile": {}}
+    store.close()
+    expected = dict(ACCOUNTS, user3={"password_hash": "new", "profile": {}})
+    del expected["user4"]
+    assert dict(RecordStore(path, fernet).items()) == expected
+
+
+def test_file_holds_no_plaintext(path, fernet):
+    RecordStore.create(path, fernet, ACCOUNTS.items())
+    with open(path, "rb") as f:
+        data = f.read()
+    assert b"user3" not in data and b"hash3" not in data and b"dev" not in data
+
+
+def test_legacy_blob_is_read(path, fernet):
+    with open(path, "wb") as f:
+        f.write(fernet.encrypt(json.dumps(ACCOUNTS).encode('utf-8')))
+    assert not is_record_store(path)
+    assert open_legacy(path, fernet) == ACCOUNTS
+
+
+def test_other_store_versions_are_rejected(path, fernet):
+    RecordStore.create(path, fernet, ACCOUNTS.items())
+    with open(path, "r+b") as f:
+        f.seek(len(MAGIC_PREFIX))
+        f.write(bytes((STORE_VERSION - 1,)))
+    with pytest.raises(ValueError):
+        RecordStore(path, fernet)
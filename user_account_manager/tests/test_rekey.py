@@ -0,0 +1,97 @@
+import os
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from record_store import RecordStore
+from rekey import RekeyJob
+
+ACCOUNTS = {f"user{number}": {"password_hash": f"hash{number}", "profile": {"age": number}}
+            for number in range(25)}
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(chunks):
+    def progress(message, fraction):
+        progress.calls += 1
+        if progress.calls == chunks:
+            raise Interrupted
+    progress.calls = 0
+    return progress
+
+
+@pytest.fixture
+def path(tmp_path):
+    return os.path.join(tmp_path, "users.encrypted")
+
+
+@pytest.fixture
+def old_fernet(path):
+    fernet = Fernet(Fernet.generate_key())
+    RecordStore.create(path, fernet, ACCOUNTS.items())
+    return fernet
+
+
+def test_run_re_encrypts_every_record(path, old_fernet):
+    new_fernet = Fernet(Fernet.generate_key())
+    store = RekeyJob.start(path, old_fernet, new_fernet).run(old_fernet, new_fernet, chunk_records=10)
+    assert dict(store.items()) == ACCOUNTS
+    with pytest.raises(InvalidToken):
+        RecordStore(path, old_fernet)
+    assert RekeyJob.find(path) is None
+
+
+def test_interrupted_job_resumes_where_it_left_off(path, old_fernet):
+    new_fernet = Fernet(Fernet.generate_key())
+    job = RekeyJob.start(path, old_fernet, new_fernet)
+    with pytest.raises(Interrupted):
+        job.run(old_fernet, new_fernet, interrupt_after(2), chunk_records=10)
+    # The data file still has the old key until the job finishes
+    assert dict(RecordStore(path, old_fernet).items()) == ACCOUNTS
+
+    job = RekeyJob.find(path)
+    assert job.state["records_done"] == 20
+    job.check_new_key(new_fernet)
+    with pytest.raises(InvalidToken):
+        job.check_new_key(old_fernet)
+    store = job.run(old_fernet, new_fernet, chunk_records=10)
+    assert dict(store.items()) == ACCOUNTS
+    assert not os.path.exists(job.target_path) and not os.path.exists(job.state_path)
+
+
+def test_rollback_leaves_the_data_file_as_it_was(path, old_fernet):
+    with open(path, "rb") as f:
+        before = f.read()
+    new_fernet = Fernet(Fernet.generate_key())
+    job = RekeyJob.start(path, old_fernet, new_fernet)
+    with pytest.raises(Interrupted):
+        job.run(old_fernet, new_fernet, interrupt_after(1), chunk_records=10)
+
+    RekeyJob.find(path).rollback()
+    with open(path, "rb") as f:
+        assert f.read() == before
+    assert RekeyJob.find(path) is None
+    assert dict(RecordStore(path, old_fernet).items()) == ACCOUNTS
+
+
+def test_job_is_discarded_once_the_data_file_changes(path, old_fernet):
+    new_fernet = Fernet(Fernet.generate_key())
+    job = RekeyJob.start(path, old_fernet, new_fernet)
+    with pytest.raises(Interrupted):
+        job.run(old_fernet, new_fernet, interrupt_after(1), chunk_records=10)
+
+    store = RecordStore(path, old_fernet)
+    store["late"] = {"password_hash": "x", "profile": {}}
+    store.checkpoint()
+    assert RekeyJob.find(path) is None
+    assert not os.path.exists(job.target_path)
+
+
+def test_torn_state_file_is_ignored(path, old_fernet):
+    RekeyJob.start(path, old_fernet, Fernet(Fernet.generate_key()))
+    with open(path + ".rekey.json", "w") as f:
+        f.write('{"source_gen')
+    assert RekeyJob.find(path) is None
@@ -0,0 +1,97 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class TkTaskRunner:
+    """
+    Runs slow work (key derivation, hashing, file I/O) off the Tk event thread
+    and hands results back to it safely.
+
+    Tkinter widgets must only be touched from the thread running `mainloop()`,
+    so worker threads never call callbacks directly. They push them onto a
+    queue instead, and the Tk thread drains that queue every `poll_ms`
+    milliseconds using `root.after`.
+    """
+    def __init__(self, root, poll_ms: int = 50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._callbacks = queue.Queue()
+        self._polling = False
+        # Number of watched futures whose callbacks haven't run yet.
+        # Only ever touched on the Tk thread.
+        self._outstanding = 0
+
+    def _schedule_poll(self):
+        """Starts the `after` polling loop if it isn't already running."""
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        """Runs every queued callback on the Tk thread, then re-arms the poll."""
+        try:
+            while True:
+                try:
+                    callback, args = self._callbacks.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+        finally:
+            self._polling = False
+            # Keep polling while any background work is still outstanding.
+            if self._outstanding or not self._callbacks.empty():
+                self._schedule_poll()
+
+    def call_soon(self, callback, *args):
+        """Queues `callback(*args)` to run on the Tk thread. Safe from any thread."""
+        self._callbacks.put((callback, args))
+
+    def watch(self, future: Future, on_done=None, on_error=None):
+        """
+        Delivers the outcome of an existing future to the Tk thread:
+        `on_done(result)` on success or `on_error(exception)` on failure.
+        Call this from the Tk thread.
+        """
+        self._outstanding += 1
+
+        def _finished(fut):
+            exc = fut.exception()
+            if exc is not None:
+                if on_error:
+                    self.call_soon(on_error, exc)
+            elif on_done:
+                self.call_soon(on_done, fut.result())
+            self.call_soon(self._task_finished)
+
+        future.add_done_callback(_finished)
+        self._schedule_poll()
+        return future
+
+    def _task_finished(self):
+        self._outstanding -= 1
+
+    def submit(self, func, *args, on_done=None, on_error=None, on_progress=None):
+        """
+        Runs `func(*args)` on a daemon worker thread and returns its Future.
+
+        If `on_progress` is given, `func` is called with an extra keyword
+        argument `progress`, a thread-safe function `progress(message, fraction)`
+        that forwards updates to `on_progress` on the Tk thread.
+        """
+        future = Future()
+        kwargs = {}
+        if on_progress is not None:
+            kwargs["progress"] = lambda message, fraction: self.call_soon(on_progress, message, fraction)
+
+        def _worker():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self.watch(future, on_done, on_error)
+        threading.Thread(target=_worker, daemon=True).start()
+        return future
@@ -1,27 +1,16 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog, Toplevel
-import json
-import base64
-import os
-import random
-import string
-
-from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
-import bcrypt
-
-# --- Configuration ---
-# File to store encrypted user data. This file will hold all user accounts.
-USER_DATA_FILE = "user_data.encrypted"
-
-# Salt for PBKDF2 key derivation.
-# This salt is NOT a secret. It's used to make the key derivation process more robust
-# against pre-computation attacks (like rainbow tables). It should be unique and
-# fixed for your application. Changing this salt will make previously encrypted
-# data unreadable with the same master passphrase.
-PBKDF2_SALT = b'a_strong_random_fixed_salt_for_pbkdf2_derivation_for_your_app_12345'
+from tkinter import messagebox, simpledialog, Toplevel, ttk
+
+from cryptography.fernet import InvalidToken
+
+from account_core import AccountCore, password_policy_error, parse_profile
+from account_index import AccountIndex
+from password_generator import generate_password
+from record_store import RecordStore
+from tk_tasks import TkTaskRunner
+
+# Number of usernames shown at once in the account list.
+ACCOUNT_LIST_ROWS = 15
 
 class UserAccountManager:
     """
@@ -29,15 +18,11 @@ class UserAccountManager:
     Also provides a secure password generator.
     """
     def __init__(self):
-        # Initialize internal state variables
-        self.master_key = None # The derived Fernet key, set when data is unlocked
-        self.fernet = None     # Fernet instance for encryption/decryption, tied to master_key
-        # Stores decrypted user data: {username: {password_hash: ..., profile: {...}}}
-        # This dictionary holds the user data in memory once unlocked.
-        self.users = {}
-        # Flag to track if the application's data is currently unlocked in memory.
-        # This is crucial for controlling access to account management features.
-        self.is_data_unlocked = False
+        # The headless account manager (see account_core.py) holds the actual state:
+        # the unlocked users (`self.core.users`), the data key, the
+        # `is_data_unlocked` flag that controls access to account management
+        # features, the session key cache and the bcrypt hashing pool.
+        self.core = AccountCore()
 
         # --- Tkinter GUI Setup ---
         self.root = tk.Tk()
@@ -45,6 +30,14 @@ class UserAccountManager:
         self.root.geometry("800x600")
         self.root.resizable(False, False) # Prevent window resizing for consistent layout
         self.root.configure(bg="#2c3e50") # Dark blue-grey background for modern look
+        # Wipe the cached key when the window is closed.
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Runs slow work (key derivation, hashing) on worker threads and hands the
+        # results back to the Tk event loop, so the window never freezes.
+        self.tasks = TkTaskRunner(self.root)
+        # Sorted usernames and scroll position for the account list (see AccountIndex).
+        self.account_index = None
+        self.account_list_first = 0
 
         # Define modern fonts for consistent UI styling
         self.font_large = ("Inter", 16, "bold")
@@ -58,96 +51,146 @@ class UserAccountManager:
         # Initialize the main menu GUI after attempting to unlock data.
         self.create_main_menu()
 
-    def derive_key(self, passphrase: str) -> bytes:
-        """
-        Derives a Fernet key (32 bytes) from a given passphrase using PBKDF2HMAC.
-        This process stretches the passphrase, making it computationally harder
-        to brute-force, even if the salt is known.
-        """
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(), # Hashing algorithm to use
-            length=32,                 # Desired length of the derived key in bytes (Fernet requires 32)
-            salt=PBKDF2_SALT,          # Application-specific salt for key derivation
-            iterations=480000,         # High iteration count for strong key stretching (industry recommendation)
-            backend=default_backend()  # Cryptographic backend
-        )
-        # Derive the key and base64 URL-safe encode it, as Fernet requires this format.
-        key = base64.urlsafe_b64encode(kdf.derive(passphrase.encode('utf-8')))
-        return key
+    def _show_load_error(self, error: Exception):
+        """Shows the appropriate error dialog for a failed data load."""
+        if isinstance(error, InvalidToken):
+            # This specific exception means the passphrase was incorrect or data is corrupted.
+            messagebox.showerror("Decryption Error", "Invalid master passphrase or corrupted data.")
+        else:
+            # Other potential errors during file operations or JSON parsing.
+            messagebox.showerror("Error", f"An error occurred while loading data: {error}")
 
     def _load_data_from_file(self, passphrase: str):
         """
         Internal helper to load and decrypt data from the file using a given passphrase.
         This method attempts to decrypt the data. If successful, it returns the
-        decrypted user data dictionary and the Fernet instance used.
+        decrypted user data dictionary and the data key it is encrypted with.
         If decryption fails (e.g., wrong passphrase or corrupted data), it returns (None, None).
-        This method does NOT modify self.users or self.is_data_unlocked directly;
+        This method does NOT modify self.core.users or self.core.is_data_unlocked directly;
         it's a utility for other methods to use for temporary or permanent unlocks.
+        It runs on the calling thread; see `_load_data_async` for the non-blocking version.
         """
         try:
-            temp_master_key = self.derive_key(passphrase) # Derive key from the provided passphrase
-            temp_fernet = Fernet(temp_master_key)         # Create a Fernet instance with this key
-
-            # Check if the data file exists and contains content.
-            # If it's a fresh start, the file might not exist or be empty.
-            if not os.path.exists(USER_DATA_FILE) or os.path.getsize(USER_DATA_FILE) == 0:
-                # If no data file or empty, it's a first-time setup or file was cleared.
-                # In this case, return an empty dictionary of users and the newly created Fernet instance.
-                # This signifies that the passphrase is valid for creating *new* data.
-                return {}, temp_fernet
-            
-            # If the file exists and has content, attempt to read and decrypt it.
-            with open(USER_DATA_FILE, "rb") as f:
-                encrypted_data = f.read()
-
-            # Attempt decryption. If the passphrase is wrong, InvalidToken will be raised.
-            decrypted_data = temp_fernet.decrypt(encrypted_data).decode('utf-8')
-            # Parse the JSON string into a Python dictionary.
-            return json.loads(decrypted_data), temp_fernet
-        
-        except InvalidToken:
-            # This specific exception means the passphrase was incorrect or data is corrupted.
-            messagebox.showerror("Decryption Error", "Invalid master passphrase or corrupted data.")
-            return None, None # Indicate failure
+            return self.core.load(passphrase)
         except Exception as e:
-            # Catch other potential errors during file operations or JSON parsing.
-            messagebox.showerror("Error", f"An error occurred while loading data: {e}")
+            self._show_load_error(e)
             return None, None # Indicate failure
 
-    def _save_data_to_file(self, users_data: dict, fernet_instance: Fernet) -> bool:
+    def _show_busy_window(self, title: str, message: str):
         """
-        Internal helper to encrypt and save the user data to the file.
-        This method takes the dictionary of user data and a Fernet instance to encrypt it.
-        It returns True on successful save, False otherwise.
+        Opens a small modal window with a moving progress bar while background
+        work runs. Returns (window, update) where `update(message, fraction)`
+        changes the status text.
         """
-        if not fernet_instance:
-            # Ensure an encryption key is available before attempting to save.
-            messagebox.showerror("Error", "Encryption key not available for saving. Data not saved.")
-            return False
+        busy_window = Toplevel(self.root)
+        busy_window.title(title)
+        busy_window.geometry("360x120")
+        busy_window.resizable(False, False)
+        busy_window.configure(bg="#34495e")
+        busy_window.transient(self.root)
+        # Ignore the close button; the window goes away when the work is done.
+        busy_window.protocol("WM_DELETE_WINDOW", lambda: None)
+
+        status_var = tk.StringVar(master=busy_window, value=message)
+        tk.Label(busy_window, textvariable=status_var, font=self.font_medium,
+                    fg="#ecf0f1", bg="#34495e").pack(pady=15)
+        progress_bar = ttk.Progressbar(busy_window, mode="indeterminate", length=300)
+        progress_bar.pack(pady=5)
+        progress_bar.start(15)
+        # Block clicks on the main window while the work is in flight.
+        busy_window.grab_set()
+
+        def update(new_message: str, fraction: float):
+            status_var.set(f"{new_message} ({int(fraction * 100)}%)")
+
+        return busy_window, update
+
+    def _run_with_busy_window(self, title: str, message: str, func, *args, on_done, on_error=None):
+        """
+        Runs `func(*args, progress=...)` on a worker thread behind a busy window,
+        then calls `on_done(result)` on the Tk thread. Errors go to `on_error(exception)`
+        if given, and are otherwise reported with the usual load error dialogs.
+        """
+        busy_window, update = self._show_busy_window(title, message)
+
+        def _finished(result):
+            busy_window.destroy()
+            on_done(result)
+
+        def _failed(error):
+            busy_window.destroy()
+            (on_error or self._show_load_error)(error)
 
+        self.tasks.submit(func, *args, on_done=_finished, on_error=_failed, on_progress=update)
+
+    def _await_with_busy_window(self, title: str, message: str, future, on_done):
+        """
+        Shows a busy window until `future` (e.g. from the hashing service) completes,
+        then calls `on_done(result)` on the Tk thread. Errors are reported in a dialog.
+        """
+        busy_window, _ = self._show_busy_window(title, message)
+
+        def _finished(result):
+            busy_window.destroy()
+            on_done(result)
+
+        def _failed(error):
+            busy_window.destroy()
+            messagebox.showerror("Error", f"An error occurred: {error}")
+
+        self.tasks.watch(future, on_done=_finished, on_error=_failed)
+
+    def _load_data_async(self, passphrase: str, on_loaded):
+        """
+        Non-blocking version of `_load_data_from_file`. Calls `on_loaded(users, data_key)`
+        on the Tk thread once the data is decrypted; on failure an error is shown
+        and `on_loaded` is not called.
+        Opening the data file reads and decrypts every username, so this always runs on
+        a worker, even when the passphrase matches the cached session key.
+        """
+        self._run_with_busy_window("Unlocking Data", "Stretching master passphrase...",
+                                   self.core.load, passphrase,
+                                   on_done=lambda result: on_loaded(*result))
+
+    def _derive_key_async(self, passphrase: str, on_derived):
+        """Derives a key for a new passphrase on a worker thread, then calls `on_derived(key)`."""
+        def _derive(passphrase, progress):
+            progress("Stretching new master passphrase...", 0.0)
+            return self.core.derive_key(passphrase)
+
+        self._run_with_busy_window("Securing Data", "Stretching new master passphrase...",
+                                   _derive, passphrase, on_done=on_derived)
+
+    def _on_close(self):
+        """Folds journaled changes into the data file, wipes the cached key and closes the application."""
+        try:
+            self.core.close()
+        except Exception as e:
+            # The changes are still safe in the journal and will be replayed next time.
+            messagebox.showwarning("Warning", f"Could not compact the data file: {e}")
+        self.root.destroy()
+
+    def _save_account(self, username: str, account: dict) -> bool:
+        """
+        Encrypts and saves a single account into the unlocked store.
+        Returns True on successful save, False otherwise.
+        """
         try:
-            # Convert the Python dictionary to a JSON string, formatted for readability.
-            json_data = json.dumps(users_data, indent=4)
-            # Encrypt the JSON string using the provided Fernet instance.
-            encrypted_data = fernet_instance.encrypt(json_data.encode('utf-8'))
-            # Write the encrypted bytes to the file in binary write mode.
-            with open(USER_DATA_FILE, "wb") as f:
-                f.write(encrypted_data)
-            return True # Indicate success
+            self.core.save_account(username, account)
+            return True
         except Exception as e:
-            # Catch any errors during encryption or file writing.
             messagebox.showerror("Error", f"Failed to save user data: {e}")
-            return False # Indicate failure
+            return False
 
     def _prompt_for_startup_unlock(self):
         """
         Prompts the user for the master passphrase at application startup.
         This determines if existing data can be loaded and if account management features
-        requiring unlocked data can be used. It sets `self.users`, `self.fernet`,
-        and `self.is_data_unlocked` for the duration of the session.
+        requiring unlocked data can be used. It sets `self.core.users`, `self.core.data_key`,
+        and `self.core.is_data_unlocked` for the duration of the session.
         """
         # Check if the data file exists and has content (i.e., not a brand new file).
-        file_exists_and_not_empty = os.path.exists(USER_DATA_FILE) and os.path.getsize(USER_DATA_FILE) > 0
+        file_exists_and_not_empty = self.core.has_data()
 
         if file_exists_and_not_empty:
             # If data exists, prompt for the master passphrase to unlock it.
@@ -158,26 +201,45 @@ class UserAccountManager:
                 return # User cancelled, data stays locked
 
             # Attempt to load and decrypt data with the entered passphrase.
-            temp_users, temp_fernet = self._load_data_from_file(passphrase)
-            if temp_users is not None:
-                # If decryption was successful, update the application's persistent state.
-                self.users = temp_users
-                self.fernet = temp_fernet
-                self.is_data_unlocked = True
-                messagebox.showinfo("Success", "Data unlocked for this session!")
-            else:
-                # _load_data_from_file already showed an error message if decryption failed.
-                # Data remains locked, self.is_data_unlocked remains False.
-                pass
+            # This runs in the background; if it fails an error is shown and
+            # the data remains locked (self.core.is_data_unlocked remains False).
+            self._load_data_async(passphrase, lambda temp_users, temp_key: self._finish_startup_unlock(passphrase, temp_users, temp_key))
         else:
             # If the file doesn't exist or is empty, it's the very first run.
             # Inform the user they need to set a master passphrase.
             messagebox.showinfo("First-time Setup", "Welcome! It looks like this is your first time using the application or your data file is empty.\n\nPlease set a master passphrase to secure your future account data. You can do this via 'Set/Change Master Passphrase' in the main menu.")
-            # For a truly empty state, ensure `self.users` is an empty dictionary
+            # For a truly empty state, ensure `self.core.users` is an empty dictionary
             # so that `create_account_gui` can proceed without immediately failing
-            # on `self.users` being None, although `is_data_unlocked` will still be False.
-            self.users = {}
-            self.is_data_unlocked = False # Data is not unlocked until a passphrase is set/verified.
+            # on `self.core.users` being None, although `is_data_unlocked` will still be False.
+            self.core.users = {}
+            self.core.is_data_unlocked = False # Data is not unlocked until a passphrase is set/verified.
+
+    def _finish_startup_unlock(self, passphrase: str, temp_users: dict, temp_key: bytes):
+        """Called once the startup passphrase has decrypted the data."""
+        # Decryption was successful, so update the application's persistent state.
+        self.core.adopt(temp_users, temp_key)
+        messagebox.showinfo("Success", "Data unlocked for this session!")
+        job = self.core.pending_rekey()
+        if job is not None:
+            self._offer_to_resume_rekey(passphrase, job)
+
+    def _offer_to_resume_rekey(self, passphrase: str, job):
+        """Asks whether to finish or abandon an interrupted data key rotation."""
+        percent = int(job.fraction_done * 100)
+        if not messagebox.askyesno("Resume Key Rotation", f"Re-encrypting your data with a new data key was interrupted ({percent}% done).\n\nResume it now? Choosing 'No' rolls it back; your data stays encrypted with its current key either way."):
+            self.core.rollback_rekey()
+            messagebox.showinfo("Rolled Back", "The key rotation was rolled back.")
+            return
+        self._run_with_busy_window("Securing Data", "Resuming re-encryption...",
+                                   self.core.rotate_data_key, passphrase,
+                                   on_done=lambda _: messagebox.showinfo("Success", "Data re-encrypted with a new data key!"),
+                                   on_error=self._show_rekey_error)
+
+    def _show_rekey_error(self, error: Exception):
+        """Reports a failed or interrupted data key rotation."""
+        messagebox.showerror("Error", f"Failed to re-encrypt data with a new data key: {error}\n\nYour data still uses its previous key. Restart the application to resume or roll back the rotation.")
+        # Revert to a locked state to prevent data loss impression
+        self.core.lock()
 
     def create_main_menu(self):
         """
@@ -236,19 +298,32 @@ class UserAccountManager:
             messagebox.showwarning("Cancelled", "Master passphrase not entered. Cannot view accounts.")
             return
             
-        # Attempt to load data for display. This creates a temporary decryption context.
-        temp_users, temp_fernet = self._load_data_from_file(passphrase)
-        if temp_users is None: # _load_data_from_file already showed an error message if decryption failed.
-            return # Do not proceed if data could not be decrypted.
+        if self.core.is_data_unlocked and isinstance(self.core.users, RecordStore):
+            # The unlocked store already has every username in memory, so only the
+            # passphrase needs checking: at once if it matches the cached session key,
+            # otherwise on a worker while the key is derived.
+            if self.core.has_cached_key(passphrase):
+                self._display_accounts_list_gui(self.core.users)
+            else:
+                self._run_with_busy_window("Unlocking Data", "Stretching master passphrase...",
+                                           self.core.check_passphrase, passphrase,
+                                           on_done=lambda _: self._display_accounts_list_gui(self.core.users))
+            return
 
-        # Now display the accounts using the temporarily decrypted data.
-        self._display_accounts_list_gui(temp_users)
+        # Otherwise load the data for display on a worker. This creates a temporary
+        # decryption context, and then displays the accounts using the temporarily
+        # decrypted data.
+        self._load_data_async(passphrase, lambda temp_users, temp_key: self._display_accounts_list_gui(temp_users))
 
-    def _display_accounts_list_gui(self, users_data_to_display: dict):
+    def _display_accounts_list_gui(self, users_data_to_display: dict, account_index: AccountIndex = None):
         """
         Displays a list of all accounts from the provided `users_data_to_display` dictionary.
         This allows showing accounts either from the persistently unlocked data or
         from a temporary decryption (e.g., for 'View All Accounts').
+
+        Only one page of usernames is in the listbox at a time; scrolling and the search
+        box page through a sorted `AccountIndex` instead. Pass the index back in (as the
+        profile view does) to return to the same search and position.
         """
         # Clear current widgets.
         for widget in self.root.winfo_children():
@@ -262,24 +337,49 @@ class UserAccountManager:
         if not users_data_to_display:
             tk.Label(accounts_list_frame, text="No accounts registered yet.", font=self.font_medium, fg="#ecf0f1", bg="#34495e").pack(pady=10)
         else:
+            if account_index is None:
+                # Sorting the usernames is the only work done up front; no profiles are decrypted.
+                account_index = AccountIndex(users_data_to_display.keys())
+                self.account_list_first = 0
+            self.account_index = account_index
+
+            # Search box: typing filters the list to usernames starting with the text.
+            search_frame = tk.Frame(accounts_list_frame, bg="#34495e")
+            search_frame.pack(fill="x", padx=10)
+            tk.Label(search_frame, text="Search:", font=self.font_medium, fg="#ecf0f1", bg="#34495e").pack(side="left")
+            search_var = tk.StringVar(value=account_index.prefix)
+            search_entry = tk.Entry(search_frame, textvariable=search_var, font=self.font_medium, bd=2, relief="groove")
+            search_entry.pack(side="left", fill="x", expand=True, padx=5)
+
+            self.account_count_label = tk.Label(accounts_list_frame, font=self.font_small, fg="#bdc3c7", bg="#34495e")
+            self.account_count_label.pack()
+
             # Create a frame for the listbox and scrollbar.
             listbox_frame = tk.Frame(accounts_list_frame, bg="#34495e")
             listbox_frame.pack(pady=10, fill="both", expand=True)
 
-            scrollbar = tk.Scrollbar(listbox_frame)
-            scrollbar.pack(side="right", fill="y")
+            # The scrollbar moves through the whole (filtered) index, not the listbox contents.
+            self.account_scrollbar = tk.Scrollbar(listbox_frame, command=self._scroll_account_list)
+            self.account_scrollbar.pack(side="right", fill="y")
 
-            # Listbox to show usernames.
-            self.account_listbox = tk.Listbox(listbox_frame, font=self.font_medium,
-                                                bg="#2c3e50", fg="#ecf0f1", bd=2, relief="sunken",
-                                                yscrollcommand=scrollbar.set)
+            # Listbox to show one page of usernames.
+            self.account_listbox = tk.Listbox(listbox_frame, font=self.font_medium, height=ACCOUNT_LIST_ROWS,
+                                                bg="#2c3e50", fg="#ecf0f1", bd=2, relief="sunken")
             self.account_listbox.pack(side="left", fill="both", expand=True)
-            scrollbar.config(command=self.account_listbox.yview)
+            for sequence, amount in (("<Button-4>", -3), ("<Button-5>", 3), ("<Prior>", -ACCOUNT_LIST_ROWS), ("<Next>", ACCOUNT_LIST_ROWS)):
+                self.account_listbox.bind(sequence, lambda event, amount=amount: self._move_account_list(amount))
+            self.account_listbox.bind("<MouseWheel>", lambda event: self._move_account_list(-3 if event.delta > 0 else 3))
+            self.account_listbox.bind("<Double-Button-1>", lambda event: self._view_selected_account_from_list(users_data_to_display))
+
+            def _on_search(*_):
+                account_index.set_prefix(search_var.get())
+                self.account_list_first = 0
+                self._refresh_account_list()
+
+            search_var.trace_add("write", _on_search)
+            search_entry.focus_set()
+            self._refresh_account_list()
 
-            # Populate the listbox with usernames.
-            for username in users_data_to_display.keys():
-                self.account_listbox.insert(tk.END, username)
-                
             # Button to view the profile of the selected account.
             tk.Button(accounts_list_frame, text="View Selected Account", 
                         command=lambda: self._view_selected_account_from_list(users_data_to_display),
@@ -291,6 +391,40 @@ class UserAccountManager:
                     font=self.font_medium, bg="#7f8c8d", fg="white", activebackground="#95a5a6",
                     relief="raised", bd=2, width=20).pack(pady=20)
 
+    def _refresh_account_list(self):
+        """Fills the account listbox with the page of usernames starting at `self.account_list_first`."""
+        matches = len(self.account_index)
+        self.account_list_first = max(0, min(self.account_list_first, matches - ACCOUNT_LIST_ROWS))
+        first = self.account_list_first
+        page = self.account_index.page(first, ACCOUNT_LIST_ROWS)
+
+        self.account_listbox.delete(0, tk.END)
+        if page:
+            self.account_listbox.insert(tk.END, *page)
+        if matches:
+            self.account_scrollbar.set(first / matches, (first + len(page)) / matches)
+            summary = f"Showing {first + 1}-{first + len(page)} of {matches}"
+        else:
+            self.account_scrollbar.set(0, 1)
+            summary = "No matching accounts"
+        if matches != self.account_index.total:
+            summary += f" (filtered from {self.account_index.total})"
+        self.account_count_label.config(text=summary)
+
+    def _move_account_list(self, rows: int):
+        """Scrolls the account list by `rows` (negative is up)."""
+        self.account_list_first += rows
+        self._refresh_account_list()
+        return "break" # Stop the listbox from handling the event itself.
+
+    def _scroll_account_list(self, action: str, amount: str, unit: str = None):
+        """Scrollbar callback: ("moveto", fraction) or ("scroll", count, "units"/"pages")."""
+        if action == "moveto":
+            self.account_list_first = int(float(amount) * len(self.account_index))
+            self._refresh_account_list()
+        else:
+            self._move_account_list(int(amount) * (ACCOUNT_LIST_ROWS if unit == "pages" else 1))
+
     def _view_selected_account_from_list(self, users_data_to_display: dict):
         """
         Callback function to view an individual account's profile after selection
@@ -309,7 +443,8 @@ class UserAccountManager:
         """
         Displays the profile details of a single user.
         Takes `users_data_source` as an argument to be flexible (e.g., display from
-        persistent `self.users` after login, or from temporary data after "View All Accounts").
+        persistent `self.core.users` after login, or from temporary data after "View All Accounts").
+        Only this account's record is decrypted, when the profile is opened.
         """
         if username not in users_data_source:
             messagebox.showerror("Error", "User not found in data source.")
@@ -330,14 +465,14 @@ class UserAccountManager:
             tk.Label(profile_frame, text=f"{display_key}: {value if value is not None else 'N/A'}",
                             font=self.font_medium, fg="#ecf0f1", bg="#34495e", anchor="w").pack(fill="x", padx=20, pady=2)
 
-        # Back button logic: if showing from `self.users` (persistent), go to main menu.
+        # Back button logic: if showing from `self.core.users` (persistent), go to main menu.
         # If showing from a temporary `users_data_source`, go back to the all accounts list.
-        if users_data_source is self.users:
+        if users_data_source is self.core.users:
             tk.Button(profile_frame, text="Back to Main Menu", command=self.create_main_menu,
                         font=self.font_medium, bg="#7f8c8d", fg="white", activebackground="#95a5a6",
                         relief="raised", bd=2, width=20).pack(pady=20)
         else:
-            tk.Button(profile_frame, text="Back to All Accounts", command=lambda: self._display_accounts_list_gui(users_data_source),
+            tk.Button(profile_frame, text="Back to All Accounts", command=lambda: self._display_accounts_list_gui(users_data_source, self.account_index),
                         font=self.font_medium, bg="#7f8c8d", fg="white", activebackground="#95a5a6",
                         relief="raised", bd=2, width=20).pack(pady=20)
 
@@ -345,8 +480,10 @@ class UserAccountManager:
         """
         Handles the logic for setting the master passphrase for the first time
         or changing an existing one. This is a critical security function.
+        Key derivation runs in the background, so this continues in
+        `_change_master_passphrase` / `_finish_set_master_passphrase`.
         """
-        file_exists_and_not_empty = os.path.exists(USER_DATA_FILE) and os.path.getsize(USER_DATA_FILE) > 0
+        file_exists_and_not_empty = self.core.has_data()
 
         if file_exists_and_not_empty:
             # Scenario 1: Master passphrase has been set before; user wants to change it.
@@ -357,55 +494,8 @@ class UserAccountManager:
                 return
                 
             # Verify current passphrase by attempting to load data with it.
-            # This is a temporary load, just for verification.
-            temp_users_check, temp_fernet_check = self._load_data_from_file(current_passphrase)
-            if temp_users_check is None:
-                # _load_data_from_file already showed an error if the passphrase was wrong.
-                return # Stop if current passphrase is incorrect.
-                
-            # If current passphrase is correct, we now have the decrypted data in temp_users_check.
-            # Crucially, we update the main `self.users` and `self.fernet` to reflect this
-            # *unlocked state* for the session, which is needed to re-encrypt the data later.
-            self.users = temp_users_check
-            self.fernet = temp_fernet_check
-            self.is_data_unlocked = True # Data is now unlocked with the OLD passphrase.
-
-            # Warn the user about the irreversible nature of forgetting the new passphrase.
-            if not messagebox.askyesno("Warning", "WARNING: Changing the master passphrase will re-encrypt all your data. If you forget the NEW passphrase, your data will be PERMANENTLY LOST. Do you wish to proceed?"):
-                return
-
-            new_passphrase = simpledialog.askstring("New Master Passphrase", "Enter your NEW master passphrase:", show='*')
-            if not new_passphrase:
-                messagebox.showwarning("Cancelled", "New master passphrase not entered.")
-                return
-                
-            confirm_new_passphrase = simpledialog.askstring("Confirm New Passphrase", "Confirm your NEW master passphrase:", show='*')
-            if new_passphrase != confirm_new_passphrase:
-                messagebox.showerror("Error", "New passphrases do not match.")
-                return
-
-            # Re-derive the master key and Fernet instance using the NEW passphrase.
-            try:
-                self.master_key = self.derive_key(new_passphrase)
-                self.fernet = Fernet(self.master_key)
-                
-                # Save the *current* `self.users` data (which is the decrypted data)
-                # using the *new* `self.fernet` instance (derived from the new passphrase).
-                if self._save_data_to_file(self.users, self.fernet):
-                    messagebox.showinfo("Success", "Master passphrase successfully changed and data re-encrypted!")
-                    # The `self.is_data_unlocked` remains True, now with the new passphrase.
-                else:
-                    # If save fails, inform the user about potential data corruption.
-                    messagebox.showerror("Error", "Failed to save data with new passphrase. Your data might be corrupted. Please restart and use your OLD passphrase if possible.")
-                    # Revert to a locked state or try to load with old key to prevent data loss impression
-                    self.is_data_unlocked = False 
-                    self.fernet = None
-                    self.users = {} # Clear potentially compromised data in memory
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to change master passphrase: {e}")
-                self.is_data_unlocked = False
-                self.fernet = None
-                self.users = {}
+            # If the passphrase was wrong, an error is shown and we stop here.
+            self._load_data_async(current_passphrase, self._change_master_passphrase)
 
         else:
             # Scenario 2: Master passphrase has NOT been set yet (first time setup).
@@ -422,29 +512,62 @@ class UserAccountManager:
                 messagebox.showerror("Error", "Passphrases do not match.")
                 return
 
-            # Derive the key and initialize Fernet with the new passphrase.
-            # This is for the first time setup.
-            try:
-                self.master_key = self.derive_key(new_passphrase)
-                self.fernet = Fernet(self.master_key)
-                self.users = {} # Initialize users as empty dictionary since no data exists yet.
-                self.is_data_unlocked = True # Data is now "unlocked" with this new passphrase.
-
-                # Save an empty JSON to the file to initialize it with the new master passphrase.
-                # This creates the `user_data.encrypted` file.
-                if self._save_data_to_file(self.users, self.fernet):
-                    messagebox.showinfo("Success", "Master passphrase set successfully! Data is now unlocked for this session.")
-                else:
-                    messagebox.showerror("Error", "Failed to initialize data file with new passphrase. Please try again.")
-                    self.is_data_unlocked = False
-                    self.fernet = None
-                    self.users = {}
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to set master passphrase: {e}")
-                self.is_data_unlocked = False
-                self.fernet = None
-                self.users = {}
+            # Derive the key for the new passphrase in the background.
+            self._derive_key_async(new_passphrase, lambda key: self._finish_set_master_passphrase(new_passphrase, key))
+
+    def _change_master_passphrase(self, temp_users_check: dict, temp_key_check: bytes):
+        """
+        Second step of changing the master passphrase, once the CURRENT passphrase
+        has been verified by decrypting the data.
+        """
+        # If current passphrase is correct, we now have the decrypted data in temp_users_check.
+        # Crucially, we update the main `self.core.users` and `self.core.data_key` to reflect this
+        # *unlocked state* for the session, which is needed to re-wrap the data key later.
+        self.core.adopt(temp_users_check, temp_key_check) # Data is now unlocked with the OLD passphrase.
+
+        # Warn the user about the irreversible nature of forgetting the new passphrase.
+        if not messagebox.askyesno("Warning", "WARNING: If you forget the NEW master passphrase, your data will be PERMANENTLY LOST. Do you wish to proceed?"):
+            return
+
+        new_passphrase = simpledialog.askstring("New Master Passphrase", "Enter your NEW master passphrase:", show='*')
+        if not new_passphrase:
+            messagebox.showwarning("Cancelled", "New master passphrase not entered.")
+            return
+            
+        confirm_new_passphrase = simpledialog.askstring("Confirm New Passphrase", "Confirm your NEW master passphrase:", show='*')
+        if new_passphrase != confirm_new_passphrase:
+            messagebox.showerror("Error", "New passphrases do not match.")
+            return
 
+        # Derive a key from the NEW passphrase (with a fresh salt), in the background.
+        self._derive_key_async(new_passphrase, lambda key: self._finish_change_master_passphrase(new_passphrase, key))
+
+    def _finish_change_master_passphrase(self, new_passphrase: str, new_key):
+        """Re-wraps the data key with the key derived from the NEW passphrase."""
+        try:
+            # Only the small wrapped copy of the data key is re-encrypted; the
+            # accounts themselves stay as they are, however many there are.
+            self.core.set_master_key(new_passphrase, new_key)
+            messagebox.showinfo("Success", "Master passphrase successfully changed!")
+            # The data remains unlocked, now with the new passphrase.
+        except Exception as e:
+            # If save fails, inform the user that the old passphrase still applies.
+            messagebox.showerror("Error", f"Failed to change master passphrase: {e}\n\nPlease restart and use your OLD passphrase.")
+            # Revert to a locked state to prevent data loss impression
+            self.core.lock()
+
+    def _finish_set_master_passphrase(self, new_passphrase: str, new_key):
+        """Initializes the data file with the key derived from a first-time passphrase."""
+        # This is for the first time setup.
+        try:
+            # Save an empty store to the file to initialize it with the new master passphrase.
+            # This creates the `user_data.encrypted` file.
+            self.core.users = {} # No data exists yet.
+            self.core.set_master_key(new_passphrase, new_key)
+            messagebox.showinfo("Success", "Master passphrase set successfully! Data is now unlocked for this session.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to set master passphrase: {e}")
+            self.core.lock()
 
     def create_account_gui(self):
         """
@@ -452,7 +575,7 @@ class UserAccountManager:
         Requires that the master data be unlocked.
         """
         # Critical check: Ensure the master data is unlocked for persistent account creation.
-        if not self.is_data_unlocked:
+        if not self.core.is_data_unlocked:
             messagebox.showwarning("Data Not Unlocked", "Please unlock your data first by entering the master passphrase at startup, or by using 'Set/Change Master Passphrase' to set/unlock it.")
             return
 
@@ -504,7 +627,7 @@ class UserAccountManager:
         Performs validation checks and saves the new account data if valid.
         """
         # Ensure data is unlocked before attempting to save a new account.
-        if not self.is_data_unlocked:
+        if not self.core.is_data_unlocked:
             messagebox.showerror("Error", "Data is not unlocked. Cannot register account. Please unlock data at startup or via 'Set/Change Master Passphrase'.")
             return
 
@@ -521,7 +644,7 @@ class UserAccountManager:
             messagebox.showerror("Input Error", "Passwords do not match.")
             return
 
-        if username in self.users:
+        if username in self.core.users:
             messagebox.showerror("Registration Error", "Username already exists. Please choose a different one.")
             return
 
@@ -529,37 +652,32 @@ class UserAccountManager:
         if not self.validate_password_policy(password):
             return # Policy validation function shows its own error messages.
 
-        # Hash the password using bcrypt for secure storage.
-        # bcrypt.gensalt() generates a random salt for each hash, making rainbow table attacks ineffective.
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-        profile_data = {}
         # Collect and validate profile data.
-        for key, entry_widget in self.profile_entries.items():
-            value = entry_widget.get().strip()
-            if key in ["age", "weight", "height"]:
-                try:
-                    # Attempt to convert to integer; store None if empty.
-                    profile_data[key] = int(value) if value else None
-                except ValueError:
-                    messagebox.showerror("Input Error", f"Please enter a valid number for {key}.")
-                    return # Stop registration if numeric input is invalid.
-            else:
-                profile_data[key] = value if value else None # Store string value or None if empty.
+        try:
+            profile_data = parse_profile({key: entry_widget.get() for key, entry_widget in self.profile_entries.items()})
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e))
+            return # Stop registration if numeric input is invalid.
 
-        # Add the new user to the in-memory users dictionary.
-        self.users[username] = {
-            "password_hash": hashed_password,
-            "profile": profile_data
-        }
-            
-        # Save the updated `self.users` data using the persistently available `self.fernet` instance.
-        if self._save_data_to_file(self.users, self.fernet):
+        # Hash the password using bcrypt for secure storage, on the hashing pool.
+        # bcrypt.gensalt() generates a random salt for each hash, making rainbow table attacks ineffective.
+        future = self.core.hashing.hash_password(password)
+        self._await_with_busy_window("Creating Account", "Hashing password...", future,
+                                     lambda hashed_password: self._finish_register_account(username, hashed_password, profile_data))
+
+    def _finish_register_account(self, username: str, hashed_password: str, profile_data: dict):
+        """Saves a new account once its password hash is ready."""
+        # Another registration may have claimed the name while the password was hashing.
+        if username in self.core.users:
+            messagebox.showerror("Registration Error", "Username already exists. Please choose a different one.")
+            return
+
+        # Encrypt and save just the new account record into the unlocked store.
+        # If saving fails, the store is left without the new user.
+        if self._save_account(username, {"password_hash": hashed_password, "profile": profile_data}):
             messagebox.showinfo("Success", f"Account for '{username}' created successfully!")
             self.create_main_menu() # Return to main menu on success.
         else:
-            # If saving fails, remove the user from the in-memory dictionary to maintain consistency.
-            del self.users[username]
             messagebox.showerror("Error", "Account could not be saved due to an encryption or file issue. Please try again.")
 
     def validate_password_policy(self, password: str) -> bool:
@@ -572,20 +690,9 @@ class UserAccountManager:
         - At least one special character (from string.punctuation).
         Returns True if policy is met, False otherwise and shows an error message.
         """
-        if len(password) < 8:
-            messagebox.showerror("Password Policy", "Password must be at least 8 characters long.")
-            return False
-        if not any(char.isupper() for char in password):
-            messagebox.showerror("Password Policy", "Password must contain at least one uppercase letter.")
-            return False
-        if not any(char.islower() for char in password):
-            messagebox.showerror("Password Policy", "Password must contain at least one lowercase letter.")
-            return False
-        if not any(char.isdigit() for char in password):
-            messagebox.showerror("Password Policy", "Password must contain at least one number.")
-            return False
-        if not any(char in string.punctuation for char in password):
-            messagebox.showerror("Password Policy", "Password must contain at least one special character.")
+        error = password_policy_error(password)
+        if error:
+            messagebox.showerror("Password Policy", error)
             return False
         return True
 
@@ -595,7 +702,7 @@ class UserAccountManager:
         Requires that the master data be unlocked.
         """
         # Critical check: Ensure the master data is unlocked to access user hashes.
-        if not self.is_data_unlocked:
+        if not self.core.is_data_unlocked:
             messagebox.showwarning("Data Not Unlocked", "Please unlock your data first by entering the master passphrase at startup, or by using 'Set/Change Master Passphrase' to set/unlock it.")
             return
 
@@ -635,17 +742,23 @@ class UserAccountManager:
             messagebox.showerror("Login Error", "Please enter both username and password.")
             return
 
-        if username not in self.users:
+        if username not in self.core.users:
             messagebox.showerror("Login Error", "User not found.")
             return
 
         # Retrieve the stored password hash for the given username.
-        stored_hash = self.users[username]["password_hash"].encode('utf-8')
-        # Use bcrypt.checkpw to securely compare the entered password with the stored hash.
-        if bcrypt.checkpw(password.encode('utf-8'), stored_hash):
+        stored_hash = self.core.users[username]["password_hash"]
+        # Use bcrypt.checkpw (on the hashing pool) to securely compare the entered password with the stored hash.
+        future = self.core.hashing.check_password(password, stored_hash)
+        self._await_with_busy_window("Logging In", "Verifying password...", future,
+                                     lambda password_matches: self._finish_login(username, password_matches))
+
+    def _finish_login(self, username: str, password_matches: bool):
+        """Completes a login once the password check has finished."""
+        if password_matches:
             messagebox.showinfo("Login Success", f"Welcome, {username}!")
             # Upon successful login, display the user's profile using the persistently loaded data.
-            self._show_individual_user_profile_gui(username, self.users)
+            self._show_individual_user_profile_gui(username, self.core.users)
         else:
             messagebox.showerror("Login Error", "Incorrect password.")
 
@@ -717,57 +830,21 @@ class UserAccountManager:
         it meets common password policy rules (at least one of each selected type).
         """
         length = self.length_scale_gen.get()
-        
-        # Define character sets.
-        lowercase_chars = string.ascii_lowercase
-        uppercase_chars = string.ascii_uppercase
-        digit_chars = string.digits
-        special_chars = string.punctuation
-
-        # Initialize password components and character pool.
-        password_chars = []
-        all_possible_chars = ""
-
-        # Ensure at least one character from each selected category is included.
-        if self.include_lowercase_gen.get():
-            password_chars.append(random.choice(lowercase_chars))
-            all_possible_chars += lowercase_chars
-        
-        if self.include_caps_gen.get():
-            password_chars.append(random.choice(uppercase_chars))
-            all_possible_chars += uppercase_chars
-        
-        if self.include_numbers_gen.get():
-            password_chars.append(random.choice(digit_chars))
-            all_possible_chars += digit_chars
-        
-        if self.include_special_gen.get():
-            password_chars.append(random.choice(special_chars))
-            all_possible_chars += special_chars
+
+        # The selected character types, in the generator's class names.
+        selected = [name for name, var in (("lower", self.include_lowercase_gen), ("upper", self.include_caps_gen),
+                                           ("digits", self.include_numbers_gen), ("special", self.include_special_gen))
+                    if var.get()]
 
         # Handle case where no character types are selected.
-        if not all_possible_chars:
+        if not selected:
             messagebox.showerror("Selection Error", "Please select at least one character type (e.g., lowercase letters).")
             self.generated_password_var_gen.set("")
             return
 
-        # Fill the remaining length of the password with random characters from the combined pool.
-        # Subtract the number of characters already added to guarantee inclusion.
-        remaining_length = length - len(password_chars)
-        if remaining_length < 0: # This can happen if length is too short and many types are selected
-            # Forcing a minimum length for each category might exceed total length if it's too small
-            # This logic prioritizes minimum type inclusion over exact length for very small lengths.
-            # A more robust approach might be to enforce minimum length for each chosen category and increase total length if needed.
-            # For simplicity, we'll just use the currently accumulated password_chars if length is too small.
-            pass
-        else:
-            password_chars.extend(random.choice(all_possible_chars) for _ in range(remaining_length))
-
-        # Shuffle the list of characters to ensure randomness and prevent predictable patterns.
-        random.shuffle(password_chars)
-        generated_password = ''.join(password_chars)
-        
-        self.generated_password_var_gen.set(generated_password)
+        # Characters come from the secrets module (the OS CSPRNG), and passwords
+        # missing a selected type are redrawn rather than patched (see password_generator.py).
+        self.generated_password_var_gen.set(generate_password(length, selected))
 
     def _copy_to_clipboard_from_new_window(self):
         """